@@ -1,17 +1,133 @@
 from __future__ import annotations
 
-from flask import Flask, render_template, request, jsonify, Response
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from time import perf_counter
+from typing import Optional
+
+from flask import Flask, render_template, request, jsonify, Response, g, stream_with_context
 
 from controller import SudokuController
 from sudoku_board import SudokuBoard
 from validator import Validator
 from genetic import GeneticParams
 from io_board import BoardIO
+from jobs import JobManager, SolveJob
+from batch import solve_batch
+from metrics import APP_DB_PATH, MetricsHistory
+from sessions import SessionRegistry, Session
+from shared_state import SharedStore
+from solution_cache import default_cache
+from generator import PuzzlePool
+from grading import default_grades
+from profiling import format_profile
+import telemetry
 
 app = Flask(__name__)
 
-# Controller global para mantener tablero + historial
-controller = SudokuController()
+# Un controller (tablero + historial) por sesión de navegador. Historiales,
+# sesiones y trabajos viven en una base SQLite compartida: con varios workers
+# (gunicorn -w 4, etc.) cualquier proceso atiende cualquier request
+METRICS_DB = APP_DB_PATH
+store = SharedStore(METRICS_DB)
+SESSION_COOKIE = "sudoku_sid"
+# Tableros ya generados (solución única) para que /api/generate no espere al generador.
+# Importar el módulo no arranca el hilo de fondo: las claves de POOL_WARM_KEYS se
+# registran con el primer /api/generate y las demás a medida que se piden
+puzzle_pool = PuzzlePool(SudokuController.build_puzzle, capacity=8)
+POOL_WARM_KEYS = [(size, d) for size in (4, 6, 9) for d in SudokuController.DIFFICULTY_RANGES_9X9]
+_pool_calentado = threading.Event()
+sessions = SessionRegistry(
+    max_sessions=1000,
+    ttl_seconds=3600,
+    max_bytes=64 * 1024 * 1024,
+    factory=lambda sid: SudokuController(
+        metrics_history=MetricsHistory(METRICS_DB, scope=sid),
+        puzzle_pool=puzzle_pool,
+    ),
+    store=store,
+)
+HISTORY_PAGE_SIZE = 50
+MAX_SOLVE_SECONDS = 120.0   # tope de reloj por resolución (acota la latencia de la API)
+MAX_GRADE_GA_RUNS = 5       # corridas del AG que puede pedir /api/grade
+MAX_ISLANDS = os.cpu_count() or 1   # procesos por resolución en modo islas
+# /api/solve_batch: procesos por lote (1..MAX_BATCH_WORKERS) y lotes simultáneos;
+# cada lote arma su propio pool, así que el total queda acotado por ambos
+MAX_BATCH_WORKERS = os.cpu_count() or 1
+MAX_CONCURRENT_BATCHES = 2
+_lotes_en_curso = threading.BoundedSemaphore(MAX_CONCURRENT_BATCHES)
+
+# Resoluciones en segundo plano: cada trabajo usa su propio controller,
+# así que pueden correr varios a la vez; más allá de los topes de trabajos
+# sin terminar (en total y por sesión) se responde 429
+jobs = JobManager(max_workers=4, max_pending=32, max_pending_per_owner=4, store=store)
+SSE_POLL_SECONDS = 0.25
+
+
+def _sesion() -> Session:
+    """Sesión del request actual (la crea si la cookie falta o expiró)."""
+    if "sesion" not in g:
+        g.sesion = sessions.get_or_create(request.cookies.get(SESSION_COOKIE))
+    return g.sesion
+
+
+@app.before_request
+def _marcar_inicio():
+    g.inicio_request = perf_counter()
+
+
+@app.after_request
+def _medir_latencia(response):
+    """Latencia por ruta (plantilla de la regla, no la URL, para acotar las series)."""
+    inicio = g.get("inicio_request")
+    if inicio is not None:
+        telemetry.http_request_duration.observe(
+            perf_counter() - inicio,
+            method=request.method,
+            route=request.url_rule.rule if request.url_rule is not None else "sin_ruta",
+            status=response.status_code,
+        )
+    return response
+
+
+GZIP_MIN_BYTES = 512
+GZIP_MIMETYPES = ("application/json", "text/plain")
+
+
+@app.after_request
+def _comprimir(response):
+    """gzip para respuestas JSON/texto si el cliente lo acepta (no aplica a streams)."""
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.mimetype not in GZIP_MIMETYPES
+        or "Content-Encoding" in response.headers
+        or "gzip" not in request.headers.get("Accept-Encoding", "").lower()
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    datos = response.get_data()
+    if len(datos) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(datos, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+@app.after_request
+def _guardar_sesion(response):
+    sesion = g.get("sesion")
+    if sesion is not None:
+        if request.cookies.get(SESSION_COOKIE) != sesion.id:
+            response.set_cookie(SESSION_COOKIE, sesion.id, httponly=True, samesite="Lax")
+        sessions.touch(sesion)
+    return response
 
 
 @app.route("/")
@@ -22,15 +138,78 @@ def index():
 # ---------- GENERAR TABLERO ----------
 @app.route("/api/generate", methods=["GET"])
 def api_generate():
+    """Tablero nuevo para la sesión.
+
+    Desde 12x12 generar tarda segundos: si no hay uno listo en el pool (o
+    se pidió `seed`) responde 202 con un trabajo cuyo resultado es la misma
+    respuesta. `difficulty_met` es False si el tablero quedó con más pistas
+    que el rango de la dificultad pedida.
+    """
     size = int(request.args.get("size", 9))
     difficulty = request.args.get("difficulty", "medio").lower()
-
-    board = controller.generate_puzzle(size, difficulty)
+    seed = request.args.get("seed", type=int)
+
+    if not _pool_calentado.is_set():
+        _pool_calentado.set()
+        puzzle_pool.warm(POOL_WARM_KEYS)
+
+    sesion = _sesion()
+    par = sesion.controller.take_puzzle(size, difficulty, seed, wait=size <= 9)
+    if par is not None:
+        with sesion.lock:
+            sesion.controller.set_puzzle(*par, difficulty)
+            return jsonify(_respuesta_generada(sesion.controller))
+
+    def generar(trabajo: SolveJob) -> dict:
+        # se genera sin el lock de la sesión: sus otros requests no esperan
+        par = sesion.controller.take_puzzle(size, difficulty, seed)
+        with sesion.lock:
+            sesion.controller.set_puzzle(*par, difficulty)
+            respuesta = _respuesta_generada(sesion.controller)
+        sessions.touch(sesion)   # el request ya terminó: se guarda aquí
+        return respuesta
+
+    job = jobs.submit(generar, owner=sesion.id)
+    if job is None:
+        return _demasiados_trabajos()
     return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+    }), 202
+
+
+def _demasiados_trabajos():
+    return jsonify({"error": "Demasiados trabajos en curso; espere a que terminen o cancele alguno."}), 429
+
+
+def _respuesta_generada(controller: SudokuController) -> dict:
+    board = controller.initial_board
+    pistas, minimo, maximo = controller.clue_target()
+    return {
         "size": board.size,
         "grid": board.grid,
-        "difficulty": difficulty,
-    })
+        "difficulty": controller.difficulty,
+        "effort": controller.grade_current().to_dict(),
+        "clues": pistas,
+        "clue_target": [minimo, maximo],
+        "difficulty_met": pistas <= maximo,
+    }
+
+
+# ---------- DIFICULTAD POR ESFUERZO ----------
+@app.route("/api/grade", methods=["POST"])
+def api_grade():
+    data = request.get_json()
+    grid = data.get("grid") if data else None
+    if not grid:
+        return jsonify({"error": "No se recibió tablero."}), 400
+    ga_runs = min(int(data.get("ga_runs", 0)), MAX_GRADE_GA_RUNS)
+    try:
+        effort = default_grades.grade(SudokuBoard.from_list(grid), ga_runs)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(effort.to_dict())
 
 
 # ---------- SUBIR TABLERO DESDE ARCHIVO ----------
@@ -49,10 +228,13 @@ def api_upload_board():
     grid = BoardIO._parse_lines(lines)  # sí, usamos el método interno
     board = SudokuBoard.from_list(grid)
 
-    controller.initial_board = board.copy()
-    controller.current_board = board
-    controller.solution_board = None
-    controller.difficulty = None
+    sesion = _sesion()
+    with sesion.lock:
+        controller = sesion.controller
+        controller.initial_board = board.copy()
+        controller.current_board = board
+        controller.solution_board = None
+        controller.difficulty = None
 
     return jsonify({
         "size": board.size,
@@ -61,7 +243,97 @@ def api_upload_board():
     })
 
 
-# ---------- RESOLVER CON AG ----------
+# ---------- RESOLVER CON AG (trabajos en segundo plano) ----------
+def _serializar_resultado(board: SudokuBoard, metrics, max_points: Optional[int] = None) -> dict:
+    return {
+        "grid": board.grid,
+        "is_valid": Validator.is_valid_solution(board),
+        "metrics": {
+            "final_fitness": metrics.final_fitness,
+            "best_fitness": metrics.best_fitness,
+            "generations": metrics.generations_used,
+            "termination_cause": metrics.termination_cause,
+            "duration_seconds": metrics.duration.total_seconds(),
+            "propagated_cells": metrics.propagated_cells,
+            "restarts": metrics.restarts,
+            "local_search": {
+                "seconds": metrics.local_search_time,
+                "calls": metrics.local_search_calls,
+                "improvements": metrics.local_search_improvements,
+            },
+            "phase_times": metrics.phase_times,
+            "counters": metrics.counters,
+            "profile_stats": metrics.profile_stats,
+            "seed": metrics.seed,
+            # puntos [generación, penalización] en cada cambio (escalera)
+            "fitness_history": {
+                "length": len(metrics.fitness_history),
+                "points": metrics.fitness_history.downsample(max_points),
+            },
+            "islands": [
+                {
+                    "island": isla.island,
+                    "seed": isla.seed,
+                    "best_fitness": isla.best_fitness,
+                    "best_generation": isla.best_generation,
+                    "generations_used": isla.generations_used,
+                    "termination_cause": isla.termination_cause,
+                    "duration_seconds": isla.duration.total_seconds(),
+                    "migrants_sent": isla.migrants_sent,
+                    "migrants_received": isla.migrants_received,
+                }
+                for isla in metrics.islands
+            ],
+        }
+    }
+
+
+def _bool_param(data, nombre: str, default: bool) -> bool:
+    valor = data.get(nombre, default)
+    if isinstance(valor, str):
+        return valor.lower() not in ("0", "false", "no", "")
+    return bool(valor)
+
+
+def _params_desde(data) -> GeneticParams:
+    """GeneticParams a partir del JSON de /api/solve o de los query args de /api/solve_batch.
+
+    El presupuesto de tiempo nunca supera MAX_SOLVE_SECONDS y las islas
+    (un proceso cada una) quedan entre 1 y MAX_ISLANDS.
+    """
+    seed = data.get("seed")
+    time_budget = data.get("time_budget")
+    time_budget = float(time_budget) if time_budget not in (None, "") else MAX_SOLVE_SECONDS
+    return GeneticParams(
+        population_size=int(data.get("population_size", 200)),
+        max_generations=int(data.get("max_generations", 2000)),
+        mutation_rate=float(data.get("mutation_rate", 0.05)),
+        elite_ratio=float(data.get("elite_ratio", 0.1)),
+        engine=data.get("engine", "python"),
+        islands=min(max(1, int(data.get("islands", 1))), MAX_ISLANDS),
+        migration_interval=int(data.get("migration_interval", 50)),
+        migration_size=int(data.get("migration_size", 2)),
+        propagation=_bool_param(data, "propagation", True),
+        seed=int(seed) if seed not in (None, "") else None,
+        stagnation_generations=int(data.get("stagnation_generations", 500)),
+        max_restarts=int(data.get("max_restarts", 0)),
+        min_diversity=float(data.get("min_diversity", 0.0)),
+        diversity_interval=int(data.get("diversity_interval", 10)),
+        stop_on_stagnation=_bool_param(data, "stop_on_stagnation", False),
+        time_budget=min(time_budget, MAX_SOLVE_SECONDS),
+        profile=data.get("profile", "off"),
+        encoding=data.get("encoding", "grid"),
+        selection=data.get("selection", "pool"),
+        tournament_size=int(data.get("tournament_size", 3)),
+        rank_pressure=float(data.get("rank_pressure", 1.5)),
+        local_search=data.get("local_search", "off"),
+        local_search_interval=int(data.get("local_search_interval", 0)),
+        local_search_patience=int(data.get("local_search_patience", 50)),
+        local_search_elites=int(data.get("local_search_elites", 2)),
+        local_search_steps=int(data.get("local_search_steps", 1000)),
+    )
+
+
 @app.route("/api/solve", methods=["POST"])
 def api_solve():
     data = request.get_json()
@@ -70,48 +342,179 @@ def api_solve():
         return jsonify({"error": "No se recibió tablero."}), 400
 
     difficulty = data.get("difficulty", None)
-    pop = int(data.get("population_size", 200))
-    gens = int(data.get("max_generations", 2000))
-    mut = float(data.get("mutation_rate", 0.05))
-    elite = float(data.get("elite_ratio", 0.1))
-
+    max_points = data.get("max_points")
+    max_points = int(max_points) if max_points not in (None, "") else None
     board = SudokuBoard.from_list(grid)
+    params = _params_desde(data)
+
+    sesion = _sesion()
+
+    def resolver(job: SolveJob) -> dict:
+        # Controller propio del trabajo (comparte el historial de la sesión),
+        # para no tener tomado el lock de la sesión durante toda la corrida
+        trabajo = SudokuController(metrics_history=sesion.controller.metrics_history)
+        trabajo.initial_board = board.copy()
+        trabajo.current_board = board
+        trabajo.difficulty = difficulty
+        trabajo.params = params
+
+        metrics = trabajo.run_genetic_solver(
+            on_generation=lambda gen, historial: job.report_progress(historial)
+        )
+        job.report_progress(metrics.fitness_history)
+
+        with sesion.lock:
+            controller = sesion.controller
+            controller.initial_board = trabajo.initial_board
+            controller.current_board = trabajo.current_board
+            controller.solution_board = None
+            controller.difficulty = difficulty
+            controller.params = params
+        sessions.touch(sesion)   # el request ya terminó: se guarda aquí
+        return _serializar_resultado(trabajo.current_board, metrics, max_points)
+
+    job = jobs.submit(resolver, owner=sesion.id)
+    if job is None:
+        return _demasiados_trabajos()
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "events_url": f"/api/jobs/{job.id}/events",
+    }), 202
+
+
+@app.route("/api/solve_batch", methods=["POST"])
+def api_solve_batch():
+    """Resuelve muchos tableros y devuelve NDJSON en orden de término.
+
+    El archivo va como multipart ("file") o como cuerpo crudo; los
+    parámetros del AG van en el query string (más `workers`). Cada línea
+    de respuesta lleva `index`, la posición del tablero en el archivo; un
+    tablero mal formado da `{"index": i, "error": ...}` y el lote sigue.
+
+    `workers` va de 1 a MAX_BATCH_WORKERS (por defecto, el máximo); con
+    MAX_CONCURRENT_BATCHES lotes en curso responde 429.
+    """
+    params = _params_desde(request.args)
+    workers = request.args.get("workers", MAX_BATCH_WORKERS, type=int)
+    if not 1 <= workers <= MAX_BATCH_WORKERS:
+        return jsonify({"error": f"workers debe estar entre 1 y {MAX_BATCH_WORKERS}."}), 400
+    if not _lotes_en_curso.acquire(blocking=False):
+        return jsonify({"error": "Hay demasiados lotes en curso; intente más tarde."}), 429
+    try:
+        archivo = request.files.get("file")
+        if archivo is not None:
+            # Flask cierra los archivos subidos al terminar la vista, antes de
+            # que se consuma la respuesta: se copian a un temporal propio (en disco)
+            fuente = tempfile.TemporaryFile()
+            shutil.copyfileobj(archivo.stream, fuente)
+            fuente.seek(0)
+        else:
+            fuente = request.stream
+        lineas = io.TextIOWrapper(fuente, encoding="utf-8")
+    except Exception:
+        _lotes_en_curso.release()
+        raise
+
+    def stream():
+        try:
+            for resultado in solve_batch(BoardIO.iter_boards(lineas, skip_errors=True), params, workers):
+                yield json.dumps(resultado) + "\n"
+        except ValueError as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            if archivo is not None:
+                lineas.close()
+
+    respuesta = Response(stream_with_context(stream()), mimetype="application/x-ndjson")
+    # se libera al cerrar la respuesta, aunque el stream no se llegue a leer
+    respuesta.call_on_close(_lotes_en_curso.release)
+    return respuesta
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def api_job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo no encontrado."}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/api/jobs/<job_id>", methods=["DELETE"])
+def api_job_cancel(job_id: str):
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo no encontrado."}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def api_job_events(job_id: str):
+    """Server-Sent Events: envía los puntos de fitness a medida que avanzan las generaciones."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo no encontrado."}), 404
+
+    def _evento(nombre: str, payload: dict) -> str:
+        return f"event: {nombre}\ndata: {json.dumps(payload)}\n\n"
+
+    def stream():
+        enviados = 0
+        while True:
+            terminado = job.wait(SSE_POLL_SECONDS)   # si lo corre otro worker, relee la base
+            nuevos = job.history[enviados:]
+            if nuevos:
+                yield _evento("fitness", {"start": enviados, "points": nuevos})
+                enviados += len(nuevos)
+            if terminado:
+                yield _evento(job.status, job.to_dict())
+                return
+            if not nuevos:
+                yield ": keep-alive\n\n"
 
-    # Reutilizamos el controller global, pero con este tablero
-    controller.initial_board = board.copy()
-    controller.current_board = board
-    controller.solution_board = None
-    controller.difficulty = difficulty
-
-    controller.params = GeneticParams(
-        population_size=pop,
-        max_generations=gens,
-        mutation_rate=mut,
-        elite_ratio=elite,
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    metrics = controller.run_genetic_solver()
-    solved_grid = controller.current_board.grid
-    is_valid = Validator.is_valid_solution(controller.current_board)
 
-    return jsonify({
-        "grid": solved_grid,
-        "is_valid": is_valid,
-        "metrics": {
-            "final_fitness": metrics.final_fitness,
-            "best_fitness": metrics.best_fitness,
-            "generations": metrics.generations_used,
-            "termination_cause": metrics.termination_cause,
-            "duration_seconds": metrics.duration.total_seconds(),
-            "fitness_history": metrics.fitness_history,
-        }
-    })
+# ---------- CACHÉ DE SOLUCIONES ----------
+@app.route("/api/cache", methods=["GET"])
+def api_cache():
+    return jsonify(default_cache.stats())
+
+
+# ---------- TELEMETRÍA (formato de texto de Prometheus) ----------
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(telemetry.registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 # ---------- HISTORIAL DE EJECUCIONES ----------
 @app.route("/api/history", methods=["GET"])
 def api_history():
-    runs = controller.get_history()
+    """Ejecuciones de la sesión, más recientes primero.
+
+    Filtros opcionales: size, difficulty, cause, since/until (ISO 8601);
+    paginación con limit/offset. El total filtrado va en X-Total-Count.
+    """
+    try:
+        filtros = {
+            "size": request.args.get("size", type=int),
+            "difficulty": request.args.get("difficulty") or None,
+            "cause": request.args.get("cause") or None,
+            "since": _fecha_param("since"),
+            "until": _fecha_param("until"),
+        }
+    except ValueError:
+        return jsonify({"error": "Fecha inválida (use ISO 8601)."}), 400
+    limit = max(1, min(request.args.get("limit", HISTORY_PAGE_SIZE, type=int), 500))
+    offset = max(0, request.args.get("offset", 0, type=int))
+
+    history = _sesion().controller.metrics_history
+    runs = history.query(limit=limit, offset=offset, newest_first=True, **filtros)
     serialized = []
     for r in runs:
         serialized.append({
@@ -123,23 +526,30 @@ def api_history():
             "generations_used": r.generations_used,
             "termination_cause": r.termination_cause,
         })
-    return jsonify(serialized)
+    response = jsonify(serialized)
+    response.headers["X-Total-Count"] = str(history.count(**filtros))
+    return response
+
+
+def _fecha_param(nombre: str):
+    valor = request.args.get(nombre)
+    return datetime.fromisoformat(valor) if valor else None
 
 
 # ---------- EXPORTAR SOLUCIÓN + MÉTRICAS ----------
 @app.route("/api/export", methods=["GET"])
 def api_export():
-    runs = controller.get_history()
-    if not runs or not controller.current_board:
+    sesion = _sesion()
+    with sesion.lock:
+        last = sesion.controller.last_run()
+        board = sesion.controller.current_board
+    if not last or not board:
         return jsonify({"error": "No hay ejecución ni tablero para exportar."}), 400
 
-    last = runs[-1]
-    board = controller.current_board
-
     lines = []
     lines.append("# TABLERO FINAL")
-    for row in board.grid:
-        lines.append(" ".join(str(v) for v in row))
+    for r in range(board.size):
+        lines.append(" ".join(str(v) for v in board.row(r)))
 
     lines.append("")
     lines.append("# MÉTRICAS")
@@ -155,6 +565,11 @@ def api_export():
     lines.append(f"max_generaciones: {last.params.max_generations}")
     lines.append(f"tasa_mutacion: {last.params.mutation_rate}")
     lines.append(f"elite_ratio: {last.params.elite_ratio}")
+    lines.append(f"motor: {last.params.engine}")
+    lines.append(f"propagacion: {last.params.propagation}")
+    lines.append(f"seleccion: {last.params.selection}")
+    lines.append(f"busqueda_local: {last.params.local_search}")
+    lines.append(f"semilla: {last.seed}")
 
     lines.append("")
     lines.append("# RESULTADOS")
@@ -164,10 +579,39 @@ def api_export():
     lines.append(f"mejor_generacion: {last.best_generation}")
     lines.append(f"generaciones_usadas: {last.generations_used}")
     lines.append(f"causa_termino: {last.termination_cause}")
+    lines.append(f"celdas_propagadas: {last.propagated_cells}")
+    lines.append(f"reinicios: {last.restarts}")
+    if last.local_search_calls:
+        lines.append(
+            f"busqueda_local: {last.local_search_time:.4f} seg, "
+            f"{last.local_search_calls} refinamientos, {last.local_search_improvements} mejoras"
+        )
+
+    if last.phase_times or last.counters:
+        lines.append("")
+        lines.append("# PERFIL")
+        lines.extend(format_profile(last.phase_times, last.counters))
+    if last.profile_stats:
+        lines.append("")
+        lines.append("# CPROFILE")
+        lines.append(last.profile_stats.rstrip())
+
+    if last.islands:
+        lines.append("")
+        lines.append("# ISLAS")
+        for isla in last.islands:
+            lines.append(
+                f"isla {isla.island}: semilla={isla.seed}, mejor_fitness={isla.best_fitness}, "
+                f"generaciones={isla.generations_used}, causa={isla.termination_cause}, "
+                f"duracion={isla.duration.total_seconds():.3f} seg, "
+                f"migrantes_enviados={isla.migrants_sent}, migrantes_recibidos={isla.migrants_received}"
+            )
 
     lines.append("")
-    lines.append("# HISTORIAL FITNESS")
-    lines.append(", ".join(str(x) for x in last.fitness_history))
+    lines.append(
+        f"# HISTORIAL FITNESS (generacion:penalizacion en cada cambio, {len(last.fitness_history)} generaciones)"
+    )
+    lines.append(", ".join(f"{g}:{v}" for g, v in last.fitness_history.change_points()))
 
     content = "\n".join(lines)
 
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import replace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from controller import SudokuController
+from genetic import ENCODINGS, ENGINES, GeneticParams
+from local_search import LOCAL_SEARCH_METHODS
+from selection import SELECTIONS
+from io_board import BoardIO
+from metrics import MetricsHistory
+from sudoku_board import SudokuBoard
+from validator import Validator
+
+
+# ==========================================================
+# Resolución por lotes
+#   - Los tableros se leen de a uno (BoardIO.iter_boards); uno mal
+#     formado da una línea {"index", "error"} y el lote sigue.
+#   - Se reparten en un pool de procesos con un tope de trabajos
+#     en vuelo, así la memoria no depende del tamaño del lote.
+#   - Los resultados salen en orden de término (NDJSON).
+# ==========================================================
+
+_controller: Optional[SudokuController] = None
+
+
+def _controller_del_proceso() -> SudokuController:
+    """Un controller por proceso; su historial (en memoria) se vacía tras cada tablero."""
+    global _controller
+    if _controller is None:
+        _controller = SudokuController(metrics_history=MetricsHistory(":memory:"))
+    return _controller
+
+
+def _resolver_uno(indice: int, grid: List[List[int]], params: GeneticParams) -> Dict[str, Any]:
+    try:
+        controller = _controller_del_proceso()
+        puzzle = SudokuBoard.from_list(grid)
+        controller.initial_board = puzzle
+        controller.current_board = puzzle.copy()
+        controller.difficulty = None
+        controller.params = params
+        metrics = controller.run_genetic_solver()
+        controller.metrics_history.clear()
+        board = controller.current_board
+        return {
+            "index": indice,
+            "grid": board.grid,
+            "is_valid": 0 not in board.cells and Validator.is_valid_solution(board),
+            "final_fitness": metrics.final_fitness,
+            "generations": metrics.generations_used,
+            "termination_cause": metrics.termination_cause,
+            "duration_seconds": metrics.duration.total_seconds(),
+            "propagated_cells": metrics.propagated_cells,
+            "restarts": metrics.restarts,
+            "local_search_seconds": metrics.local_search_time,
+            "seed": metrics.seed,
+        }
+    except Exception as e:
+        return {"index": indice, "error": str(e)}
+
+
+def solve_batch(
+    grids: Iterable[Union[List[List[int]], ValueError]],
+    params: GeneticParams,
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Resuelve cada tablero de `grids` y va entregando resultados al terminar.
+
+    Con `params.seed` fijo, el tablero i usa la semilla `seed + i`. Cada
+    tablero corre en un solo proceso (islands=1): el paralelismo es entre
+    tableros. Un ValueError en lugar de un tablero (ver
+    `BoardIO.iter_boards(..., skip_errors=True)`) sale como
+    `{"index": i, "error": ...}` sin detener el lote.
+
+    Sin `workers` se usa un proceso por CPU; menos de 1 es un ValueError.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError(f"workers debe ser al menos 1 (se recibió {workers})")
+    max_in_flight = max_in_flight or 2 * workers
+    params = replace(params, islands=1)
+
+    entrada = enumerate(grids)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context()) as pool:
+        en_vuelo = set()
+        agotada = False
+        while True:
+            while not agotada and len(en_vuelo) < max_in_flight:
+                siguiente = next(entrada, None)
+                if siguiente is None:
+                    agotada = True
+                    break
+                i, grid = siguiente
+                if isinstance(grid, ValueError):
+                    yield {"index": i, "error": str(grid)}
+                    continue
+                semilla = params.seed + i if params.seed is not None else None
+                en_vuelo.add(pool.submit(_resolver_uno, i, grid, replace(params, seed=semilla)))
+            if not en_vuelo:
+                return
+            listos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                yield futuro.result()
+
+
+def write_ndjson(results: Iterable[Dict[str, Any]], out: TextIO) -> int:
+    n = 0
+    for res in results:
+        out.write(json.dumps(res) + "\n")
+        out.flush()
+        n += 1
+    return n
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Resuelve un archivo con muchos tableros (salida NDJSON).")
+    parser.add_argument("path", help="archivo de tableros ('-' para stdin)")
+    parser.add_argument("--out", default="-", help="archivo NDJSON de salida ('-' para stdout)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--engine", choices=ENGINES, default="python")
+    parser.add_argument("--encoding", choices=ENCODINGS, default="grid", help="cromosoma del motor python")
+    parser.add_argument("--population", type=int, default=200)
+    parser.add_argument("--generations", type=int, default=2000)
+    parser.add_argument("--mutation", type=float, default=0.05)
+    parser.add_argument("--elite", type=float, default=0.1)
+    parser.add_argument("--no-propagation", action="store_true")
+    parser.add_argument("--max-restarts", type=int, default=0)
+    parser.add_argument("--selection", choices=SELECTIONS, default="pool", help="selección de padres")
+    parser.add_argument("--tournament-size", type=int, default=3)
+    parser.add_argument("--local-search", choices=LOCAL_SEARCH_METHODS, default="off", help="refinamiento de la élite")
+    parser.add_argument("--local-search-interval", type=int, default=0, help="generaciones entre refinamientos (0 = sólo al estancarse)")
+    parser.add_argument("--time-budget", type=float, default=None, help="segundos por tablero")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
+
+    params = GeneticParams(
+        population_size=args.population,
+        max_generations=args.generations,
+        mutation_rate=args.mutation,
+        elite_ratio=args.elite,
+        engine=args.engine,
+        encoding=args.encoding,
+        propagation=not args.no_propagation,
+        max_restarts=args.max_restarts,
+        selection=args.selection,
+        tournament_size=args.tournament_size,
+        local_search=args.local_search,
+        local_search_interval=args.local_search_interval,
+        time_budget=args.time_budget,
+        seed=args.seed,
+    )
+    entrada = sys.stdin if args.path == "-" else open(args.path, "r", encoding="utf-8")
+    salida = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        n = write_ndjson(solve_batch(BoardIO.iter_boards(entrada, skip_errors=True), params, args.workers), salida)
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout:
+            salida.close()
+    print(f"{n} tableros procesados", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
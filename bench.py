@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import random
+import sys
+import time
+from dataclasses import asdict, replace
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage, no se informa RSS
+    resource = None
+
+from controller import SudokuController
+from genetic import ENGINES, GeneticParams
+from metrics import MetricsHistory
+from sudoku_board import SudokuBoard
+
+
+# ==========================================================
+# Benchmark reproducible de motores (rendimiento y calidad)
+#   python bench.py --json bench.json --csv bench.csv
+#   python bench.py --baseline bench.json    (falla si hay regresión)
+# ==========================================================
+
+DIFFICULTIES = ("facil", "medio", "dificil")
+
+
+def _peak_rss_kib() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss   # macOS informa bytes
+
+
+def available_engines() -> List[str]:
+    engines = []
+    for name in ENGINES:
+        if name == "numpy":
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                continue
+        engines.append(name)
+    return engines
+
+
+def build_corpus(
+    sizes: List[int],
+    difficulties: List[str],
+    per_tier: int,
+    seed: int,
+) -> List[Tuple[int, str, SudokuBoard]]:
+    """Tableros fijos para una semilla dada: (tamaño, dificultad, tablero)."""
+    rng = random.Random(seed)
+    controller = SudokuController()
+    corpus = []
+    for size in sizes:
+        for difficulty in difficulties:
+            for _ in range(per_tier):
+                puzzle = controller.generate_puzzle(size, difficulty, rng.randrange(2 ** 32))
+                corpus.append((size, difficulty, puzzle))
+    return corpus
+
+
+def param_matrix(args: argparse.Namespace, engine: str) -> List[GeneticParams]:
+    if engine == "exact":
+        return [GeneticParams(engine="exact")]
+    return [
+        GeneticParams(
+            population_size=pop,
+            max_generations=args.max_generations,
+            mutation_rate=mut,
+            engine=engine,
+        )
+        for pop, mut in itertools.product(args.populations, args.mutation_rates)
+    ]
+
+
+def run_group(
+    corpus: List[Tuple[int, str, SudokuBoard]],
+    params: GeneticParams,
+    seed: int,
+) -> List[Dict]:
+    """Corre `params` sobre todo el corpus y agrega por (tamaño, dificultad)."""
+    grupos: Dict[Tuple[int, str], Dict] = {}
+    historial = MetricsHistory(":memory:")   # las corridas del benchmark no se persisten
+    for i, (size, difficulty, puzzle) in enumerate(corpus):
+        # sin caché de soluciones: cada corrida tiene que resolver de verdad
+        controller = SudokuController(metrics_history=historial, solution_cache=None)
+        controller.initial_board = puzzle.copy()
+        controller.current_board = puzzle.copy()
+        controller.difficulty = difficulty
+        controller.params = replace(params, seed=seed + i)
+
+        inicio = time.perf_counter()
+        metrics = controller.run_genetic_solver()
+        segundos = time.perf_counter() - inicio
+
+        g = grupos.setdefault((size, difficulty), {
+            "runs": 0, "solved": 0, "seconds": 0.0, "solve_seconds": 0.0,
+            "generations": 0, "evaluations": 0,
+        })
+        g["runs"] += 1
+        g["seconds"] += segundos
+        g["generations"] += metrics.generations_used
+        # el motor exacto informa nodos en lugar de generaciones
+        if params.engine == "exact":
+            g["evaluations"] += metrics.generations_used
+        else:
+            g["evaluations"] += metrics.generations_used * params.population_size
+        if metrics.final_fitness == 0:
+            g["solved"] += 1
+            g["solve_seconds"] += segundos
+
+    filas = []
+    for (size, difficulty), g in grupos.items():
+        filas.append({
+            "engine": params.engine,
+            "population_size": params.population_size,
+            "mutation_rate": params.mutation_rate,
+            "max_generations": params.max_generations,
+            "size": size,
+            "difficulty": difficulty,
+            "runs": g["runs"],
+            "total_seconds": g["seconds"],
+            "success_rate": g["solved"] / g["runs"],
+            "mean_time_to_solution": g["solve_seconds"] / g["solved"] if g["solved"] else None,
+            "generations_per_sec": g["generations"] / g["seconds"] if g["seconds"] else 0.0,
+            "evaluations_per_sec": g["evaluations"] / g["seconds"] if g["seconds"] else 0.0,
+            "peak_rss_kib": _peak_rss_kib(),
+        })
+    return filas
+
+
+def _clave(fila: Dict) -> Tuple:
+    return (
+        fila["engine"], fila["population_size"], fila["mutation_rate"],
+        fila["max_generations"], fila["size"], fila["difficulty"],
+    )
+
+
+def compare(
+    resultados: List[Dict],
+    baseline: List[Dict],
+    tolerance: float,
+    min_seconds: float = 0.05,
+) -> List[str]:
+    """Lista de regresiones respecto a la línea base (vacía si no hay).
+
+    Los tiempos sólo se comparan en grupos que en la línea base tardaron al
+    menos `min_seconds`: por debajo de eso domina el ruido de medición.
+    """
+    base = {_clave(f): f for f in baseline}
+    regresiones = []
+    for fila in resultados:
+        ref = base.get(_clave(fila))
+        if ref is None:
+            continue
+        nombre = "/".join(str(x) for x in _clave(fila))
+        if fila["success_rate"] < ref["success_rate"] - tolerance:
+            regresiones.append(
+                f"{nombre}: success_rate {ref['success_rate']:.2f} -> {fila['success_rate']:.2f}"
+            )
+        if ref["total_seconds"] < min_seconds:
+            continue
+        if ref["evaluations_per_sec"] and fila["evaluations_per_sec"] < ref["evaluations_per_sec"] * (1 - tolerance):
+            regresiones.append(
+                f"{nombre}: evaluations_per_sec {ref['evaluations_per_sec']:.0f} -> {fila['evaluations_per_sec']:.0f}"
+            )
+        t_ref, t_act = ref["mean_time_to_solution"], fila["mean_time_to_solution"]
+        if t_ref and t_act and t_act > t_ref * (1 + tolerance):
+            regresiones.append(f"{nombre}: mean_time_to_solution {t_ref:.3f}s -> {t_act:.3f}s")
+    return regresiones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de motores de resolución de Sudoku.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 6, 9])
+    parser.add_argument("--difficulties", nargs="+", default=list(DIFFICULTIES))
+    parser.add_argument("--per-tier", type=int, default=2, help="tableros por (tamaño, dificultad)")
+    parser.add_argument("--engines", nargs="+", default=None, help="por defecto, todos los disponibles")
+    parser.add_argument("--populations", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--mutation-rates", type=float, nargs="+", default=[0.05, 0.1])
+    parser.add_argument("--max-generations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=12345)
+    parser.add_argument("--json", help="ruta de salida JSON")
+    parser.add_argument("--csv", help="ruta de salida CSV")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="margen de regresión admitido (fracción)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="no comparar tiempos de grupos más rápidos que esto")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.sizes, args.difficulties, args.per_tier, args.seed)
+    resultados: List[Dict] = []
+    for engine in args.engines or available_engines():
+        for params in param_matrix(args, engine):
+            filas = run_group(corpus, params, args.seed)
+            resultados.extend(filas)
+            for f in filas:
+                print(
+                    f"{f['engine']:6} pop={f['population_size']:<4} mut={f['mutation_rate']:<5} "
+                    f"{f['size']}x{f['size']} {f['difficulty']:8} exito={f['success_rate']:.2f} "
+                    f"eval/s={f['evaluations_per_sec']:.0f}"
+                )
+
+    informe = {
+        "seed": args.seed,
+        "corpus": {"sizes": args.sizes, "difficulties": args.difficulties, "per_tier": args.per_tier},
+        "params": asdict(GeneticParams(max_generations=args.max_generations)),
+        "results": resultados,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2)
+    if args.csv and resultados:
+        with open(args.csv, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(resultados[0].keys()))
+            writer.writeheader()
+            writer.writerows(resultados)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regresiones = compare(resultados, baseline, args.tolerance, args.min_seconds)
+        if regresiones:
+            print("\nRegresiones respecto a la línea base:")
+            for r in regresiones:
+                print(f"  - {r}")
+            return 1
+        print("\nSin regresiones respecto a la línea base.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
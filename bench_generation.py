@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import genetic
+from controller import SudokuController
+from genetic import GeneticEngine, GeneticParams
+
+
+# ==========================================================
+# Benchmark de asignaciones por generación del GA (motor "python")
+#   - Copias de individuos y de tableros por generación.
+#   - Memoria transitoria asignada por generación (pico tracemalloc).
+# ==========================================================
+
+def medir(size: int, difficulty: str, population: int, generations: int, seed: int) -> dict:
+    puzzle = SudokuController().generate_puzzle(size, difficulty, seed)
+    params = GeneticParams(population_size=population, max_generations=generations, seed=seed)
+    engine = GeneticEngine(puzzle, params)
+
+    contadores = {"individuos": 0, "tableros": 0}
+    copiar_individuo = genetic._Individuo.copiar
+    copiar_tablero = genetic._copiar_tablero
+
+    def contar_individuo(self):
+        contadores["individuos"] += 1
+        return copiar_individuo(self)
+
+    def contar_tablero(tablero):
+        contadores["tableros"] += 1
+        return copiar_tablero(tablero)
+
+    picos = []
+
+    def por_generacion(gen: int) -> bool:
+        actual, pico = tracemalloc.get_traced_memory()
+        picos.append(pico - actual)
+        tracemalloc.reset_peak()
+        return False
+
+    engine.on_generation = por_generacion
+    genetic._Individuo.copiar = contar_individuo
+    genetic._copiar_tablero = contar_tablero
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        _, gens, causa = engine.run()
+    finally:
+        duracion = time.perf_counter() - inicio
+        tracemalloc.stop()
+        genetic._Individuo.copiar = copiar_individuo
+        genetic._copiar_tablero = copiar_tablero
+
+    return {
+        "generaciones": gens,
+        "causa": causa,
+        "copias_individuo_por_gen": contadores["individuos"] / gens,
+        "copias_tablero_por_gen": contadores["tableros"] / gens,
+        "kib_transitorios_por_gen": sum(picos) / max(1, len(picos)) / 1024,
+        "ms_por_gen": duracion * 1000 / gens,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Asignaciones por generación del GA.")
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--difficulty", default="dificil")
+    parser.add_argument("--population", type=int, default=200)
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    res = medir(args.size, args.difficulty, args.population, args.generations, args.seed)
+    for clave, valor in res.items():
+        print(f"{clave}: {valor:.2f}" if isinstance(valor, float) else f"{clave}: {valor}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,51 @@
 from __future__ import annotations
 
 import random
+from dataclasses import replace
 from datetime import datetime
-from typing import Optional, Tuple, List
+from time import perf_counter
+from typing import Callable, Optional, Tuple, List
 
 from sudoku_board import SudokuBoard
 from validator import Validator
-from genetic import GeneticEngine, GeneticParams
-from metrics import MetricsHistory, RunMetrics
+from genetic import GeneticParams, create_engine
+from metrics import FitnessHistory, MetricsHistory, RunMetrics
 from io_board import BoardIO
+from propagation import propagate
+from solution_cache import SolutionCache, default_cache
+from generator import PuzzlePool, base_solution, remove_clues, shuffle_solution
+from grading import Effort, band_distance, default_grades
+from profiling import PROFILE_MODES, PhaseProfiler, run_with_cprofile
+import telemetry
 
 
 class SudokuController:
+    # pistas con las que se empieza a buscar cada dificultad; la dificultad
+    # final la decide el esfuerzo medido (ver grading.py)
     DIFFICULTY_RANGES_9X9 = {
         "facil": (36, 40),
         "medio": (28, 32),
         "dificil": (22, 26),
     }
+    GRADING_ATTEMPTS = 12   # tableros a probar hasta caer en la banda de esfuerzo
 
-    def __init__(self):
+    def __init__(
+        self,
+        metrics_history: Optional[MetricsHistory] = None,
+        solution_cache: Optional[SolutionCache] = default_cache,
+        puzzle_pool: Optional[PuzzlePool] = None,
+    ):
         self.current_board: Optional[SudokuBoard] = None
         self.initial_board: Optional[SudokuBoard] = None
         self.solution_board: Optional[SudokuBoard] = None
         self.difficulty: Optional[str] = None
         self.params = GeneticParams()
-        self.metrics_history = MetricsHistory()
+        # se puede compartir: varios controllers registrando en el mismo historial
+        self.metrics_history = metrics_history if metrics_history is not None else MetricsHistory()
+        # None desactiva la caché de soluciones
+        self.solution_cache = solution_cache
+        # None: cada tablero se genera en el momento
+        self.puzzle_pool = puzzle_pool
 
     # ---------- utilidades internas ----------
     @staticmethod
@@ -42,104 +63,80 @@ class SudokuController:
         max_size = max(min_size, round(ratio_max * total))
         return min_size, max_size
 
-    @staticmethod
-    def _base_solved_board(size: int) -> SudokuBoard:
-        """Devuelve un tablero completo válido para el tamaño dado."""
-        if size == 4:
-            base = [
-                [1, 2, 3, 4],
-                [3, 4, 1, 2],
-                [2, 1, 4, 3],
-                [4, 3, 2, 1],
-            ]
-        elif size == 6:
-            base = [
-                [1, 2, 3, 4, 5, 6],
-                [4, 5, 6, 1, 2, 3],
-                [2, 3, 4, 5, 6, 1],
-                [5, 6, 1, 2, 3, 4],
-                [3, 4, 5, 6, 1, 2],
-                [6, 1, 2, 3, 4, 5],
-            ]
-        elif size == 9:
-            base = [
-                [1, 2, 3, 4, 5, 6, 7, 8, 9],
-                [4, 5, 6, 7, 8, 9, 1, 2, 3],
-                [7, 8, 9, 1, 2, 3, 4, 5, 6],
-                [2, 3, 4, 5, 6, 7, 8, 9, 1],
-                [5, 6, 7, 8, 9, 1, 2, 3, 4],
-                [8, 9, 1, 2, 3, 4, 5, 6, 7],
-                [3, 4, 5, 6, 7, 8, 9, 1, 2],
-                [6, 7, 8, 9, 1, 2, 3, 4, 5],
-                [9, 1, 2, 3, 4, 5, 6, 7, 8],
-            ]
-        else:
-            raise ValueError("Tamaño no soportado")
-        return SudokuBoard.from_list(base)
-
-    @staticmethod
-    def _shuffle_board(board: SudokuBoard) -> SudokuBoard:
-        """Aplica permutaciones válidas para obtener un tablero distinto pero correcto."""
-        size = board.size
-        b = board.copy()
-
-        sg_r, sg_c = b.subgrid_size()
-
-        # permutar filas dentro de cada bloque de subcuadrícula vertical
-        for block in range(0, size, sg_r):
-            rows = list(range(block, block + sg_r))
-            random.shuffle(rows)
-            tmp = [b.grid[r][:] for r in rows]
-            for i, r in enumerate(range(block, block + sg_r)):
-                b.grid[r] = tmp[i]
-
-        # permutar columnas dentro de cada bloque de subcuadrícula horizontal
-        for block in range(0, size, sg_c):
-            cols = list(range(block, block + sg_c))
-            random.shuffle(cols)
-            for r in range(size):
-                row = b.grid[r]
-                tmp = [row[c] for c in cols]
-                for i, c in enumerate(range(block, block + sg_c)):
-                    row[c] = tmp[i]
-
-        # permutar símbolos (1..size)
-        mapping = list(range(1, size + 1))
-        random.shuffle(mapping)
-        mapping_dict = {i + 1: mapping[i] for i in range(size)}
-        for r in range(size):
-            for c in range(size):
-                v = b.grid[r][c]
-                if v != 0:
-                    b.grid[r][c] = mapping_dict[v]
-
-        return b
-
     # ---------- API de generación ----------
-    def generate_puzzle(self, size: int, difficulty: str) -> SudokuBoard:
-        base = self._base_solved_board(size)
-        solution = self._shuffle_board(base)
-        min_clues, max_clues = self._compute_difficulty_range(size, difficulty)
-        total_cells = size * size
-        num_clues = random.randint(min_clues, max_clues)
-
-        puzzle_grid = [row[:] for row in solution.grid]
-        positions = [(r, c) for r in range(size) for c in range(size)]
-        random.shuffle(positions)
-        cells_to_remove = total_cells - num_clues
-        for (r, c) in positions:
-            if cells_to_remove <= 0:
+    @classmethod
+    def build_puzzle(cls, size: int, difficulty: str, rng: random.Random) -> Tuple[SudokuBoard, SudokuBoard]:
+        """(puzzle con solución única, solución) cuyo esfuerzo cae en la banda de `difficulty`.
+
+        Prueba hasta GRADING_ATTEMPTS tableros; si ninguno cae en la banda
+        (p. ej. un 4x4 "dificil", que siempre sale por propagación) devuelve
+        el más cercano. Los tableros de más de 9x9 tardan segundos en
+        generarse y las bandas están calibradas en 9x9: se genera uno solo.
+        """
+        min_clues, max_clues = cls._compute_difficulty_range(size, difficulty)
+        mejor = None
+        for _ in range(cls.GRADING_ATTEMPTS if size <= 9 else 1):
+            solution = shuffle_solution(base_solution(size), rng)
+            puzzle = remove_clues(solution, rng.randint(min_clues, max_clues), rng)
+            distancia = band_distance(default_grades.grade(puzzle).score, difficulty.lower())
+            if mejor is None or distancia < mejor[0]:
+                mejor = (distancia, puzzle, solution)
+            if distancia == 0:
                 break
-            puzzle_grid[r][c] = 0
-            cells_to_remove -= 1
+        return mejor[1], mejor[2]
+
+    def generate_puzzle(self, size: int, difficulty: str, seed: Optional[int] = None) -> SudokuBoard:
+        """Genera un tablero con solución única; con `seed` el resultado es reproducible.
+
+        Sin semilla, y si el controller tiene un PuzzlePool, el tablero sale
+        del pool ya generado.
+        """
+        puzzle, solution = self.take_puzzle(size, difficulty, seed)
+        return self.set_puzzle(puzzle, solution, difficulty)
 
-        puzzle = SudokuBoard.from_list(puzzle_grid)
+    def take_puzzle(
+        self, size: int, difficulty: str, seed: Optional[int] = None, wait: bool = True
+    ) -> Optional[Tuple[SudokuBoard, SudokuBoard]]:
+        """(puzzle, solución) como en `generate_puzzle`, sin cambiar el estado del controller.
+
+        Con `wait=False` sólo sirve un tablero ya listo en el pool: si
+        habría que generarlo, devuelve None.
+        """
+        difficulty = difficulty.lower()
+        if seed is None and self.puzzle_pool is not None:
+            return self.puzzle_pool.take(size, difficulty, generate=wait)
+        if not wait:
+            return None
+        return self.build_puzzle(size, difficulty, random.Random(seed))
+
+    def set_puzzle(self, puzzle: SudokuBoard, solution: SudokuBoard, difficulty: str) -> SudokuBoard:
+        """Instala un tablero generado (de `take_puzzle`) como tablero actual."""
+        difficulty = difficulty.lower()
         self.initial_board = puzzle.copy()
         self.current_board = puzzle
         self.solution_board = solution
-        self.difficulty = difficulty.lower()
+        self.difficulty = difficulty
         return puzzle
 
+    def clue_target(self) -> Tuple[int, int, int]:
+        """(pistas del tablero inicial, mínimo, máximo del rango de su dificultad).
+
+        Desde 12x12 la prueba de unicidad tiene un tope de nodos y quitar
+        pistas se detiene antes: un 25x25 no baja de ~290 pistas, así que
+        "medio" y "dificil" quedan por encima de su rango.
+        """
+        if not self.initial_board or self.difficulty is None:
+            raise RuntimeError("No hay tablero generado")
+        pistas = sum(1 for v in self.initial_board.cells if v != 0)
+        minimo, maximo = self._compute_difficulty_range(self.initial_board.size, self.difficulty)
+        return pistas, minimo, maximo
+
+    def grade_current(self, ga_runs: int = 0) -> Effort:
+        """Esfuerzo estimado para resolver el tablero inicial (cacheado por forma canónica)."""
+        if not self.initial_board:
+            raise RuntimeError("No hay tablero inicial")
+        return default_grades.grade(self.initial_board, ga_runs)
+
     # ---------- API de carga/guardado ----------
     def load_board_from_file(self, path: str) -> SudokuBoard:
         board = BoardIO.load_board(path)
@@ -166,20 +163,97 @@ class SudokuController:
             raise RuntimeError("No hay tablero cargado")
         if not Validator.is_move_valid(self.current_board, row, col, value):
             return False
-        if value == 0:
-            self.current_board.grid[row][col] = 0
-        else:
-            self.current_board.set_value(row, col, value)
+        self.current_board.set_value(row, col, value)
         return True
 
     # ---------- Ejecución del AG ----------
-    def run_genetic_solver(self) -> RunMetrics:
+    def run_genetic_solver(
+        self,
+        on_generation: Optional[Callable[[int, List[int]], bool]] = None,
+    ) -> RunMetrics:
+        """Ejecuta el AG sobre el tablero inicial.
+
+        Si `params.propagation` está activo, antes del AG se asignan las
+        casillas forzadas (que pasan a ser pistas fijas para el AG); si eso
+        basta para resolver, la ejecución termina con causa "propagacion".
+
+        `on_generation(gen, historial)` se llama tras cada generación con el
+        historial de penalización acumulado; si devuelve True el AG se detiene.
+
+        Si el tablero (o una variante simétrica) ya se resolvió, la solución
+        sale de la caché y la ejecución termina con causa "cache".
+        """
         if not self.initial_board:
             raise RuntimeError("No hay tablero inicial para resolver")
-        engine = GeneticEngine(self.initial_board, self.params)
+        telemetry.solves_in_flight.inc()
+        try:
+            return self._ejecutar_ag(on_generation)
+        finally:
+            telemetry.solves_in_flight.dec()
+
+    def _ejecutar_ag(self, on_generation) -> RunMetrics:
         start = datetime.now()
         initial_fitness = Validator.fitness_penalty(self.initial_board)
-        best_board, generations_used, cause = engine.run()
+
+        # toda ejecución queda con semilla registrada para poder repetirla
+        seed = self.params.seed if self.params.seed is not None else random.SystemRandom().randrange(2 ** 32)
+        params = replace(self.params, seed=seed)
+        if params.profile not in PROFILE_MODES:
+            raise ValueError(f"Modo de perfilado inválido: {params.profile}. Use: {', '.join(PROFILE_MODES)}.")
+        profiler = PhaseProfiler() if params.profile != "off" else None
+        profile_stats = None
+        local_search = (0.0, 0, 0)   # segundos, refinamientos y mejoras de la etapa memética
+
+        cached = self.solution_cache.get(self.initial_board) if self.solution_cache is not None else None
+        if self.solution_cache is not None:
+            telemetry.solution_cache_lookups.inc(result="hit" if cached is not None else "miss")
+        t0 = perf_counter()
+        prop = propagate(self.initial_board) if params.propagation and cached is None else None
+        propagated = prop.assigned if prop is not None and not prop.contradiction else 0
+        if profiler is not None and prop is not None:
+            profiler.lap("propagacion", t0)
+
+        if cached is not None:
+            best_board = cached
+            generations_used, cause = 0, "cache"
+            best_fitness, best_generation = 0, 0
+            fitness_history, islands, restarts = [], [], 0
+        elif prop is not None and prop.solved:
+            best_board = SudokuBoard.from_list(prop.grid)
+            generations_used, cause = 0, "propagacion"
+            best_fitness, best_generation = 0, 0
+            fitness_history, islands, restarts = [], [], 0
+        else:
+            ga_board, candidates = self.initial_board, None
+            if propagated:
+                ga_board, candidates = SudokuBoard.from_list(prop.grid), prop.candidates
+
+            engine = create_engine(ga_board, params, candidates)
+            if on_generation is not None:
+                engine.on_generation = lambda gen: on_generation(gen, engine.best_fitness_history)
+            if profiler is not None and hasattr(engine, "profiler"):
+                engine.profiler = profiler   # sólo el motor "python" mide por fase
+            t_ag = perf_counter()
+            if params.profile == "cprofile":
+                (best_board, generations_used, cause), profile_stats = run_with_cprofile(engine.run)
+            else:
+                best_board, generations_used, cause = engine.run()
+            t_ag = perf_counter() - t_ag
+            # el motor "exact" no tiene generaciones: su contador no es comparable
+            if generations_used and params.engine != "exact":
+                telemetry.ga_generations_total.inc(generations_used, engine=params.engine)
+                if t_ag > 0:
+                    telemetry.ga_generations_per_second.observe(generations_used / t_ag, engine=params.engine)
+            best_fitness, best_generation = engine.best_fitness, engine.best_generation
+            fitness_history = FitnessHistory(engine.best_fitness_history)
+            islands = list(getattr(engine, "island_metrics", []))
+            restarts = getattr(engine, "restarts", 0)
+            local_search = (
+                getattr(engine, "local_search_time", 0.0),
+                getattr(engine, "local_search_calls", 0),
+                getattr(engine, "local_search_improvements", 0),
+            )
+
         end = datetime.now()
         duration = end - start
 
@@ -188,20 +262,48 @@ class SudokuController:
 
         final_fitness = Validator.fitness_penalty(best_board)
         self.current_board = best_board.copy()
+        if self.solution_cache is not None and cached is None and final_fitness == 0:
+            self.solution_cache.put(self.initial_board, best_board)
+
+        size = self.initial_board.size
+        # la dificultad puede venir del cliente sin validar: fuera de las
+        # conocidas se agrupa en "other" para acotar las series de la etiqueta
+        if self.difficulty is None:
+            etiqueta = "none"
+        elif isinstance(self.difficulty, str) and self.difficulty in self.DIFFICULTY_RANGES_9X9:
+            etiqueta = self.difficulty
+        else:
+            etiqueta = "other"
+        telemetry.solves_total.inc(
+            size=size,
+            difficulty=etiqueta,
+            result="solved" if final_fitness == 0 else "unsolved",
+        )
+        telemetry.solve_duration.observe(duration.total_seconds(), size=size, engine=params.engine)
 
         metrics = self.metrics_history.add_run(
             start_time=start,
             duration=duration,
             board_size=self.initial_board.size,
             difficulty=self.difficulty,
-            params=self.params,
+            params=params,
             initial_fitness=initial_fitness,
             final_fitness=final_fitness,
-            best_fitness=engine.best_fitness if engine.best_fitness is not None else final_fitness,
-            best_generation=engine.best_generation,
+            best_fitness=best_fitness if best_fitness is not None else final_fitness,
+            best_generation=best_generation,
             generations_used=generations_used,
             termination_cause=cause,
-            fitness_history=list(engine.best_fitness_history),
+            fitness_history=fitness_history,
+            islands=islands,
+            propagated_cells=propagated,
+            seed=seed,
+            restarts=restarts,
+            phase_times=dict(profiler.times) if profiler is not None else {},
+            counters=dict(profiler.counters) if profiler is not None else {},
+            profile_stats=profile_stats,
+            local_search_time=local_search[0],
+            local_search_calls=local_search[1],
+            local_search_improvements=local_search[2],
         )
         return metrics
 
@@ -209,5 +311,12 @@ class SudokuController:
     def get_history(self) -> List[RunMetrics]:
         return self.metrics_history.list_runs()
 
+    def query_history(self, **filters) -> List[RunMetrics]:
+        """Filtros y paginación de MetricsHistory.query (size, difficulty, cause, since, until, limit, offset)."""
+        return self.metrics_history.query(**filters)
+
+    def last_run(self) -> Optional[RunMetrics]:
+        return self.metrics_history.last_run()
+
     def clear_history(self) -> None:
         self.metrics_history.clear()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, List, Optional, Set, Tuple
+
+from sudoku_board import SudokuBoard
+from validator import Validator
+
+
+# ==========================================================
+# Solver exacto: backtracking con candidatos en bitmask
+#   - Bit (v - 1) encendido = valor v ya usado en la unidad.
+#   - Elige siempre la casilla con menos candidatos (MRV).
+# ==========================================================
+
+# cantidad de bits encendidos (int.bit_count existe desde Python 3.10)
+_popcount = getattr(int, "bit_count", None) or (lambda m: bin(m).count("1"))
+
+# cada cuántos nodos se consulta `stop` (reloj y cancelación)
+STOP_CHECK_NODES = 1024
+
+
+def solve_exact(
+    grid: List[List[int]],
+    sg_r: int,
+    sg_c: int,
+    max_solutions: int = 1,
+    max_nodes: Optional[int] = None,
+    stop: Optional[Callable[[int], bool]] = None,
+) -> Tuple[List[List[List[int]]], int]:
+    """Busca hasta `max_solutions` soluciones del tablero.
+
+    Devuelve (soluciones encontradas, nodos expandidos). Si las pistas ya
+    se contradicen no hay soluciones y no se expande ningún nodo. Con
+    `max_nodes` la búsqueda se corta al superarlo (nodos > max_nodes
+    indica que el resultado está incompleto). `stop(nodos)` se consulta
+    cada STOP_CHECK_NODES nodos; si devuelve True la búsqueda se corta
+    (el resultado también queda incompleto).
+    """
+    size = len(grid)
+    completo = (1 << size) - 1
+    bloques_por_fila = size // sg_c
+
+    filas = [0] * size
+    columnas = [0] * size
+    bloques = [0] * size
+    tablero = [row[:] for row in grid]
+    pendientes: List[Tuple[int, int, int]] = []
+
+    for r in range(size):
+        for c in range(size):
+            b = (r // sg_r) * bloques_por_fila + (c // sg_c)
+            v = tablero[r][c]
+            if v == 0:
+                pendientes.append((r, c, b))
+                continue
+            bit = 1 << (v - 1)
+            if (filas[r] | columnas[c] | bloques[b]) & bit:
+                return [], 0
+            filas[r] |= bit
+            columnas[c] |= bit
+            bloques[b] |= bit
+
+    soluciones: List[List[List[int]]] = []
+    nodos = 0
+    total = len(pendientes)
+
+    def buscar(k: int) -> bool:
+        nonlocal nodos
+        nodos += 1
+        if max_nodes is not None and nodos > max_nodes:
+            return True
+        if stop is not None and nodos % STOP_CHECK_NODES == 0 and stop(nodos):
+            return True
+        if k == total:
+            soluciones.append([row[:] for row in tablero])
+            return len(soluciones) >= max_solutions
+
+        # MRV: la casilla pendiente con menos candidatos
+        mejor_i, mejor_n, mejor_m = k, size + 1, 0
+        for i in range(k, total):
+            r, c, b = pendientes[i]
+            m = completo & ~(filas[r] | columnas[c] | bloques[b])
+            n = _popcount(m)
+            if n < mejor_n:
+                mejor_i, mejor_n, mejor_m = i, n, m
+                if n <= 1:
+                    break
+        if mejor_n == 0:
+            return False
+
+        pendientes[k], pendientes[mejor_i] = pendientes[mejor_i], pendientes[k]
+        r, c, b = pendientes[k]
+        m = mejor_m
+        while m:
+            bit = m & -m
+            m ^= bit
+            filas[r] |= bit
+            columnas[c] |= bit
+            bloques[b] |= bit
+            tablero[r][c] = bit.bit_length()
+            if buscar(k + 1):
+                return True
+            filas[r] ^= bit
+            columnas[c] ^= bit
+            bloques[b] ^= bit
+        tablero[r][c] = 0
+        return False
+
+    buscar(0)
+    return soluciones, nodos
+
+
+class ExactSolver:
+    """
+    Motor exacto con la misma interfaz que GeneticEngine.
+    - `run` devuelve los nodos expandidos en lugar de generaciones.
+    - Causa de término: "exacto" (resuelto), "sin_solucion",
+      "tiempo_agotado" (`params.time_budget`) o "detenido" (si
+      `on_generation`, llamado cada STOP_CHECK_NODES nodos con los nodos
+      expandidos, devuelve True).
+    """
+
+    def __init__(
+        self,
+        initial_board: SudokuBoard,
+        params=None,
+        candidates: Optional[List[List[Set[int]]]] = None,
+    ):
+        self.initial_board = initial_board
+        self.params = params
+
+        self.best_board: Optional[SudokuBoard] = None
+        self.best_fitness: Optional[int] = None
+        self.best_generation: int = 0
+        self.best_fitness_history: List[int] = []
+        self.nodes_expanded: int = 0
+
+        # sin generaciones: se llama cada STOP_CHECK_NODES nodos
+        self.on_generation: Optional[Callable[[int], bool]] = None
+
+    def run(self) -> Tuple[SudokuBoard, int, str]:
+        sg_r, sg_c = self.initial_board.subgrid_size()
+        time_budget = getattr(self.params, "time_budget", None)
+        limite = time.monotonic() + time_budget if time_budget else None
+        corte: Optional[str] = None
+
+        def parar(nodos: int) -> bool:
+            nonlocal corte
+            if limite is not None and time.monotonic() >= limite:
+                corte = "tiempo_agotado"
+            elif self.on_generation is not None and self.on_generation(nodos):
+                corte = "detenido"
+            return corte is not None
+
+        soluciones, nodos = solve_exact(self.initial_board.grid, sg_r, sg_c, stop=parar)
+        self.nodes_expanded = nodos
+
+        if soluciones:
+            self.best_board = SudokuBoard.from_list(soluciones[0])
+            causa = "exacto"
+        elif corte is not None:
+            self.best_board = self.initial_board.copy()
+            causa = corte
+        else:
+            self.best_board = self.initial_board.copy()
+            causa = "sin_solucion"
+
+        self.best_fitness = Validator.fitness_penalty(self.best_board)
+        self.best_generation = nodos
+        self.best_fitness_history = [self.best_fitness]
+        return self.best_board, nodos, causa
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import random
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from sudoku_board import SudokuBoard
+from exact_solver import solve_exact
+from geometry import subgrid_shape
+
+
+# ==========================================================
+# Generación de tableros con solución única
+#   - Solución base por patrón + permutaciones que preservan validez.
+#   - Se quitan pistas de a una; si el tablero deja de tener solución
+#     única (el solver exacto encuentra 2), la pista vuelve a su lugar.
+#   - PuzzlePool mantiene tableros listos por (tamaño, dificultad) y los
+#     repone en un hilo de fondo.
+# ==========================================================
+
+def base_solution(size: int) -> SudokuBoard:
+    """Tablero completo válido por patrón, para cualquier N = filas x columnas de bloque.
+
+    La fila r es la fila 0 desplazada (sg_c * (r % sg_r) + r // sg_r)
+    posiciones: cada banda reparte los valores entre sus bloques y las
+    bandas siguientes se corren de a uno.
+    """
+    sg_r, sg_c = subgrid_shape(size)
+    return SudokuBoard.from_list([
+        [(sg_c * (r % sg_r) + r // sg_r + c) % size + 1 for c in range(size)]
+        for r in range(size)
+    ])
+
+
+def shuffle_solution(board: SudokuBoard, rng: random.Random) -> SudokuBoard:
+    """Aplica permutaciones válidas para obtener un tablero distinto pero correcto."""
+    size = board.size
+    grid = board.grid   # copia en listas; el resultado se arma al final
+
+    sg_r, sg_c = board.subgrid_size()
+
+    # permutar filas dentro de cada bloque de subcuadrícula vertical
+    for block in range(0, size, sg_r):
+        rows = list(range(block, block + sg_r))
+        rng.shuffle(rows)
+        tmp = [grid[r][:] for r in rows]
+        for i, r in enumerate(range(block, block + sg_r)):
+            grid[r] = tmp[i]
+
+    # permutar columnas dentro de cada bloque de subcuadrícula horizontal
+    for block in range(0, size, sg_c):
+        cols = list(range(block, block + sg_c))
+        rng.shuffle(cols)
+        for r in range(size):
+            row = grid[r]
+            tmp = [row[c] for c in cols]
+            for i, c in enumerate(range(block, block + sg_c)):
+                row[c] = tmp[i]
+
+    # permutar símbolos (1..size)
+    mapping = list(range(1, size + 1))
+    rng.shuffle(mapping)
+    mapping_dict = {i + 1: mapping[i] for i in range(size)}
+    for r in range(size):
+        for c in range(size):
+            v = grid[r][c]
+            if v != 0:
+                grid[r][c] = mapping_dict[v]
+
+    return SudokuBoard.from_list(grid)
+
+
+# nodos del solver exacto por chequeo de unicidad en tableros grandes (por
+# casilla): sin tope, probar la unicidad de un 16x16 puede tardar minutos.
+# Subirlo casi no baja las pistas (un 25x25 queda en ~290 con 4 o con 64 y
+# tarda 10 veces más): el límite es la búsqueda sin propagación
+UNIQUENESS_NODES_PER_CELL = 4
+
+
+def has_unique_solution(grid, sg_r: int, sg_c: int, max_nodes: Optional[int] = None) -> bool:
+    """True si el tablero tiene exactamente una solución (corta al encontrar la segunda).
+
+    Con `max_nodes`, si la búsqueda no termina dentro del tope la unicidad
+    no queda probada y devuelve False.
+    """
+    soluciones, nodos = solve_exact(grid, sg_r, sg_c, max_solutions=2, max_nodes=max_nodes)
+    return len(soluciones) == 1 and (max_nodes is None or nodos <= max_nodes)
+
+
+def remove_clues(solution: SudokuBoard, target_clues: int, rng: random.Random) -> SudokuBoard:
+    """Quita pistas de `solution` en orden aleatorio sin perder la unicidad.
+
+    Se detiene al llegar a `target_clues`; si antes de eso ya no se puede
+    quitar ninguna pista sin abrir una segunda solución, el tablero queda
+    con más pistas que las pedidas (es mínimo).
+
+    En tableros de más de 9x9 cada chequeo tiene un tope de nodos; una
+    pista cuya remoción no se puede probar a tiempo se conserva.
+    """
+    size = solution.size
+    sg_r, sg_c = solution.subgrid_size()
+    max_nodes = UNIQUENESS_NODES_PER_CELL * size * size if size > 9 else None
+    grid = solution.grid
+    positions = [(r, c) for r in range(size) for c in range(size)]
+    rng.shuffle(positions)
+
+    clues = size * size
+    for (r, c) in positions:
+        if clues <= target_clues:
+            break
+        valor = grid[r][c]
+        grid[r][c] = 0
+        if has_unique_solution(grid, sg_r, sg_c, max_nodes):
+            clues -= 1
+        else:
+            grid[r][c] = valor
+    return SudokuBoard.from_list(grid)
+
+
+Factory = Callable[[int, str, random.Random], Tuple[SudokuBoard, SudokuBoard]]
+
+
+class PuzzlePool:
+    """Tableros (puzzle, solución) pre-generados por (tamaño, dificultad).
+
+    `take` saca uno de la cola en O(1); si la cola está vacía lo genera en
+    el momento (o, con `generate=False`, devuelve None). Un hilo de fondo
+    repone cada cola hasta `capacity`.
+    """
+
+    def __init__(self, factory: Factory, capacity: int = 8, large_capacity: int = 2):
+        self._factory = factory
+        self.capacity = capacity
+        self.large_capacity = large_capacity   # más de 9x9: cada tablero tarda segundos
+        self._colas: Dict[Tuple[int, str], Deque[Tuple[SudokuBoard, SudokuBoard]]] = {}
+        self._cond = threading.Condition()
+        self._hilo: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+
+    def take(
+        self, size: int, difficulty: str, generate: bool = True
+    ) -> Optional[Tuple[SudokuBoard, SudokuBoard]]:
+        clave = (size, difficulty)
+        with self._cond:
+            cola = self._colas.get(clave)
+            if cola:
+                self.hits += 1
+                par = cola.popleft()
+                self._cond.notify()
+                return par
+            self.misses += 1
+        if not generate:
+            # desde ahora el hilo de fondo mantiene esta clave
+            self.warm([clave])
+            return None
+        # cola vacía: se genera en el request (si falla, la clave no se registra)
+        par = self._factory(size, difficulty, random.Random())
+        self.warm([clave])
+        return par
+
+    def warm(self, keys: Iterable[Tuple[int, str]]) -> None:
+        """Registra claves a mantener llenas y arranca el hilo de reposición."""
+        with self._cond:
+            for clave in keys:
+                self._colas.setdefault(clave, deque())
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._reponer, name="puzzle-pool", daemon=True)
+                self._hilo.start()
+            self._cond.notify()
+
+    def _reponer(self) -> None:
+        rng = random.Random()
+        while True:
+            with self._cond:
+                clave = self._mas_vacia()
+                while clave is None:
+                    self._cond.wait()
+                    clave = self._mas_vacia()
+            try:
+                par = self._factory(clave[0], clave[1], rng)
+            except Exception:
+                # clave que no se puede generar: se deja de reponer
+                with self._cond:
+                    self._colas.pop(clave, None)
+                continue
+            with self._cond:
+                cola = self._colas.get(clave)
+                if cola is not None:
+                    cola.append(par)
+
+    def _mas_vacia(self) -> Optional[Tuple[int, str]]:
+        """Clave con menos tableros listos, o None si todas están llenas."""
+        faltantes = [(len(c), k) for k, c in self._colas.items() if len(c) < self._capacidad(k[0])]
+        return min(faltantes)[1] if faltantes else None
+
+    def _capacidad(self, size: int) -> int:
+        return self.capacity if size <= 9 else self.large_capacity
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "large_capacity": self.large_capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "ready": {f"{s}:{d}": len(c) for (s, d), c in sorted(self._colas.items())},
+            }
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import heapq
 import random
+import time
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from time import perf_counter
+from typing import Callable, Iterable, List, Set, Tuple, Optional
 
 from sudoku_board import SudokuBoard
 from validator import Validator
+from profiling import PhaseProfiler
+from geometry import SUBGRIDS, SUPPORTED_SIZES, geometry
+from local_search import LOCAL_SEARCH_METHODS, refine
+from selection import SELECTIONS, best_indices, select_parents
 
 
 # ==========================================================
@@ -18,11 +25,36 @@ class GeneticParams:
     max_generations: int = 2000
     mutation_rate: float = 0.05
     elite_ratio: float = 0.1
+    engine: str = "python"    # "python" (listas), "numpy" (vectorizado) o "exact" (backtracking)
+    islands: int = 1              # >1 activa el modelo de islas (un proceso por isla)
+    migration_interval: int = 50  # generaciones entre migraciones
+    migration_size: int = 2       # individuos que emigra cada isla
+    propagation: bool = True      # propagar singles antes del AG (ver propagation.py)
+    seed: Optional[int] = None    # semilla del generador aleatorio del motor
+    # política de estancamiento (motores "python" y "numpy")
+    stagnation_generations: int = 500   # generaciones sin mejora para considerar estancada la corrida
+    max_restarts: int = 0               # reinicios permitidos (se conserva la élite); 0 = sólo subir la mutación
+    min_diversity: float = 0.0          # diversidad (0..1) bajo la cual la población se da por colapsada
+    diversity_interval: int = 10        # cada cuántas generaciones se mide la diversidad
+    stop_on_stagnation: bool = False    # sin reinicios disponibles: cortar en vez de seguir mutando
+    time_budget: Optional[float] = None  # segundos de reloj; al agotarse termina con "tiempo_agotado"
+    profile: str = "off"          # "off", "phases" (tiempos por fase) o "cprofile" (ver profiling.py)
+    encoding: str = "grid"        # motor "python": "grid" (tablero + reparación) o "permutation" (ver _IndividuoPerm)
+    # selección de padres (motores "python" y "numpy", ver selection.py)
+    selection: str = "pool"       # "pool" (élite + azar uniforme), "tournament", "sus" o "rank"
+    tournament_size: int = 3      # competidores por torneo; más grande = más presión
+    rank_pressure: float = 1.5    # ranking lineal: peso del mejor, entre 1 (sin presión) y 2
+    # etapa memética (motores "python" y "numpy"): búsqueda local sobre la élite (ver local_search.py)
+    local_search: str = "off"           # "off", "annealing" (recocido simulado) o "tabu"
+    local_search_interval: int = 0      # refinar cada tantas generaciones (0 = sólo al estancarse)
+    local_search_patience: int = 50     # generaciones sin mejora que disparan un refinamiento (0 = nunca)
+    local_search_elites: int = 2        # mejores individuos que se refinan cada vez
+    local_search_steps: int = 1000      # intercambios por individuo refinado
 
 
 # ==========================================================
 # Implementación GA estilo "algo.py" (tableros como listas)
-#   - Soporta 4x4, 6x6 y 9x9
+#   - Soporta todos los tamaños de geometry.SUBGRIDS (4x4 a 25x25)
 # ==========================================================
 
 def _copiar_tablero(tablero: List[List[int]]) -> List[List[int]]:
@@ -34,14 +66,10 @@ def _obtener_dimensiones(tablero: List[List[int]]) -> Tuple[int, int, int]:
     if any(len(fila) != size for fila in tablero):
         raise ValueError("El tablero debe ser cuadrado (NxN).")
 
-    if size == 4:
-        return size, 2, 2
-    elif size == 6:
-        return size, 2, 3
-    elif size == 9:
-        return size, 3, 3
-    else:
-        raise ValueError("Sólo se admiten tamaños 4x4, 6x6 o 9x9.")
+    if size not in SUBGRIDS:
+        raise ValueError(f"Sólo se admiten tamaños {', '.join(f'{n}x{n}' for n in SUPPORTED_SIZES)}.")
+    geo = geometry(size)
+    return size, geo.sg_r, geo.sg_c
 
 
 def _construir_pistas_fijas(tablero_inicial: List[List[int]]) -> List[List[bool]]:
@@ -54,10 +82,80 @@ def _construir_pistas_fijas(tablero_inicial: List[List[int]]) -> List[List[bool]
     return pista_fija
 
 
-def _generar_individuo_inicial(tablero_inicial: List[List[int]]) -> List[List[int]]:
-    """Llena las casillas vacías POR FILA, garantizando unicidad por fila."""
+class _Individuo:
+    """
+    Tablero + tablas de conteo por fila, columna y bloque.
+    - La penalización se mantiene al día con cada `cambiar`, sin reescanear
+      el tablero completo (cada casilla toca sólo 3 contadores).
+    - Equivale a Validator.fitness_penalty (los ceros no cuentan).
+    """
+
+    __slots__ = ("tablero", "filas", "columnas", "bloques", "penal", "bloque_de")
+
+    def __init__(self, tablero: List[List[int]], bloque_de: List[List[int]]):
+        size = len(tablero)
+        self.tablero = tablero
+        self.bloque_de = bloque_de
+        self.filas = [[0] * (size + 1) for _ in range(size)]
+        self.columnas = [[0] * (size + 1) for _ in range(size)]
+        self.bloques = [[0] * (size + 1) for _ in range(size)]
+
+        for f in range(size):
+            for c in range(size):
+                v = tablero[f][c]
+                self.filas[f][v] += 1
+                self.columnas[c][v] += 1
+                self.bloques[bloque_de[f][c]][v] += 1
+
+        self.penal = sum(
+            n - 1
+            for tabla in (self.filas, self.columnas, self.bloques)
+            for conteo in tabla
+            for n in conteo[1:]
+            if n > 1
+        )
+
+    def copiar(self) -> "_Individuo":
+        nuevo = _Individuo.__new__(_Individuo)
+        nuevo.tablero = _copiar_tablero(self.tablero)
+        nuevo.filas = _copiar_tablero(self.filas)
+        nuevo.columnas = _copiar_tablero(self.columnas)
+        nuevo.bloques = _copiar_tablero(self.bloques)
+        nuevo.penal = self.penal
+        nuevo.bloque_de = self.bloque_de
+        return nuevo
+
+    def cambiar(self, fila: int, col: int, nuevo: int) -> None:
+        """Asigna `nuevo` en (fila, col) y ajusta la penalización en O(1)."""
+        viejo = self.tablero[fila][col]
+        if viejo == nuevo:
+            return
+
+        for conteo in (self.filas[fila], self.columnas[col], self.bloques[self.bloque_de[fila][col]]):
+            if viejo != 0:
+                conteo[viejo] -= 1
+                if conteo[viejo] >= 1:
+                    self.penal -= 1
+            if nuevo != 0:
+                if conteo[nuevo] >= 1:
+                    self.penal += 1
+                conteo[nuevo] += 1
+
+        self.tablero[fila][col] = nuevo
+
+
+def _generar_individuo_inicial(
+    tablero_inicial: List[List[int]],
+    rng: random.Random,
+    candidatos: Optional[List[List[Set[int]]]] = None,
+) -> List[List[int]]:
+    """Llena las casillas vacías POR FILA, garantizando unicidad por fila.
+
+    Con `candidatos`, cada casilla recibe (si queda alguno) un valor legal
+    para ella; las casillas con menos opciones se llenan primero.
+    """
     individuo = _copiar_tablero(tablero_inicial)
-    size, _, _ = _obtener_dimensiones(tablero_inicial)
+    size = len(tablero_inicial)
 
     for fila in range(size):
         presentes = set()
@@ -71,16 +169,37 @@ def _generar_individuo_inicial(tablero_inicial: List[List[int]]) -> List[List[in
                 vacias.append(col)
 
         faltantes = [n for n in range(1, size + 1) if n not in presentes]
-        random.shuffle(faltantes)
-
-        for col, valor in zip(vacias, faltantes):
+        rng.shuffle(faltantes)
+
+        if candidatos is None:
+            for col, valor in zip(vacias, faltantes):
+                individuo[fila][col] = valor
+            continue
+
+        rng.shuffle(vacias)
+        vacias.sort(key=lambda col: len(candidatos[fila][col]))
+        for col in vacias:
+            if not faltantes:
+                break
+            legales = [v for v in faltantes if v in candidatos[fila][col]]
+            valor = rng.choice(legales) if legales else faltantes[-1]
+            faltantes.remove(valor)
             individuo[fila][col] = valor
 
     return individuo
 
 
-def _generar_poblacion_inicial(tablero_inicial: List[List[int]], tam_poblacion: int) -> List[List[List[int]]]:
-    return [_generar_individuo_inicial(tablero_inicial) for _ in range(tam_poblacion)]
+def _generar_poblacion_inicial(
+    tablero_inicial: List[List[int]],
+    tam_poblacion: int,
+    bloque_de: List[List[int]],
+    rng: random.Random,
+    candidatos: Optional[List[List[Set[int]]]] = None,
+) -> List["_Individuo"]:
+    return [
+        _Individuo(_generar_individuo_inicial(tablero_inicial, rng, candidatos), bloque_de)
+        for _ in range(tam_poblacion)
+    ]
 
 
 def _contar_repetidos_en_lista(lista: List[int]) -> int:
@@ -96,133 +215,415 @@ def _contar_repetidos_en_lista(lista: List[int]) -> int:
 
 
 def _calcular_penalizacion(individuo: List[List[int]]) -> int:
-    size, br, bc = _obtener_dimensiones(individuo)
-    penalizacion = 0
-
-    # Filas
-    for fila in range(size):
-        lista = [individuo[fila][col] for col in range(size)]
-        penalizacion += _contar_repetidos_en_lista(lista)
-
-    # Columnas
-    for col in range(size):
-        lista = [individuo[fila][col] for fila in range(size)]
-        penalizacion += _contar_repetidos_en_lista(lista)
-
-    # Subcuadrículas
-    for bf in range(0, size, br):
-        for bc_ini in range(0, size, bc):
-            lista = []
-            for i in range(br):
-                for j in range(bc):
-                    lista.append(individuo[bf + i][bc_ini + j])
-            penalizacion += _contar_repetidos_en_lista(lista)
-
-    return penalizacion
-
+    size, _, _ = _obtener_dimensiones(individuo)
+    plano = [v for fila in individuo for v in fila]
+    # filas, columnas y subcuadrículas
+    return sum(
+        _contar_repetidos_en_lista([plano[i] for i in unidad])
+        for unidad in geometry(size).units
+    )
 
-def _fitness(individuo: List[List[int]]) -> float:
-    """Función fitness original de algo.py: 1 / (1 + penalización)."""
-    penal = _calcular_penalizacion(individuo)
-    return 1.0 / (1.0 + penal)
 
+def _reparar_filas(
+    individuo: _Individuo,
+    pista_fija: List[List[bool]],
+    rng: random.Random,
+    filas: Optional[Iterable[int]] = None,
+) -> int:
+    """Reparación por filas: reemplaza duplicados en casillas NO fijas.
 
-def _reparar_filas(individuo: List[List[int]], pista_fija: List[List[bool]]) -> None:
-    """Reparación por filas: reemplaza duplicados en casillas NO fijas."""
-    size, _, _ = _obtener_dimensiones(individuo)
+    Usa los conteos que ya lleva el individuo; `filas` limita la reparación
+    a las filas que pudieron cambiar. Devuelve las casillas reemplazadas.
+    """
+    tablero = individuo.tablero
+    size = len(tablero)
+    cambios = 0
 
-    for fila in range(size):
-        conteo = {}
-        posiciones = []
+    for fila in (range(size) if filas is None else filas):
+        conteo = individuo.filas[fila]
+        faltantes = [n for n in range(1, size + 1) if conteo[n] == 0]
+        if not faltantes:
+            continue  # la fila ya es una permutación de 1..N
+        rng.shuffle(faltantes)
 
         for col in range(size):
-            val = individuo[fila][col]
-            conteo[val] = conteo.get(val, 0) + 1
-            posiciones.append((col, val))
-
-        faltantes = [n for n in range(1, size + 1) if conteo.get(n, 0) == 0]
-        random.shuffle(faltantes)
-
-        for col, val in posiciones:
+            val = tablero[fila][col]
             if not pista_fija[fila][col] and conteo[val] > 1 and faltantes:
-                nuevo = faltantes.pop()
-                conteo[val] -= 1
-                individuo[fila][col] = nuevo
-                conteo[nuevo] = conteo.get(nuevo, 0) + 1
+                individuo.cambiar(fila, col, faltantes.pop())
+                cambios += 1
+
+    return cambios
 
 
 def _cruce_subcuadriculas(
-    padreA: List[List[int]],
-    padreB: List[List[int]],
+    padreA: _Individuo,
+    padreB: _Individuo,
     pista_fija: List[List[bool]],
-) -> Tuple[List[List[int]], List[List[int]]]:
-    """Cruce especializado: intercambia un bloque entre dos padres."""
-    hijo1 = _copiar_tablero(padreA)
-    hijo2 = _copiar_tablero(padreB)
+    rng: random.Random,
+) -> Tuple[_Individuo, _Individuo]:
+    """Cruce especializado: intercambia un bloque entre dos padres.
 
-    size, br, bc = _obtener_dimensiones(padreA)
+    La penalización de los hijos se ajusta casilla a casilla; sólo se
+    reparan las filas que atraviesan el bloque intercambiado.
+    """
+    hijo1, hijo2, filas = _intercambiar_bloque(padreA, padreB, pista_fija, rng)
+    _reparar_filas(hijo1, pista_fija, rng, filas)
+    _reparar_filas(hijo2, pista_fija, rng, filas)
+    return hijo1, hijo2
 
-    bloques_por_fila = size // bc
-    bloques_por_col = size // br
-    total_bloques = bloques_por_fila * bloques_por_col
 
-    bloque_idx = random.randint(0, total_bloques - 1)
-    bloque_fila = bloque_idx // bloques_por_fila
-    bloque_col = bloque_idx % bloques_por_fila
+def _intercambiar_bloque(
+    padreA: _Individuo,
+    padreB: _Individuo,
+    pista_fija: List[List[bool]],
+    rng: random.Random,
+) -> Tuple[_Individuo, _Individuo, range]:
+    """Primera mitad del cruce: copia los padres e intercambia un bloque al azar.
 
-    bf = bloque_fila * br
-    bc_ini = bloque_col * bc
+    Devuelve los hijos (aún sin reparar) y las filas que hay que reparar.
+    """
+    hijo1 = padreA.copiar()
+    hijo2 = padreB.copiar()
 
-    for i in range(br):
-        for j in range(bc):
-            f = bf + i
-            c = bc_ini + j
-            if not pista_fija[f][c]:
-                hijo1[f][c], hijo2[f][c] = hijo2[f][c], hijo1[f][c]
+    geo = geometry(len(padreA.tablero))
+    bloque_idx = rng.randint(0, geo.size - 1)
+    coords = geo.block_coords[bloque_idx]
 
-    _reparar_filas(hijo1, pista_fija)
-    _reparar_filas(hijo2, pista_fija)
+    for f, c in coords:
+        if not pista_fija[f][c]:
+            v1 = hijo1.tablero[f][c]
+            hijo1.cambiar(f, c, hijo2.tablero[f][c])
+            hijo2.cambiar(f, c, v1)
 
-    return hijo1, hijo2
+    bf = coords[0][0]
+    return hijo1, hijo2, range(bf, bf + geo.sg_r)
 
 
-def _mutar(individuo: List[List[int]], pista_fija: List[List[bool]]) -> None:
-    """Mutación: intercambia dos casillas no fijas dentro de una fila."""
-    size, _, _ = _obtener_dimensiones(individuo)
-    fila = random.randint(0, size - 1)
+def _mutar(individuo: _Individuo, pista_fija: List[List[bool]], rng: random.Random) -> None:
+    """Mutación: intercambia dos casillas no fijas dentro de una fila.
+
+    El intercambio conserva los valores de la fila, así que no hace falta
+    repararla: basta con ajustar las dos columnas y bloques tocados.
+    """
+    tablero = individuo.tablero
+    size = len(tablero)
+    fila = rng.randint(0, size - 1)
 
     mutables = [col for col in range(size) if not pista_fija[fila][col]]
     if len(mutables) < 2:
         return
 
-    c1, c2 = random.sample(mutables, 2)
-    individuo[fila][c1], individuo[fila][c2] = individuo[fila][c2], individuo[fila][c1]
-
-    _reparar_filas(individuo, pista_fija)
+    c1, c2 = rng.sample(mutables, 2)
+    v1 = tablero[fila][c1]
+    individuo.cambiar(fila, c1, tablero[fila][c2])
+    individuo.cambiar(fila, c2, v1)
 
 
 def _crear_pool(
-    poblacion: List[List[List[int]]],
-    lista_fitness: List[float],
+    orden: List[int],
+    n: int,
     tam_pool: int,
     proporcion_elitismo: float,
-) -> Tuple[List[List[List[int]]], int]:
-    pares = list(zip(poblacion, lista_fitness))
-    pares.sort(key=lambda x: x[1], reverse=True)
+    rng: random.Random,
+) -> Tuple[List[int], int]:
+    """Pool de padres como índices (elitismo + aleatorio), sin copiar tableros.
 
+    `orden` son los índices de (al menos) la élite, de mejor a peor; `n`
+    es el tamaño de la población.
+    """
     n_elite = int(tam_pool * proporcion_elitismo)
-    pool: List[List[List[int]]] = []
-
-    for i in range(n_elite):
-        pool.append(_copiar_tablero(pares[i][0]))
+    pool = orden[:n_elite]
 
     while len(pool) < tam_pool:
-        idx = random.randint(0, len(poblacion) - 1)
-        pool.append(_copiar_tablero(poblacion[idx]))
+        pool.append(rng.randint(0, n - 1))
 
     return pool, n_elite
 
 
+def _diversidad(
+    poblacion: List[_Individuo],
+    mejor: _Individuo,
+    libres: List[Tuple[int, int]],
+) -> float:
+    """Distancia de Hamming media al mejor individuo, sobre casillas libres (0..1)."""
+    if not libres or len(poblacion) < 2:
+        return 0.0
+    ref = mejor.tablero
+    distintas = 0
+    for ind in poblacion:
+        tablero = ind.tablero
+        for f, c in libres:
+            if tablero[f][c] != ref[f][c]:
+                distintas += 1
+    return distintas / (len(poblacion) * len(libres))
+
+
+class _ControlEstancamiento:
+    """Política de estancamiento de GeneticParams, compartida por los motores GA.
+
+    Por generación: `registrar(penal)`, opcionalmente `diversidad` si
+    `medir_diversidad(gen)`, y luego `decidir()`, que devuelve None (seguir),
+    "reiniciar" o la causa de término ("tiempo_agotado", "estancamiento",
+    "sin_diversidad").
+    """
+
+    def __init__(self, params: GeneticParams):
+        self.params = params
+        self.limite = time.monotonic() + params.time_budget if params.time_budget else None
+        self.mejor_penal: Optional[int] = None
+        self.sin_mejora = 0
+        self.reinicios = 0
+        self.diversidad: Optional[float] = None
+        self.estancada = False   # hubo estancamiento en algún momento
+
+    def registrar(self, penal: int) -> None:
+        if self.mejor_penal is None or penal < self.mejor_penal:
+            self.mejor_penal = penal
+            self.sin_mejora = 0
+        else:
+            self.sin_mejora += 1
+
+    def medir_diversidad(self, gen: int) -> bool:
+        return self.params.min_diversity > 0 and gen % max(1, self.params.diversity_interval) == 0
+
+    def decidir(self) -> Optional[str]:
+        if self.limite is not None and time.monotonic() >= self.limite:
+            return "tiempo_agotado"
+
+        colapsada = self.diversidad is not None and self.diversidad < self.params.min_diversity
+        estancada = self.sin_mejora > self.params.stagnation_generations
+        if estancada:
+            self.estancada = True
+        if not (colapsada or estancada):
+            return None
+        if self.reinicios < self.params.max_restarts:
+            self.reinicios += 1
+            self.sin_mejora = 0
+            self.diversidad = None
+            return "reiniciar"
+        if self.params.stop_on_stagnation:
+            return "sin_diversidad" if colapsada and not estancada else "estancamiento"
+        return None
+
+    def tasa_mutacion(self, base: float) -> float:
+        """Sube la mutación mientras dura el estancamiento (como el algo.py original)."""
+        umbral = self.params.stagnation_generations
+        if self.sin_mejora > umbral * 2:
+            return 0.90
+        if self.sin_mejora > umbral:
+            return 0.5
+        return base
+
+
+def _validar_operadores(params: GeneticParams) -> None:
+    if params.selection not in SELECTIONS:
+        raise ValueError(f"Selección desconocida: {params.selection}. Use: {', '.join(SELECTIONS)}.")
+    if params.local_search not in LOCAL_SEARCH_METHODS:
+        raise ValueError(
+            f"Búsqueda local desconocida: {params.local_search}. Use: {', '.join(LOCAL_SEARCH_METHODS)}."
+        )
+
+
+class _EtapaMemetica:
+    """Cuándo refinar la élite con búsqueda local, y cuánto tiempo se lleva.
+
+    Se refina cada `local_search_interval` generaciones y, además, cada
+    `local_search_patience` generaciones seguidas sin mejora.
+    """
+
+    def __init__(self, params: GeneticParams, pista_fija: List[List[bool]], bloque_de):
+        self.params = params
+        self.pista_fija = pista_fija
+        self.bloque_de = bloque_de
+        self.elites = max(0, params.local_search_elites)
+        self.tiempo = 0.0        # segundos dentro de la búsqueda local
+        self.llamadas = 0        # individuos refinados
+        self.mejoras = 0         # refinamientos que bajaron la penalización
+
+    def toca(self, gen: int, sin_mejora: int) -> bool:
+        if gen == 0 or self.elites == 0:
+            return False
+        intervalo = self.params.local_search_interval
+        if intervalo > 0 and gen % intervalo == 0:
+            return True
+        paciencia = self.params.local_search_patience
+        return paciencia > 0 and sin_mejora >= paciencia and sin_mejora % paciencia == 0
+
+    def refinar(self, tablero: List[List[int]], penal: int, rng: random.Random) -> Optional[Tuple[List[List[int]], int]]:
+        """(tablero, penalización) refinados, o None si no mejoró."""
+        t0 = perf_counter()
+        nuevo, nuevo_penal = refine(
+            tablero, self.pista_fija, self.bloque_de,
+            self.params.local_search, self.params.local_search_steps, rng,
+        )
+        self.tiempo += perf_counter() - t0
+        self.llamadas += 1
+        if nuevo_penal >= penal:
+            return None
+        self.mejoras += 1
+        return nuevo, nuevo_penal
+
+
+# ==========================================================
+# Cromosoma por permutaciones de fila
+#   - Sólo guarda las casillas libres de cada fila, como permutación de
+#     los valores que le faltan a esa fila.
+#   - Cruce (filas enteras de uno u otro padre) y mutación (intercambio
+#     dentro de una fila) conservan las permutaciones: no hay reparación.
+#   - La penalización cuenta sólo columnas y bloques (las filas no pueden
+#     tener repetidos).
+# ==========================================================
+
+class _EsquemaPermutacion:
+    """Datos fijos del puzzle para el cromosoma por permutaciones (uno por corrida)."""
+
+    def __init__(self, tablero_inicial: List[List[int]], pista_fija: List[List[bool]], bloque_de: List[List[int]]):
+        size, _, _ = _obtener_dimensiones(tablero_inicial)
+        self.size = size
+        self.base = _copiar_tablero(tablero_inicial)
+        self.bloque_de = bloque_de
+        # columnas libres de cada fila, en orden
+        self.cols_libres = [[c for c in range(size) if not pista_fija[f][c]] for f in range(size)]
+        self.filas_mutables = [f for f in range(size) if len(self.cols_libres[f]) >= 2]
+
+        # conteos de las pistas por columna y bloque (punto de partida de cada individuo)
+        self.columnas = [[0] * (size + 1) for _ in range(size)]
+        self.bloques = [[0] * (size + 1) for _ in range(size)]
+        for f in range(size):
+            for c in range(size):
+                v = tablero_inicial[f][c]
+                if v != 0:
+                    self.columnas[c][v] += 1
+                    self.bloques[bloque_de[f][c]][v] += 1
+
+    def desde_tablero(self, tablero: List[List[int]]) -> "_IndividuoPerm":
+        """Individuo con los valores de `tablero` en las casillas libres."""
+        genes = [[tablero[f][c] for c in self.cols_libres[f]] for f in range(self.size)]
+        return _IndividuoPerm(self, genes)
+
+    def poblacion(
+        self,
+        tam_poblacion: int,
+        rng: random.Random,
+        candidatos: Optional[List[List[Set[int]]]] = None,
+    ) -> List["_IndividuoPerm"]:
+        # mismo llenado por fila que el cromosoma de tablero completo
+        return [
+            self.desde_tablero(_generar_individuo_inicial(self.base, rng, candidatos))
+            for _ in range(tam_poblacion)
+        ]
+
+    def cruzar(self, padreA: "_IndividuoPerm", padreB: "_IndividuoPerm", rng: random.Random):
+        """Cruce uniforme por filas: cada fila pasa entera de un padre al otro con prob. 0.5.
+
+        Intercambiar sólo el trozo de fila de un bloque rompería la
+        permutación; una fila entera siempre es válida.
+        """
+        hijo1 = padreA.copiar()
+        hijo2 = padreB.copiar()
+        for f in range(self.size):
+            if rng.random() < 0.5:
+                g1 = hijo1.genes[f]
+                hijo1.poner_fila(f, hijo2.genes[f])
+                hijo2.poner_fila(f, g1)
+        return hijo1, hijo2
+
+    def mutar(self, individuo: "_IndividuoPerm", rng: random.Random) -> None:
+        """Intercambia dos casillas libres de una fila."""
+        if not self.filas_mutables:
+            return
+        fila = rng.choice(self.filas_mutables)
+        i, j = rng.sample(range(len(self.cols_libres[fila])), 2)
+        individuo.intercambiar(fila, i, j)
+
+
+class _IndividuoPerm:
+    """Casillas libres por fila + conteos por columna y bloque (penalización incremental)."""
+
+    __slots__ = ("esquema", "genes", "columnas", "bloques", "penal")
+
+    def __init__(self, esquema: _EsquemaPermutacion, genes: List[List[int]]):
+        self.esquema = esquema
+        self.genes = genes
+        self.columnas = _copiar_tablero(esquema.columnas)
+        self.bloques = _copiar_tablero(esquema.bloques)
+        bloque_de = esquema.bloque_de
+        for f, cols in enumerate(esquema.cols_libres):
+            for c, v in zip(cols, genes[f]):
+                if v != 0:
+                    self.columnas[c][v] += 1
+                    self.bloques[bloque_de[f][c]][v] += 1
+        self.penal = sum(
+            n - 1
+            for tabla in (self.columnas, self.bloques)
+            for conteo in tabla
+            for n in conteo[1:]
+            if n > 1
+        )
+
+    @property
+    def tablero(self) -> List[List[int]]:
+        """Tablero completo (pistas + genes); se arma en cada acceso."""
+        tablero = _copiar_tablero(self.esquema.base)
+        for f, cols in enumerate(self.esquema.cols_libres):
+            fila = tablero[f]
+            for c, v in zip(cols, self.genes[f]):
+                fila[c] = v
+        return tablero
+
+    def copiar(self) -> "_IndividuoPerm":
+        nuevo = _IndividuoPerm.__new__(_IndividuoPerm)
+        nuevo.esquema = self.esquema
+        nuevo.genes = _copiar_tablero(self.genes)
+        nuevo.columnas = _copiar_tablero(self.columnas)
+        nuevo.bloques = _copiar_tablero(self.bloques)
+        nuevo.penal = self.penal
+        return nuevo
+
+    def _mover(self, fila: int, col: int, viejo: int, nuevo: int) -> None:
+        # con pistas repetidas en la fila quedan casillas en 0 (como en _Individuo.cambiar, no cuentan)
+        for conteo in (self.columnas[col], self.bloques[self.esquema.bloque_de[fila][col]]):
+            if viejo != 0:
+                conteo[viejo] -= 1
+                if conteo[viejo] >= 1:
+                    self.penal -= 1
+            if nuevo != 0:
+                if conteo[nuevo] >= 1:
+                    self.penal += 1
+                conteo[nuevo] += 1
+
+    def intercambiar(self, fila: int, i: int, j: int) -> None:
+        """Intercambia los genes i y j de la fila."""
+        genes = self.genes[fila]
+        a, b = genes[i], genes[j]
+        cols = self.esquema.cols_libres[fila]
+        self._mover(fila, cols[i], a, b)
+        self._mover(fila, cols[j], b, a)
+        genes[i], genes[j] = b, a
+
+    def poner_fila(self, fila: int, valores: List[int]) -> None:
+        """Reemplaza los genes de la fila por `valores` (otra permutación de los mismos)."""
+        genes = self.genes[fila]
+        for k, c in enumerate(self.esquema.cols_libres[fila]):
+            if genes[k] != valores[k]:
+                self._mover(fila, c, genes[k], valores[k])
+        self.genes[fila] = valores[:]
+
+
+def _diversidad_genes(poblacion: List[_IndividuoPerm], mejor: _IndividuoPerm, n_libres: int) -> float:
+    """Como `_diversidad`, comparando directamente los genes."""
+    if not n_libres or len(poblacion) < 2:
+        return 0.0
+    ref = mejor.genes
+    distintas = 0
+    for ind in poblacion:
+        for g, r in zip(ind.genes, ref):
+            for a, b in zip(g, r):
+                if a != b:
+                    distintas += 1
+    return distintas / (len(poblacion) * n_libres)
+
+
 # ==========================================================
 # Motor que conecta el GA "algo.py" con la app Flask
 # ==========================================================
@@ -230,27 +631,58 @@ def _crear_pool(
 class GeneticEngine:
     """
     Adaptador entre el GA de algo.py y la interfaz que usa la app.
-    - Trabaja internamente con listas de listas (como algo.py).
+    - Trabaja internamente con listas de listas (como algo.py), cada una
+      con sus tablas de conteo para evaluar la penalización incrementalmente.
     - Expone SudokuBoard + métricas para el resto del sistema.
     """
 
-    def __init__(self, initial_board: SudokuBoard, params: GeneticParams):
+    def __init__(
+        self,
+        initial_board: SudokuBoard,
+        params: GeneticParams,
+        candidates: Optional[List[List[Set[int]]]] = None,
+    ):
         self.initial_board = initial_board
         self.params = params
-
-        self.population: List[List[List[int]]] = []
+        self.candidates = candidates   # candidatos legales por casilla (propagación)
+        if params.encoding not in ENCODINGS:
+            raise ValueError(f"Codificación desconocida: {params.encoding}. Use: {', '.join(ENCODINGS)}.")
+        _validar_operadores(params)
+        # generador propio: ejecuciones concurrentes no se interfieren y,
+        # con `params.seed`, la corrida es reproducible
+        self.rng = random.Random(params.seed)
+
+        self.population: List[_Individuo] = []
         self.best_board: Optional[SudokuBoard] = None
         self.best_fitness: Optional[int] = None   # penalización mínima
         self.best_generation: int = 0
         self.best_fitness_history: List[int] = []  # historial de penalización
+        self.restarts: int = 0                     # reinicios por estancamiento en la última corrida
+        # etapa memética de la última corrida (GeneticParams.local_search)
+        self.local_search_time: float = 0.0
+        self.local_search_calls: int = 0
+        self.local_search_improvements: int = 0
+        # tiempos por fase y contadores (params.profile != "off"; lo asigna el controller)
+        self.profiler: Optional[PhaseProfiler] = None
+
+        # hook opcional llamado al final de cada generación; si devuelve
+        # True la ejecución se detiene con causa "detenido"
+        self.on_generation: Optional[Callable[[int], bool]] = None
+        self._bloque_de: List[List[int]] = []
+        self._esquema: Optional[_EsquemaPermutacion] = None   # sólo con encoding "permutation"
 
     # ------------------------------------------------------
     # Inicializar población a partir del SudokuBoard inicial
     # ------------------------------------------------------
     def _init_population(self) -> Tuple[List[List[int]], List[List[bool]]]:
-        base_grid = [row[:] for row in self.initial_board.grid]
+        self.rng.seed(self.params.seed)   # cada run() repite la misma corrida
+        base_grid = self.initial_board.grid
         pista_fija = _construir_pistas_fijas(base_grid)
-        self.population = _generar_poblacion_inicial(base_grid, self.params.population_size)
+        size, _, _ = _obtener_dimensiones(base_grid)
+        self._bloque_de = geometry(size).block_grid
+        if self.params.encoding == "permutation":
+            self._esquema = _EsquemaPermutacion(base_grid, pista_fija, self._bloque_de)
+        self.population = self._poblacion(base_grid, self.params.population_size)
 
         self.best_board = None
         self.best_fitness = None
@@ -259,6 +691,17 @@ class GeneticEngine:
 
         return base_grid, pista_fija
 
+    def _poblacion(self, base_grid: List[List[int]], n: int) -> list:
+        if self._esquema is not None:
+            return self._esquema.poblacion(n, self.rng, self.candidates)
+        return _generar_poblacion_inicial(base_grid, n, self._bloque_de, self.rng, self.candidates)
+
+    def _individuo(self, tablero: List[List[int]]):
+        """Individuo de la codificación en uso a partir de un tablero completo (sin copiarlo)."""
+        if self._esquema is not None:
+            return self._esquema.desde_tablero(tablero)
+        return _Individuo(tablero, self._bloque_de)
+
     # ------------------------------------------------------
     # Ejecutar GA (versión casi 1:1 con ga_sudoku_filas)
     # ------------------------------------------------------
@@ -267,9 +710,13 @@ class GeneticEngine:
         Devuelve:
           - mejor tablero encontrado (SudokuBoard)
           - generaciones realmente usadas
-          - causa de término: "solucion", "estancamiento" o "max_generaciones"
+          - causa de término: "solucion", "estancamiento", "max_generaciones",
+            "sin_diversidad", "tiempo_agotado" (ver la política de
+            estancamiento en GeneticParams) o "detenido" (si `on_generation`
+            pidió parar)
         """
         base_grid, pista_fija = self._init_population()
+        rng = self.rng
 
         tam_poblacion = self.params.population_size
         max_generaciones = self.params.max_generations
@@ -283,22 +730,59 @@ class GeneticEngine:
         mejor_global: Optional[List[List[int]]] = None
         mejor_penal_global: Optional[int] = None
 
-        mejor_penal_antes: Optional[int] = None
-        gens_sin_mejora = 0
-        umbral_estancamiento = 500
-        tasa_mutacion_base = tasa_mutacion
-        tasa_mutacion_boost = 0.5
-
-        causa = "max_generaciones"
+        control = _ControlEstancamiento(self.params)
+        self.restarts = 0
+        size = len(pista_fija)
+        libres = [(f, c) for f in range(size) for c in range(size) if not pista_fija[f][c]]
+        n_elite_poblacion = max(1, int(tam_poblacion * proporcion_elitismo))
+        esquema = self._esquema
+        memetica = None
+        if self.params.local_search != "off":
+            memetica = _EtapaMemetica(self.params, pista_fija, self._bloque_de)
+        seleccion = self.params.selection
+        # sólo hace falta ordenar la élite (la de la población, la del pool y la que se refina)
+        n_orden = max(
+            n_elite_poblacion,
+            int(tam_pool * proporcion_elitismo) if seleccion == "pool" else 0,
+            memetica.elites if memetica is not None else 0,
+        )
+        self.local_search_time = 0.0
+        self.local_search_calls = 0
+        self.local_search_improvements = 0
+
+        # instrumentación: con `profiler` en None cada punto de medición
+        # se reduce a una comparación
+        prof = self.profiler
+        t0 = 0.0
 
         for gen in range(max_generaciones):
-            # calcular fitness actual
-            lista_fitness = [_fitness(ind) for ind in self.population]
-
-            # mejor individuo de esta generación (por fitness)
-            idx_mejor = max(range(len(self.population)), key=lambda i: lista_fitness[i])
-            mejor_ind = self.population[idx_mejor]
-            penal = _calcular_penalizacion(mejor_ind)
+            if prof is not None:
+                t0 = perf_counter()
+
+            # un único ranking parcial por generación (penalizaciones ya cacheadas)
+            poblacion = self.population
+            penales = [ind.penal for ind in poblacion]
+            orden = best_indices(penales, n_orden)
+
+            # etapa memética: la élite refinada reemplaza a la original
+            if memetica is not None and memetica.toca(gen, control.sin_mejora):
+                if prof is not None:
+                    t0 = prof.lap("evaluacion", t0)
+                for i in orden[:memetica.elites]:
+                    refinado = memetica.refinar(poblacion[i].tablero, poblacion[i].penal, rng)
+                    if refinado is not None:
+                        poblacion[i] = self._individuo(refinado[0])
+                        penales[i] = refinado[1]
+                orden.sort(key=lambda i: poblacion[i].penal)
+                self.local_search_time = memetica.tiempo
+                self.local_search_calls = memetica.llamadas
+                self.local_search_improvements = memetica.mejoras
+                if prof is not None:
+                    t0 = prof.lap("busqueda_local", t0)
+                    prof.count("refinamientos", min(memetica.elites, len(orden)))
+
+            mejor_ind = poblacion[orden[0]]
+            penal = mejor_ind.penal
 
             # registrar en historial (siempre penalización, para graficar)
             self.best_fitness_history.append(penal)
@@ -306,73 +790,131 @@ class GeneticEngine:
             # actualizar mejor global si corresponde
             if (mejor_penal_global is None) or (penal < mejor_penal_global):
                 mejor_penal_global = penal
-                mejor_global = _copiar_tablero(mejor_ind)
+                mejor_global = _copiar_tablero(mejor_ind.tablero)
                 self.best_fitness = penal
                 self.best_board = SudokuBoard.from_list(mejor_global)
                 self.best_generation = gen
 
-            # control de estancamiento
-            if (mejor_penal_antes is None) or (penal < mejor_penal_antes):
-                mejor_penal_antes = penal
-                gens_sin_mejora = 0
-            else:
-                gens_sin_mejora += 1
-
-            if gens_sin_mejora > umbral_estancamiento:
-                if gens_sin_mejora > umbral_estancamiento * 2:
-                    tasa_mutacion_actual = 0.90
-                else:
-                    tasa_mutacion_actual = tasa_mutacion_boost
-                causa = "estancamiento"
-            else:
-                tasa_mutacion_actual = tasa_mutacion_base
+            if prof is not None:
+                t0 = prof.lap("evaluacion", t0)
+                prof.count("evaluaciones", len(poblacion))
 
             # ¿solución perfecta?
             if penal == 0:
                 causa = "solucion"
                 # aseguramos best_board consistente
                 if self.best_board is None:
-                    self.best_board = SudokuBoard.from_list(mejor_ind)
+                    self.best_board = SudokuBoard.from_list(mejor_ind.tablero)
                     self.best_fitness = 0
                     self.best_generation = gen
                 return self.best_board, gen + 1, causa
 
-            # crear pool (elitismo + aleatorio)
-            pool, _ = _crear_pool(self.population, lista_fitness, tam_pool, proporcion_elitismo)
-
-            # nueva población con reemplazo generacional + elitismo
-            nueva_poblacion: List[List[List[int]]] = []
-
-            # copiar mejores directamente (elitismo fuerte)
-            n_elite_poblacion = max(1, int(tam_poblacion * proporcion_elitismo))
-            pares = list(zip(self.population, lista_fitness))
-            pares.sort(key=lambda x: x[1], reverse=True)
-            for i in range(n_elite_poblacion):
-                nueva_poblacion.append(_copiar_tablero(pares[i][0]))
-
-            # resto mediante cruce + mutación
-            while len(nueva_poblacion) < tam_poblacion:
-                p1 = _copiar_tablero(random.choice(pool))
-                p2 = _copiar_tablero(random.choice(pool))
-
-                hijos: List[List[List[int]]] = []
-                if random.random() < tasa_cruce:
-                    h1, h2 = _cruce_subcuadriculas(p1, p2, pista_fija)
-                    hijos.extend([h1, h2])
+            # política de estancamiento: seguir, reiniciar o cortar
+            control.registrar(penal)
+            if control.medir_diversidad(gen):
+                if esquema is not None:
+                    control.diversidad = _diversidad_genes(poblacion, mejor_ind, len(libres))
                 else:
-                    hijos.extend([p1, p2])
-
-                for h in hijos:
-                    if random.random() < tasa_mutacion_actual:
-                        _mutar(h, pista_fija)
-
-                    if len(nueva_poblacion) < tam_poblacion:
-                        nueva_poblacion.append(h)
+                    control.diversidad = _diversidad(poblacion, mejor_ind, libres)
+            accion = control.decidir()
+            if accion is not None and accion != "reiniciar":
+                return self.best_board, gen + 1, accion
+            tasa_mutacion_actual = control.tasa_mutacion(tasa_mutacion)
+            if prof is not None:
+                t0 = prof.lap("politica", t0)
+
+            # la élite se conserva siempre (y no se modifica in situ: los
+            # individuos pueden compartirse entre generaciones y sólo se
+            # copian al mutarlos)
+            nueva_poblacion = [poblacion[i] for i in orden[:n_elite_poblacion]]
+
+            if accion == "reiniciar":
+                # el resto se vuelve a sembrar al azar
+                self.restarts = control.reinicios
+                nueva_poblacion.extend(self._poblacion(base_grid, tam_poblacion - len(nueva_poblacion)))
+                if prof is not None:
+                    t0 = prof.lap("reinicio", t0)
+                    prof.count("reinicios")
+            else:
+                padres = None
+                if seleccion == "pool":
+                    # crear pool de índices (elitismo + aleatorio)
+                    pool, _ = _crear_pool(orden, len(poblacion), tam_pool, proporcion_elitismo, rng)
+                    if prof is not None:
+                        t0 = prof.lap("pool", t0)
+                else:
+                    # todos los padres de la generación de una vez (dos por cada par de hijos)
+                    n_padres = 2 * ((tam_poblacion - len(nueva_poblacion) + 1) // 2)
+                    padres = iter(select_parents(
+                        seleccion, penales, n_padres, rng,
+                        self.params.tournament_size, self.params.rank_pressure,
+                    ))
+
+                # resto mediante cruce + mutación
+                while len(nueva_poblacion) < tam_poblacion:
+                    if padres is None:
+                        p1 = poblacion[rng.choice(pool)]
+                        p2 = poblacion[rng.choice(pool)]
                     else:
-                        break
+                        p1 = poblacion[next(padres)]
+                        p2 = poblacion[next(padres)]
+                    if prof is not None:
+                        t0 = prof.lap("seleccion", t0)
+
+                    if rng.random() < tasa_cruce:
+                        # hijos nuevos: bloque (o filas enteras) intercambiado
+                        if esquema is not None:
+                            h1, h2 = esquema.cruzar(p1, p2, rng)
+                        else:
+                            h1, h2, filas = _intercambiar_bloque(p1, p2, pista_fija, rng)
+                        if prof is not None:
+                            t0 = prof.lap("cruce", t0)
+                            prof.count("cruces")
+                            prof.count("copias", 2)
+                        if esquema is None:
+                            # las permutaciones no necesitan reparación
+                            reparadas = _reparar_filas(h1, pista_fija, rng, filas)
+                            reparadas += _reparar_filas(h2, pista_fija, rng, filas)
+                            if prof is not None:
+                                t0 = prof.lap("reparacion", t0)
+                                prof.count("reparaciones", reparadas)
+                        hijos = (h1, h2)
+                        propios = True
+                    else:
+                        hijos = (p1, p2)
+                        propios = False
+
+                    for h in hijos:
+                        if rng.random() < tasa_mutacion_actual:
+                            if not propios:
+                                h = h.copiar()   # copia al escribir
+                                if prof is not None:
+                                    prof.count("copias")
+                            if esquema is not None:
+                                esquema.mutar(h, rng)
+                            else:
+                                _mutar(h, pista_fija, rng)
+                            if prof is not None:
+                                t0 = prof.lap("mutacion", t0)
+                                prof.count("mutaciones")
+
+                        if len(nueva_poblacion) < tam_poblacion:
+                            nueva_poblacion.append(h)
+                        else:
+                            break
 
             self.population = nueva_poblacion
 
+            if self.on_generation is not None:
+                detener = self.on_generation(gen)
+                if prof is not None:
+                    prof.lap("hook", t0)
+                if detener:
+                    causa = "detenido"
+                    return self.best_board, gen + 1, causa
+
+        causa = "estancamiento" if control.estancada else "max_generaciones"
+
         # fin del bucle: no se encontró solución perfecta
         if self.best_board is None:
             # fallback: usar mejor tablero conocido (o el inicial)
@@ -385,3 +927,46 @@ class GeneticEngine:
             self.best_generation = max_generaciones
 
         return self.best_board, max_generaciones, causa
+
+    # ------------------------------------------------------
+    # Migración (modelo de islas)
+    # ------------------------------------------------------
+    def emigrants(self, k: int) -> List[List[List[int]]]:
+        """Copias de los k mejores tableros de la población actual."""
+        mejores = heapq.nsmallest(k, self.population, key=lambda ind: ind.penal)
+        return [_copiar_tablero(ind.tablero) for ind in mejores]
+
+    def immigrate(self, tableros: List[List[List[int]]]) -> None:
+        """Reemplaza a los peores individuos por los tableros recibidos."""
+        if not tableros:
+            return
+        orden = heapq.nlargest(len(tableros), range(len(self.population)), key=lambda i: self.population[i].penal)
+        for idx, tablero in zip(orden, tableros):
+            self.population[idx] = self._individuo(_copiar_tablero(tablero))
+
+
+ENGINES = ("python", "numpy", "exact")
+ENCODINGS = ("grid", "permutation")
+
+
+def create_engine(
+    initial_board: SudokuBoard,
+    params: GeneticParams,
+    candidates: Optional[List[List[Set[int]]]] = None,
+):
+    """Construye el motor indicado en `params.engine` (o el modelo de islas)."""
+    if params.engine == "numpy" and params.encoding != "grid":
+        # el motor vectorizado sólo tiene el cromosoma de tablero completo
+        raise ValueError(f"El motor 'numpy' no admite la codificación '{params.encoding}'. Use: grid.")
+    if params.engine == "exact":
+        from exact_solver import ExactSolver
+        return ExactSolver(initial_board, params, candidates)
+    if params.islands > 1:
+        from islands import IslandModel
+        return IslandModel(initial_board, params, candidates)
+    if params.engine == "python":
+        return GeneticEngine(initial_board, params, candidates)
+    if params.engine == "numpy":
+        from genetic_numpy import NumpyGeneticEngine
+        return NumpyGeneticEngine(initial_board, params, candidates)
+    raise ValueError(f"Motor desconocido: {params.engine}. Use: {', '.join(ENGINES)}.")
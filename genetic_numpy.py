@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+import random
+from typing import Callable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sólo lo necesita este motor
+    np = None
+
+from sudoku_board import SudokuBoard
+from validator import Validator
+from genetic import (
+    GeneticParams,
+    _ControlEstancamiento,
+    _EtapaMemetica,
+    _generar_individuo_inicial,
+    _validar_operadores,
+)
+from geometry import geometry
+
+
+# ==========================================================
+# GA vectorizado: toda la población en un arreglo (pop, N, N)
+#   - Misma lógica que GeneticEngine, pero cada operador
+#     trabaja sobre el lote completo de individuos.
+# ==========================================================
+
+def _indices_bloques(size: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Devuelve (celdas de cada bloque como índices planos, bloque de cada celda)."""
+    geo = geometry(size)
+    return np.array(geo.blocks, dtype=np.intp), np.array(geo.block_grid, dtype=np.intp)
+
+
+def _penalizaciones_lote(poblacion: "np.ndarray", celdas_bloque: "np.ndarray") -> "np.ndarray":
+    """Penalización de cada individuo (repetidos en filas, columnas y bloques).
+
+    Cuenta valores por unidad con un único bincount desplazado, de modo que
+    todos los individuos se evalúan a la vez.
+    """
+    pop, size, _ = poblacion.shape
+    valores = poblacion.astype(np.intp) - 1
+    desplazamiento = (np.arange(pop * size, dtype=np.intp) * size)[:, None]
+
+    penal = np.zeros(pop, dtype=np.intp)
+    unidades = (
+        valores,                                        # filas
+        valores.transpose(0, 2, 1),                     # columnas
+        valores.reshape(pop, size * size)[:, celdas_bloque],  # subcuadrículas
+    )
+    for u in unidades:
+        planos = u.reshape(pop * size, size) + desplazamiento
+        conteo = np.bincount(planos.ravel(), minlength=pop * size * size)
+        distintos = np.count_nonzero(conteo.reshape(pop, size, size), axis=2)
+        penal += (size - distintos).sum(axis=1)
+    return penal
+
+
+def _reparar_filas_lote(
+    poblacion: "np.ndarray",
+    pista_fija: "np.ndarray",
+    rng: "np.random.Generator",
+) -> None:
+    """Reparación por filas sobre todo el lote: reemplaza duplicados en casillas NO fijas.
+
+    Una casilla libre se reemplaza si su valor ya apareció antes en la fila
+    o coincide con una pista fija de la misma fila; los valores faltantes
+    se asignan en orden aleatorio.
+    """
+    pop, size, _ = poblacion.shape
+    iguales = poblacion[:, :, :, None] == poblacion[:, :, None, :]
+    anterior = np.tril(np.ones((size, size), dtype=bool), k=-1)
+    repetida_antes = (iguales & anterior).any(axis=3)
+    repite_pista = (iguales & pista_fija[None, :, None, :]).any(axis=3)
+    reemplazar = ~pista_fija[None] & (repetida_antes | repite_pista)
+    if not reemplazar.any():
+        return
+
+    # valores faltantes por fila, barajados: los presentes se mandan al final
+    presentes = np.zeros((pop, size, size + 1), dtype=bool)
+    np.put_along_axis(presentes, poblacion.astype(np.intp), True, axis=2)
+    claves = rng.random((pop, size, size)) + presentes[:, :, 1:]
+    faltantes = np.argsort(claves, axis=2) + 1
+
+    rango = np.cumsum(reemplazar, axis=2) - 1
+    nuevos = np.take_along_axis(faltantes, np.clip(rango, 0, size - 1), axis=2)
+    poblacion[reemplazar] = nuevos[reemplazar].astype(poblacion.dtype)
+
+
+def _cruce_subcuadriculas_lote(
+    padresA: "np.ndarray",
+    padresB: "np.ndarray",
+    pista_fija: "np.ndarray",
+    bloque_de_celda: "np.ndarray",
+    aplicar: "np.ndarray",
+    rng: "np.random.Generator",
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Intercambia un bloque al azar entre cada par de padres (sólo donde `aplicar`)."""
+    pares, size, _ = padresA.shape
+    bloques = rng.integers(0, size, pares)
+    mascara = (bloque_de_celda[None] == bloques[:, None, None]) & ~pista_fija[None]
+    mascara &= aplicar[:, None, None]
+
+    hijos1 = np.where(mascara, padresB, padresA)
+    hijos2 = np.where(mascara, padresA, padresB)
+    return hijos1, hijos2
+
+
+def _mutar_lote(
+    poblacion: "np.ndarray",
+    pista_fija: "np.ndarray",
+    mutar: "np.ndarray",
+    rng: "np.random.Generator",
+) -> None:
+    """Mutación: intercambia dos casillas no fijas dentro de una fila al azar."""
+    pop, size, _ = poblacion.shape
+    idx = np.flatnonzero(mutar)
+    if idx.size == 0:
+        return
+
+    filas = rng.integers(0, size, idx.size)
+    fijas = pista_fija[filas]
+    claves = rng.random((idx.size, size)) + fijas
+    cols = np.argsort(claves, axis=1)[:, :2]
+
+    validos = (size - fijas.sum(axis=1)) >= 2
+    idx, filas, cols = idx[validos], filas[validos], cols[validos]
+    c1, c2 = cols[:, 0], cols[:, 1]
+    v1 = poblacion[idx, filas, c1]
+    poblacion[idx, filas, c1] = poblacion[idx, filas, c2]
+    poblacion[idx, filas, c2] = v1
+
+
+def _mejores_lote(penalizaciones: "np.ndarray", k: int, peores: bool = False) -> "np.ndarray":
+    """Índices de las k menores (o mayores) penalizaciones, en el orden de un argsort estable.
+
+    argpartition separa los k primeros en O(n) y sólo esos se ordenan; la
+    clave (penalización, índice) es única, así que el resultado coincide
+    con `np.argsort(penalizaciones, kind="stable")[:k]` (o su reverso).
+    """
+    n = penalizaciones.size
+    k = min(max(k, 1), n)
+    clave = penalizaciones.astype(np.int64) * n + np.arange(n)
+    if peores:
+        clave = -clave
+    idx = np.argpartition(clave, k - 1)[:k] if k < n else np.arange(n)
+    return idx[np.argsort(clave[idx])]
+
+
+def _seleccion_lote(
+    metodo: str,
+    penalizaciones: "np.ndarray",
+    n: int,
+    params: GeneticParams,
+    rng: "np.random.Generator",
+) -> "np.ndarray":
+    """n índices de padres (versión vectorizada de selection.select_parents)."""
+    total = penalizaciones.size
+    if metodo == "tournament":
+        competidores = rng.integers(0, total, (n, max(1, params.tournament_size)))
+        return competidores[np.arange(n), np.argmin(penalizaciones[competidores], axis=1)]
+
+    if metodo == "sus":
+        pesos = 1.0 / (1.0 + penalizaciones)
+    elif total < 2:
+        pesos = np.ones(total)
+    else:
+        # ranking lineal; los empates comparten el rango medio (conteo por valor, sin ordenar)
+        presion = min(2.0, max(1.0, params.rank_pressure))
+        conteo = np.bincount(penalizaciones)
+        rango = np.cumsum(conteo) - conteo + (conteo - 1) / 2
+        pesos = presion - 2 * (presion - 1) / (total - 1) * rango[penalizaciones]
+
+    # muestreo universal estocástico: n punteros equiespaciados, un único giro
+    acumulado = np.cumsum(pesos)
+    paso = acumulado[-1] / n
+    punteros = (rng.random() + np.arange(n)) * paso
+    elegidos = np.minimum(np.searchsorted(acumulado, punteros, side="right"), total - 1)
+    return rng.permutation(elegidos)
+
+
+def _diversidad_lote(poblacion: "np.ndarray", idx_mejor: int, libres: "np.ndarray") -> float:
+    """Distancia de Hamming media al mejor individuo, sobre casillas libres (0..1)."""
+    n_libres = int(libres.sum())
+    if n_libres == 0 or poblacion.shape[0] < 2:
+        return 0.0
+    distintas = (poblacion[:, libres] != poblacion[idx_mejor][libres]).sum()
+    return float(distintas) / (poblacion.shape[0] * n_libres)
+
+
+class NumpyGeneticEngine:
+    """
+    Variante vectorizada de GeneticEngine.
+    - La población completa vive en un arreglo int8 de forma (pop, N, N).
+    - Expone la misma interfaz (run, best_board, historial) que GeneticEngine.
+    """
+
+    def __init__(
+        self,
+        initial_board: SudokuBoard,
+        params: GeneticParams,
+        candidates: Optional[List[List[Set[int]]]] = None,
+    ):
+        if np is None:
+            raise RuntimeError("El motor 'numpy' requiere instalar numpy (pip install numpy).")
+        _validar_operadores(params)
+        self.initial_board = initial_board
+        self.params = params
+        self.candidates = candidates   # candidatos legales por casilla (propagación)
+        self.rng = np.random.default_rng(params.seed)
+
+        self.population: Optional["np.ndarray"] = None
+        self.best_board: Optional[SudokuBoard] = None
+        self.best_fitness: Optional[int] = None   # penalización mínima
+        self.best_generation: int = 0
+        self.best_fitness_history: List[int] = []  # historial de penalización
+        self.restarts: int = 0                     # reinicios por estancamiento en la última corrida
+        # etapa memética de la última corrida (ver GeneticEngine)
+        self.local_search_time: float = 0.0
+        self.local_search_calls: int = 0
+        self.local_search_improvements: int = 0
+
+        # hook opcional por generación (ver GeneticEngine.on_generation)
+        self.on_generation: Optional[Callable[[int], bool]] = None
+        self._celdas_bloque: Optional["np.ndarray"] = None
+
+    # ------------------------------------------------------
+    # Inicializar población: cada fila se llena con una
+    # permutación aleatoria de sus valores faltantes
+    # ------------------------------------------------------
+    def _init_population(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        self.rng = np.random.default_rng(self.params.seed)   # cada run() repite la misma corrida
+        size = self.initial_board.size
+        base_grid = np.frombuffer(self.initial_board.cells, dtype=np.int8).reshape(size, size).copy()
+        pista_fija = base_grid != 0
+
+        self.population = self._poblacion_aleatoria(base_grid, pista_fija, self.params.population_size)
+        self.best_board = None
+        self.best_fitness = None
+        self.best_generation = 0
+        self.best_fitness_history = []
+
+        return base_grid, pista_fija
+
+    def _poblacion_aleatoria(self, base_grid: "np.ndarray", pista_fija: "np.ndarray", pop: int) -> "np.ndarray":
+        size = base_grid.shape[0]
+        if self.candidates is not None:
+            # respetar candidatos exige decidir casilla a casilla
+            grid = self.initial_board.grid
+            rng_filas = random.Random(int(self.rng.integers(2 ** 32)))
+            poblacion = np.array(
+                [_generar_individuo_inicial(grid, rng_filas, self.candidates) for _ in range(pop)],
+                dtype=np.int8,
+            )
+        else:
+            poblacion = np.repeat(base_grid[None], pop, axis=0)
+            for fila in range(size):
+                vacias = np.flatnonzero(~pista_fija[fila])
+                if vacias.size == 0:
+                    continue
+                presentes = set(base_grid[fila][pista_fija[fila]].tolist())
+                faltantes = np.array(
+                    [n for n in range(1, size + 1) if n not in presentes], dtype=np.int8
+                )
+                claves = self.rng.random((pop, faltantes.size))
+                permutados = faltantes[np.argsort(claves, axis=1)]
+                n = min(vacias.size, faltantes.size)
+                poblacion[:, fila, vacias[:n]] = permutados[:, :n]
+        return poblacion
+
+    # ------------------------------------------------------
+    # Ejecutar GA (mismo esquema que GeneticEngine.run)
+    # ------------------------------------------------------
+    def run(self) -> Tuple[SudokuBoard, int, str]:
+        """
+        Devuelve:
+          - mejor tablero encontrado (SudokuBoard)
+          - generaciones realmente usadas
+          - causa de término: las mismas de GeneticEngine.run
+        """
+        base_grid, pista_fija = self._init_population()
+        size = self.initial_board.size
+        celdas_bloque, bloque_de_celda = _indices_bloques(size)
+        self._celdas_bloque = celdas_bloque
+        rng = self.rng
+
+        tam_poblacion = self.params.population_size
+        max_generaciones = self.params.max_generations
+
+        tam_pool = max(2, tam_poblacion // 2)
+        proporcion_elitismo = self.params.elite_ratio
+        tasa_cruce = 0.9
+        tasa_mutacion = self.params.mutation_rate
+
+        n_elite_pool = int(tam_pool * proporcion_elitismo)
+        n_elite_poblacion = min(tam_poblacion, max(1, int(tam_poblacion * proporcion_elitismo)))
+        n_hijos = tam_poblacion - n_elite_poblacion
+        n_pares = (n_hijos + 1) // 2
+        seleccion = self.params.selection
+
+        mejor_global: Optional["np.ndarray"] = None
+        mejor_penal_global: Optional[int] = None
+
+        control = _ControlEstancamiento(self.params)
+        self.restarts = 0
+        libres = ~pista_fija
+
+        # la búsqueda local trabaja con listas (un individuo a la vez)
+        memetica = rng_local = None
+        if self.params.local_search != "off":
+            memetica = _EtapaMemetica(self.params, pista_fija.tolist(), geometry(size).block_grid)
+            rng_local = random.Random(int(rng.integers(2 ** 32)))
+        # sólo se ordena la élite (ver _mejores_lote)
+        n_orden = max(n_elite_poblacion, n_elite_pool, memetica.elites if memetica is not None else 0)
+        self.local_search_time = 0.0
+        self.local_search_calls = 0
+        self.local_search_improvements = 0
+
+        for gen in range(max_generaciones):
+            penalizaciones = _penalizaciones_lote(self.population, celdas_bloque)
+            orden = _mejores_lote(penalizaciones, n_orden)
+
+            if memetica is not None and memetica.toca(gen, control.sin_mejora):
+                for i in orden[:memetica.elites]:
+                    refinado = memetica.refinar(self.population[i].tolist(), int(penalizaciones[i]), rng_local)
+                    if refinado is not None:
+                        self.population[i] = np.array(refinado[0], dtype=np.int8)
+                        penalizaciones[i] = refinado[1]
+                orden = _mejores_lote(penalizaciones, n_orden)
+                self.local_search_time = memetica.tiempo
+                self.local_search_calls = memetica.llamadas
+                self.local_search_improvements = memetica.mejoras
+            idx_mejor = int(orden[0])
+            penal = int(penalizaciones[idx_mejor])
+
+            self.best_fitness_history.append(penal)
+
+            if (mejor_penal_global is None) or (penal < mejor_penal_global):
+                mejor_penal_global = penal
+                mejor_global = self.population[idx_mejor].copy()
+                self.best_fitness = penal
+                self.best_board = SudokuBoard.from_list(mejor_global.tolist())
+                self.best_generation = gen
+
+            if penal == 0:
+                causa = "solucion"
+                return self.best_board, gen + 1, causa
+
+            # política de estancamiento (ver _ControlEstancamiento)
+            control.registrar(penal)
+            if control.medir_diversidad(gen):
+                control.diversidad = _diversidad_lote(self.population, idx_mejor, libres)
+            accion = control.decidir()
+            if accion is not None and accion != "reiniciar":
+                return self.best_board, gen + 1, accion
+            tasa_mutacion_actual = control.tasa_mutacion(tasa_mutacion)
+
+            elite = self.population[orden[:n_elite_poblacion]]
+            if accion == "reiniciar":
+                # se conserva la élite y el resto se vuelve a sembrar
+                self.restarts = control.reinicios
+                nuevos = self._poblacion_aleatoria(base_grid, pista_fija, n_hijos)
+                self.population = np.concatenate([elite, nuevos])
+                if self.on_generation is not None and self.on_generation(gen):
+                    return self.best_board, gen + 1, "detenido"
+                continue
+
+            if seleccion == "pool":
+                # pool por índices (elitismo + aleatorio), sin copiar tableros
+                pool = np.concatenate([
+                    orden[:n_elite_pool],
+                    rng.integers(0, tam_poblacion, tam_pool - n_elite_pool),
+                ])
+
+            if n_pares == 0:
+                self.population = elite.copy()
+            else:
+                if seleccion == "pool":
+                    padres1 = self.population[pool[rng.integers(0, tam_pool, n_pares)]]
+                    padres2 = self.population[pool[rng.integers(0, tam_pool, n_pares)]]
+                else:
+                    padres = _seleccion_lote(seleccion, penalizaciones, 2 * n_pares, self.params, rng)
+                    padres1 = self.population[padres[:n_pares]]
+                    padres2 = self.population[padres[n_pares:]]
+                cruzar = rng.random(n_pares) < tasa_cruce
+
+                hijos1, hijos2 = _cruce_subcuadriculas_lote(
+                    padres1, padres2, pista_fija, bloque_de_celda, cruzar, rng
+                )
+                hijos = np.concatenate([hijos1, hijos2])[:n_hijos]
+                _reparar_filas_lote(hijos, pista_fija, rng)
+                _mutar_lote(hijos, pista_fija, rng.random(n_hijos) < tasa_mutacion_actual, rng)
+
+                self.population = np.concatenate([elite, hijos])
+
+            if self.on_generation is not None and self.on_generation(gen):
+                causa = "detenido"
+                return self.best_board, gen + 1, causa
+
+        causa = "estancamiento" if control.estancada else "max_generaciones"
+        if self.best_board is None:
+            self.best_board = self.initial_board.copy()
+            self.best_fitness = Validator.fitness_penalty(self.best_board)
+            self.best_generation = max_generaciones
+
+        return self.best_board, max_generaciones, causa
+
+    # ------------------------------------------------------
+    # Migración (modelo de islas)
+    # ------------------------------------------------------
+    def emigrants(self, k: int) -> List[List[List[int]]]:
+        """Copias de los k mejores tableros de la población actual."""
+        penalizaciones = _penalizaciones_lote(self.population, self._celdas_bloque)
+        mejores = _mejores_lote(penalizaciones, k)
+        return self.population[mejores].tolist()
+
+    def immigrate(self, tableros: List[List[List[int]]]) -> None:
+        """Reemplaza a los peores individuos por los tableros recibidos."""
+        if not tableros:
+            return
+        penalizaciones = _penalizaciones_lote(self.population, self._celdas_bloque)
+        peores = _mejores_lote(penalizaciones, len(tableros), peores=True)
+        self.population[peores] = np.array(tableros[:len(peores)], dtype=np.int8)
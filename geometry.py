@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, Tuple
+
+
+# ==========================================================
+# Geometría del tablero por tamaño (se calcula una vez y se cachea)
+#   - Casilla plana i = fila * size + col.
+#   - Bloques numerados por filas, de izquierda a derecha.
+#   - Un tamaño nuevo sólo necesita su forma de subcuadrícula aquí.
+# ==========================================================
+
+SUBGRIDS = {4: (2, 2), 6: (2, 3), 9: (3, 3), 12: (3, 4), 16: (4, 4), 25: (5, 5)}
+SUPPORTED_SIZES = tuple(SUBGRIDS)
+
+
+class Geometry:
+    """Tablas de índices de un tamaño de tablero (sólo lectura)."""
+
+    __slots__ = (
+        "size", "sg_r", "sg_c", "n_cells",
+        "row_of", "col_of", "block_of", "block_grid",
+        "rows", "cols", "blocks", "units", "units_of",
+        "block_coords", "peers", "block_masks",
+    )
+
+    def __init__(self, size: int):
+        if size not in SUBGRIDS:
+            raise ValueError(f"Tamaño de Sudoku no soportado: {size}")
+        sg_r, sg_c = SUBGRIDS[size]
+        bloques_por_fila = size // sg_c
+        n = size * size
+        self.size = size
+        self.sg_r = sg_r
+        self.sg_c = sg_c
+        self.n_cells = n
+
+        # casilla plana -> fila / columna / bloque
+        self.row_of = tuple(i // size for i in range(n))
+        self.col_of = tuple(i % size for i in range(n))
+        self.block_of = tuple(
+            (i // size // sg_r) * bloques_por_fila + (i % size) // sg_c for i in range(n)
+        )
+        # (fila, col) -> bloque, para el código que trabaja con listas de listas
+        self.block_grid = tuple(tuple(self.block_of[f * size:(f + 1) * size]) for f in range(size))
+
+        # unidades como tuplas de casillas planas
+        self.rows = tuple(tuple(range(f * size, (f + 1) * size)) for f in range(size))
+        self.cols = tuple(tuple(range(c, n, size)) for c in range(size))
+        self.blocks = tuple(
+            tuple(i for i in range(n) if self.block_of[i] == b) for b in range(size)
+        )
+        self.units = self.rows + self.cols + self.blocks
+        self.units_of = tuple(
+            (self.rows[self.row_of[i]], self.cols[self.col_of[i]], self.blocks[self.block_of[i]])
+            for i in range(n)
+        )
+        self.block_coords = tuple(
+            tuple((i // size, i % size) for i in bloque) for bloque in self.blocks
+        )
+
+        # pares: casillas que comparten alguna unidad (sin la propia)
+        self.peers = tuple(
+            tuple(sorted(set().union(*self.units_of[i]) - {i})) for i in range(n)
+        )
+        # bit i encendido si la casilla i está en el bloque (mismo orden que SudokuBoard.fixed_mask)
+        self.block_masks = tuple(sum(1 << i for i in bloque) for bloque in self.blocks)
+
+    def index(self, row: int, col: int) -> int:
+        return row * self.size + col
+
+
+@lru_cache(maxsize=None)
+def geometry(size: int) -> Geometry:
+    """Tablas del tamaño dado (una instancia compartida por tamaño)."""
+    return Geometry(size)
+
+
+def subgrid_shape(size: int) -> Tuple[int, int]:
+    """(filas, columnas) de cada subcuadrícula."""
+    try:
+        return SUBGRIDS[size]
+    except KeyError:
+        raise ValueError(f"Tamaño de Sudoku no soportado: {size}")
+
+
+def unit_coords(size: int) -> List[List[Tuple[int, int]]]:
+    """Filas, columnas y bloques como listas de (fila, col)."""
+    geo = geometry(size)
+    return [[(geo.row_of[i], geo.col_of[i]) for i in unidad] for unidad in geo.units]
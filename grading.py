@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple
+
+from sudoku_board import SudokuBoard
+from exact_solver import solve_exact
+from genetic import GeneticParams, create_engine
+from propagation import propagate
+from solution_cache import canonical_form
+
+
+# ==========================================================
+# Dificultad por esfuerzo del solver (no por cantidad de pistas)
+#   - Profundidad de la propagación (pasadas hasta el punto fijo).
+#   - Casillas que la propagación no resuelve y nodos del backtracking
+#     necesarios para completarlas.
+#   - Opcional: generaciones del AG en algunas corridas con semilla.
+# El esfuerzo se mide sobre la forma canónica del tablero, así todas
+# las variantes simétricas reciben la misma nota (y comparten caché).
+# ==========================================================
+
+# banda de puntaje por dificultad: [mínimo, máximo]
+EFFORT_BANDS: Dict[str, Tuple[float, float]] = {
+    "facil": (0, 2),
+    "medio": (3, 4),
+    "dificil": (5, float("inf")),
+}
+
+GA_GRADING_PARAMS = GeneticParams(population_size=100, max_generations=500)
+
+# tope de nodos del backtracking al medir (por casilla del tablero): un
+# tablero casi vacío o armado a propósito no debe trabar el request
+GRADING_NODES_PER_CELL = 100
+
+
+@dataclass(frozen=True)
+class Effort:
+    free_cells: int
+    propagation_rounds: int          # pasadas de propagación (la última no asigna nada)
+    remaining_cells: int             # casillas vacías tras propagar
+    search_nodes: int                # nodos del backtracking tras propagar (1 = no hizo falta)
+    ga_generations: Optional[float] = None   # media de generaciones del AG (si se midió)
+    ga_solved: Optional[float] = None        # fracción de corridas del AG que resolvieron
+    search_capped: bool = False      # la búsqueda llegó al tope de nodos sin terminar
+
+    @property
+    def score(self) -> int:
+        """Pasos de razonamiento: pasadas de propagación útiles + casillas y nodos de búsqueda.
+
+        Con `search_capped` es una cota inferior (la dificultad es "al menos" la informada).
+        """
+        return (self.propagation_rounds - 1) + self.remaining_cells + (self.search_nodes - 1)
+
+    @property
+    def difficulty(self) -> str:
+        return difficulty_for(self.score)
+
+    def to_dict(self) -> dict:
+        return {
+            "score": self.score,
+            "difficulty": self.difficulty,
+            "free_cells": self.free_cells,
+            "propagation_rounds": self.propagation_rounds,
+            "remaining_cells": self.remaining_cells,
+            "search_nodes": self.search_nodes,
+            "ga_generations": self.ga_generations,
+            "ga_solved": self.ga_solved,
+            "search_capped": self.search_capped,
+        }
+
+
+def difficulty_for(score: float) -> str:
+    """Dificultad cuya banda contiene `score` (la más alta si excede todas)."""
+    for nombre, (minimo, maximo) in EFFORT_BANDS.items():
+        if minimo <= score <= maximo:
+            return nombre
+    return "dificil"
+
+
+def band_distance(score: float, difficulty: str) -> float:
+    """0 si `score` está en la banda de `difficulty`; si no, cuánto le falta o le sobra."""
+    minimo, maximo = EFFORT_BANDS[difficulty]
+    return max(minimo - score, score - maximo, 0)
+
+
+def measure_effort(board: SudokuBoard, ga_runs: int = 0, ga_params: GeneticParams = GA_GRADING_PARAMS) -> Effort:
+    """Mide el esfuerzo de resolver `board` tal como está (sin canonizar).
+
+    Con `ga_runs` > 0 además corre el AG con semillas 0..ga_runs-1 (como
+    lo hace el controller: propagación y luego AG sobre lo que queda).
+
+    El backtracking se corta a los GRADING_NODES_PER_CELL * N * N nodos:
+    entonces `search_capped` es True, los nodos quedan en el tope y no se
+    sabe si el tablero tiene solución.
+    """
+    sg_r, sg_c = board.subgrid_size()
+    libres = sum(1 for v in board.cells if v == 0)
+    prop = propagate(board)
+    if prop.contradiction:
+        raise ValueError("El tablero no tiene solución")
+    restantes = sum(1 for row in prop.grid for v in row if v == 0)
+    max_nodes = GRADING_NODES_PER_CELL * board.size * board.size
+    soluciones, nodos = solve_exact(prop.grid, sg_r, sg_c, max_nodes=max_nodes)
+    cortada = nodos > max_nodes
+    if cortada:
+        nodos = max_nodes
+    elif not soluciones:
+        raise ValueError("El tablero no tiene solución")
+
+    ga_generations = ga_solved = None
+    if ga_runs > 0:
+        generaciones = resueltas = 0
+        for seed in range(ga_runs):
+            if prop.solved:
+                resueltas += 1
+                continue
+            engine = create_engine(SudokuBoard.from_list(prop.grid), replace(ga_params, seed=seed), prop.candidates)
+            _, gens, causa = engine.run()
+            generaciones += gens
+            resueltas += causa == "solucion"
+        ga_generations = generaciones / ga_runs
+        ga_solved = resueltas / ga_runs
+
+    return Effort(
+        free_cells=libres,
+        propagation_rounds=prop.rounds,
+        remaining_cells=restantes,
+        search_nodes=nodos,
+        ga_generations=ga_generations,
+        ga_solved=ga_solved,
+        search_capped=cortada,
+    )
+
+
+class GradeCache:
+    """Caché LRU acotada: (forma canónica, corridas del AG) → Effort."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entradas: "OrderedDict[Tuple[bytes, int], Effort]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def grade(self, board: SudokuBoard, ga_runs: int = 0) -> Effort:
+        """Esfuerzo de `board`, medido sobre su forma canónica."""
+        clave, _ = canonical_form(board)
+        with self._lock:
+            effort = self._entradas.get((clave, ga_runs))
+            if effort is not None:
+                self._entradas.move_to_end((clave, ga_runs))
+                self.hits += 1
+                return effort
+            self.misses += 1
+
+        size = board.size
+        canon = SudokuBoard.from_list([list(clave[r * size:(r + 1) * size]) for r in range(size)])
+        effort = measure_effort(canon, ga_runs)
+        with self._lock:
+            self._entradas[(clave, ga_runs)] = effort
+            while len(self._entradas) > self.max_entries:
+                self._entradas.popitem(last=False)
+        return effort
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entradas),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# notas compartidas por todos los controllers del proceso
+default_grades = GradeCache()
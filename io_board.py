@@ -2,14 +2,28 @@ from __future__ import annotations
 
 import os
 import csv
-from typing import List
+from typing import Iterable, Iterator, List, Union
 
 from sudoku_board import SudokuBoard
+from geometry import SUPPORTED_SIZES
 from metrics import RunMetrics
+from profiling import format_profile
 
 
 class BoardIO:
-    SUPPORTED_SIZES = (4, 6, 9)
+    SUPPORTED_SIZES = SUPPORTED_SIZES
+
+    @staticmethod
+    def _parse_token(p: str) -> int:
+        """Valor de una casilla: número (también de dos cifras), letra (A=10 … P=25) o '.' vacía."""
+        if p == ".":
+            return 0
+        if len(p) == 1 and p.isalpha() and p.isascii():
+            return ord(p.upper()) - ord("A") + 10
+        try:
+            return int(p)
+        except ValueError:
+            raise ValueError(f"Valor no numérico encontrado: {p}")
 
     @staticmethod
     def _parse_lines(lines: List[str]) -> List[List[int]]:
@@ -30,10 +44,7 @@ class BoardIO:
                 p = p.strip()
                 if not p:
                     continue
-                try:
-                    row.append(int(p))
-                except ValueError:
-                    raise ValueError(f"Valor no numérico encontrado: {p}")
+                row.append(BoardIO._parse_token(p))
 
             if row:
                 grid.append(row)
@@ -56,6 +67,68 @@ class BoardIO:
 
         return grid
 
+    @staticmethod
+    def _parse_compact(line: str) -> List[List[int]]:
+        """Tablero en una sola línea (p. ej. 81 caracteres); '.' o '0' = vacía.
+
+        Desde 12x12 los valores mayores a 9 se escriben con letras (A=10 … P=25).
+        """
+        size = int(round(len(line) ** 0.5))
+        values: List[int] = []
+        for ch in line:
+            if ch == "." or ch.isdigit() or (ch.isalpha() and ch.isascii()):
+                values.append(BoardIO._parse_token(ch))
+            else:
+                raise ValueError(f"Carácter inválido en tablero de una línea: {ch}")
+        return BoardIO._parse_lines(
+            [" ".join(map(str, values[r * size:(r + 1) * size])) for r in range(size)]
+        )
+
+    @staticmethod
+    def iter_boards(
+        lines: Iterable[str], skip_errors: bool = False
+    ) -> Iterator[Union[List[List[int]], ValueError]]:
+        """Recorre un archivo con muchos tableros sin cargarlo entero.
+
+        Acepta tableros de una línea (16/36/81/144/256/625 caracteres, sin separadores)
+        y tableros de N filas como los de `_parse_lines`, separados por
+        líneas en blanco. Las líneas que empiezan con '#' se ignoran.
+
+        Un tablero mal formado lanza ValueError; con `skip_errors=True` se
+        entrega el ValueError en su lugar y la lectura sigue con el próximo.
+        """
+        def leer(parse, datos):
+            try:
+                return parse(datos)
+            except ValueError as e:
+                if not skip_errors:
+                    raise
+                return e
+
+        compactos = {n * n for n in BoardIO.SUPPORTED_SIZES}
+        pendientes: List[str] = []
+        for raw in lines:
+            line = raw.strip()
+            if line.startswith("#"):
+                continue
+            if not line:
+                if pendientes:
+                    yield leer(BoardIO._parse_lines, pendientes)
+                    pendientes = []
+                continue
+            if not pendientes and len(line) in compactos and "," not in line and " " not in line:
+                yield leer(BoardIO._parse_compact, line)
+                continue
+            pendientes.append(line)
+            # un tablero de N filas queda completo al llegar a la fila N,
+            # aunque no haya línea en blanco después
+            ancho = len(line.split(",") if "," in line else line.split())
+            if len(pendientes) == ancho:
+                yield leer(BoardIO._parse_lines, pendientes)
+                pendientes = []
+        if pendientes:
+            yield leer(BoardIO._parse_lines, pendientes)
+
     @staticmethod
     def load_board(path: str) -> SudokuBoard:
         if not os.path.exists(path):
@@ -72,19 +145,19 @@ class BoardIO:
         with open(path, "w", encoding="utf-8", newline="") as f:
             if ext == ".csv":
                 writer = csv.writer(f)
-                for row in board.grid:
-                    writer.writerow(row)
+                for r in range(board.size):
+                    writer.writerow(board.row(r).tolist())
             else:
-                for row in board.grid:
-                    f.write(" ".join(str(v) for v in row) + "\n")
+                for r in range(board.size):
+                    f.write(" ".join(str(v) for v in board.row(r)) + "\n")
 
     @staticmethod
     def export_solution_and_metrics(board: SudokuBoard, metrics: RunMetrics, path: str) -> None:
         """Exporta tablero y métricas en un solo archivo."""
         with open(path, "w", encoding="utf-8") as f:
             f.write("# TABLERO FINAL\n")
-            for row in board.grid:
-                f.write(" ".join(str(v) for v in row) + "\n")
+            for r in range(board.size):
+                f.write(" ".join(str(v) for v in board.row(r)) + "\n")
 
             f.write("\n# MÉTRICAS\n")
             f.write(f"run_id: {metrics.run_id}\n")
@@ -98,6 +171,11 @@ class BoardIO:
             f.write(f"max_generaciones: {metrics.params.max_generations}\n")
             f.write(f"tasa_mutacion: {metrics.params.mutation_rate}\n")
             f.write(f"elite_ratio: {metrics.params.elite_ratio}\n")
+            f.write(f"motor: {metrics.params.engine}\n")
+            f.write(f"propagacion: {metrics.params.propagation}\n")
+            f.write(f"seleccion: {metrics.params.selection}\n")
+            f.write(f"busqueda_local: {metrics.params.local_search}\n")
+            f.write(f"semilla: {metrics.seed}\n")
 
             f.write("\n# RESULTADOS\n")
             f.write(f"fitness_inicial: {metrics.initial_fitness}\n")
@@ -106,6 +184,31 @@ class BoardIO:
             f.write(f"mejor_generacion: {metrics.best_generation}\n")
             f.write(f"generaciones_usadas: {metrics.generations_used}\n")
             f.write(f"causa_termino: {metrics.termination_cause}\n")
-
-            f.write("\n# HISTORIAL FITNESS\n")
-            f.write(", ".join(str(x) for x in metrics.fitness_history) + "\n")
+            f.write(f"celdas_propagadas: {metrics.propagated_cells}\n")
+            f.write(f"reinicios: {metrics.restarts}\n")
+            if metrics.local_search_calls:
+                f.write(
+                    f"busqueda_local: {metrics.local_search_time:.4f} seg, "
+                    f"{metrics.local_search_calls} refinamientos, {metrics.local_search_improvements} mejoras\n"
+                )
+
+            if metrics.phase_times or metrics.counters:
+                f.write("\n# PERFIL\n")
+                for linea in format_profile(metrics.phase_times, metrics.counters):
+                    f.write(linea + "\n")
+            if metrics.profile_stats:
+                f.write("\n# CPROFILE\n")
+                f.write(metrics.profile_stats.rstrip() + "\n")
+
+            if metrics.islands:
+                f.write("\n# ISLAS\n")
+                for isla in metrics.islands:
+                    f.write(
+                        f"isla {isla.island}: semilla={isla.seed}, mejor_fitness={isla.best_fitness}, "
+                        f"generaciones={isla.generations_used}, causa={isla.termination_cause}, "
+                        f"duracion={isla.duration.total_seconds():.3f} seg, "
+                        f"migrantes_enviados={isla.migrants_sent}, migrantes_recibidos={isla.migrants_received}\n"
+                    )
+
+            f.write(f"\n# HISTORIAL FITNESS (generacion:penalizacion en cada cambio, {len(metrics.fitness_history)} generaciones)\n")
+            f.write(", ".join(f"{g}:{v}" for g, v in metrics.fitness_history.change_points()) + "\n")
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import replace
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sudoku_board import SudokuBoard
+from genetic import GeneticParams, create_engine
+from metrics import IslandMetrics
+
+
+# ==========================================================
+# Modelo de islas: K motores GA en paralelo (un proceso cada uno)
+#   - Migración en anillo cada `migration_interval` generaciones.
+#   - Todas las islas paran en cuanto una llega a penalización 0.
+# ==========================================================
+
+# colas y evento compartidos; se heredan al crear cada proceso del pool
+# (primitivas de multiprocessing: consultarlas no pasa por un Manager)
+_colas: List[Any] = []
+_parar: Any = None
+
+
+def _inicializar_proceso(colas: List[Any], parar: Any) -> None:
+    global _colas, _parar
+    _colas = colas
+    _parar = parar
+    # los migrantes que nadie llegue a leer no deben bloquear la salida
+    for cola in colas:
+        cola.cancel_join_thread()
+
+
+def _ejecutar_isla(
+    indice: int,
+    grid: List[List[int]],
+    params: GeneticParams,
+    candidatos: Optional[List[List[Set[int]]]],
+) -> Dict[str, Any]:
+    """Corre una isla completa dentro de un proceso del pool."""
+    colas, parar = _colas, _parar
+    engine = create_engine(SudokuBoard.from_list(grid), replace(params, islands=1), candidatos)
+
+    n_islas = len(colas)
+    intervalo = max(1, params.migration_interval)
+    enviados = 0
+    recibidos = 0
+
+    def _migrar(gen: int) -> bool:
+        nonlocal enviados, recibidos
+        if parar.is_set():
+            return True
+        if (gen + 1) % intervalo != 0:
+            return False
+
+        emigrantes = engine.emigrants(params.migration_size)
+        colas[(indice + 1) % n_islas].put(emigrantes)
+        enviados += len(emigrantes)
+
+        inmigrantes: List[List[List[int]]] = []
+        while True:
+            try:
+                inmigrantes.extend(colas[indice].get_nowait())
+            except queue.Empty:
+                break
+        engine.immigrate(inmigrantes)
+        recibidos += len(inmigrantes)
+        return False
+
+    if n_islas > 1:
+        engine.on_generation = _migrar
+
+    inicio = time.perf_counter()
+    best_board, generaciones, causa = engine.run()
+    duracion = time.perf_counter() - inicio
+
+    if causa == "solucion":
+        parar.set()
+
+    return {
+        "island": indice,
+        "seed": params.seed,
+        "duration": duracion,
+        "grid": best_board.grid,
+        "best_fitness": engine.best_fitness,
+        "best_generation": engine.best_generation,
+        "generations_used": generaciones,
+        "termination_cause": causa,
+        "fitness_history": engine.best_fitness_history,
+        "migrants_sent": enviados,
+        "migrants_received": recibidos,
+        "local_search": (
+            getattr(engine, "local_search_time", 0.0),
+            getattr(engine, "local_search_calls", 0),
+            getattr(engine, "local_search_improvements", 0),
+        ),
+    }
+
+
+class IslandModel:
+    """
+    Ejecuta `params.islands` motores GA en un ProcessPoolExecutor.
+    Expone la misma interfaz que GeneticEngine (run, best_board, historial),
+    tomando como resultado el de la mejor isla, y además `island_metrics`.
+    """
+
+    def __init__(
+        self,
+        initial_board: SudokuBoard,
+        params: GeneticParams,
+        candidates: Optional[List[List[Set[int]]]] = None,
+    ):
+        self.initial_board = initial_board
+        self.params = params
+        self.candidates = candidates
+
+        self.best_board: Optional[SudokuBoard] = None
+        self.best_fitness: Optional[int] = None
+        self.best_generation: int = 0
+        self.best_fitness_history: List[int] = []
+        self.island_metrics: List[IslandMetrics] = []
+        # etapa memética sumada sobre todas las islas
+        self.local_search_time: float = 0.0
+        self.local_search_calls: int = 0
+        self.local_search_improvements: int = 0
+
+        # las islas corren en otros procesos: el hook sólo se consulta
+        # periódicamente para poder detenerlas (no hay progreso por generación)
+        self.on_generation: Optional[Callable[[int], bool]] = None
+
+    def run(self) -> Tuple[SudokuBoard, int, str]:
+        n_islas = max(1, self.params.islands)
+        semilla_base = self.params.seed if self.params.seed is not None else random.randrange(2 ** 32)
+        semillas = [(semilla_base + i) % (2 ** 32) for i in range(n_islas)]
+        grid = self.initial_board.grid
+
+        ctx = multiprocessing.get_context()
+        parar = ctx.Event()
+        colas = [ctx.Queue() for _ in range(n_islas)]
+        with ProcessPoolExecutor(
+            max_workers=n_islas,
+            mp_context=ctx,
+            initializer=_inicializar_proceso,
+            initargs=(colas, parar),
+        ) as pool:
+            futuros = [
+                pool.submit(_ejecutar_isla, i, grid, replace(self.params, seed=semillas[i]), self.candidates)
+                for i in range(n_islas)
+            ]
+            pendientes = set(futuros)
+            while pendientes:
+                _, pendientes = wait(pendientes, timeout=0.25)
+                if self.on_generation is not None and not parar.is_set() and self.on_generation(-1):
+                    parar.set()
+            resultados = [f.result() for f in futuros]
+
+        for cola in colas:
+            cola.close()
+
+        self.island_metrics = [
+            IslandMetrics(
+                island=r["island"],
+                seed=r["seed"],
+                duration=timedelta(seconds=r["duration"]),
+                best_fitness=r["best_fitness"],
+                best_generation=r["best_generation"],
+                generations_used=r["generations_used"],
+                termination_cause=r["termination_cause"],
+                migrants_sent=r["migrants_sent"],
+                migrants_received=r["migrants_received"],
+            )
+            for r in resultados
+        ]
+
+        self.local_search_time = sum(r["local_search"][0] for r in resultados)
+        self.local_search_calls = sum(r["local_search"][1] for r in resultados)
+        self.local_search_improvements = sum(r["local_search"][2] for r in resultados)
+
+        # la isla ganadora es la de menor penalización (y menos generaciones)
+        mejor = min(resultados, key=lambda r: (r["best_fitness"], r["generations_used"]))
+        self.best_board = SudokuBoard.from_list(mejor["grid"])
+        self.best_fitness = mejor["best_fitness"]
+        self.best_generation = mejor["best_generation"]
+        self.best_fitness_history = mejor["fitness_history"]
+
+        return self.best_board, mejor["generations_used"], mejor["termination_cause"]
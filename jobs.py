@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from metrics import FitnessHistory
+
+if TYPE_CHECKING:
+    from shared_state import SharedStore
+
+
+# ==========================================================
+# Trabajos de resolución en segundo plano (API asíncrona)
+#   - Cada trabajo corre en un hilo del proceso que lo recibió.
+#   - Con un SharedStore el estado, el progreso y el pedido de
+#     cancelación pasan por la base: cualquier worker los consulta.
+# ==========================================================
+
+# cada cuánto un trabajo en curso guarda su progreso y mira si lo cancelaron
+JOB_SYNC_SECONDS = 0.25
+
+
+class SolveJob:
+    """Estado de una resolución lanzada en segundo plano.
+
+    Estados: "en_cola", "ejecutando", "terminado", "cancelado", "error".
+    """
+
+    FINAL_STATES = ("terminado", "cancelado", "error")
+
+    def __init__(self, job_id: str, owner: Optional[str] = None, store: Optional["SharedStore"] = None):
+        self.id = job_id
+        self.owner = owner                  # quién lo lanzó (p. ej. id de sesión)
+        self.status = "en_cola"
+        self.history: List[int] = []        # penalización por generación (progreso)
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+        self.future: Optional[Future] = None
+        self._store = store
+        self._remoto = False                # copia leída de la base (lo corre otro proceso)
+        self._cambios = FitnessHistory()    # el progreso como puntos de cambio, para la base
+        self._ultima_sync = 0.0
+
+    @classmethod
+    def _desde_fila(cls, fila: Dict[str, Any], store: "SharedStore") -> "SolveJob":
+        job = cls(fila["job_id"], fila["owner"], store)
+        job._remoto = True
+        job._cargar(fila)
+        return job
+
+    def _cargar(self, fila: Dict[str, Any]) -> None:
+        puntos, largo = fila["history"]
+        self.status = fila["status"]
+        self.history = list(FitnessHistory.from_change_points(puntos, largo))
+        self.result = fila["result"]
+        self.error = fila["error"]
+        if fila["cancel"]:
+            self.cancel_event.set()
+        if self.finished:
+            self.done_event.set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in self.FINAL_STATES
+
+    def report_progress(self, history: List[int]) -> bool:
+        """Copia los puntos nuevos del historial. Devuelve True si se pidió cancelar."""
+        if len(history) > len(self.history):
+            nuevos = history[len(self.history):]
+            self.history.extend(nuevos)
+            for valor in nuevos:
+                self._cambios.append(valor)
+        if self._store is not None and not self.cancel_event.is_set():
+            ahora = time.monotonic()
+            if ahora - self._ultima_sync >= JOB_SYNC_SECONDS:
+                self._ultima_sync = ahora
+                self._store.update_job(self.id, history=self._historial_guardado())
+                if self._store.cancel_requested(self.id):
+                    self.cancel_event.set()
+        return self.cancel_event.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Espera hasta `timeout` segundos a que termine; True si terminó.
+
+        Si el trabajo es de otro proceso, tras esperar se vuelve a leer de la base.
+        """
+        if not self._remoto:
+            return self.done_event.wait(timeout)
+        time.sleep(timeout)
+        fila = self._store.load_job(self.id)
+        if fila is None:
+            self.done_event.set()   # ya se purgó: queda lo último que se leyó
+            return True
+        self._cargar(fila)
+        return self.finished
+
+    def _historial_guardado(self):
+        return self._cambios.change_points(), len(self._cambios)
+
+    def _guardar(self, **campos) -> None:
+        if self._store is not None:
+            self._store.update_job(self.id, **campos)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "generations": len(self.history),
+            "best_fitness": min(self.history) if self.history else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Registro de trabajos + executor que los corre fuera del request.
+
+    Los trabajos sin terminar (en cola o ejecutando) tienen tope: en total
+    `max_pending` y por dueño `max_pending_per_owner`. Con `store` los
+    topes cuentan los trabajos de todos los procesos y `get`/`cancel`
+    también encuentran los que corren en otro worker.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_finished: int = 100,
+        max_pending: int = 32,
+        max_pending_per_owner: int = 4,
+        store: Optional["SharedStore"] = None,
+    ):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="solve")
+        self._jobs: "OrderedDict[str, SolveJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_finished = max_finished
+        self.max_pending = max_pending
+        self.max_pending_per_owner = max_pending_per_owner
+        self._store = store
+
+    def submit(self, fn: Callable[[SolveJob], Dict[str, Any]], owner: Optional[str] = None) -> Optional[SolveJob]:
+        """Encola `fn(job)`; su valor de retorno queda en `job.result`.
+
+        Devuelve None (sin encolar) si ya se llegó al tope de trabajos sin
+        terminar, en total o de `owner`.
+        """
+        job = SolveJob(uuid.uuid4().hex, owner, self._store)
+        with self._lock:
+            if self._store is not None:
+                total = self._store.count_pending()
+                propios = self._store.count_pending(owner) if owner is not None else 0
+            else:
+                pendientes = [j for j in self._jobs.values() if not j.finished]
+                total = len(pendientes)
+                propios = sum(1 for j in pendientes if owner is not None and j.owner == owner)
+            if total >= self.max_pending or (owner is not None and propios >= self.max_pending_per_owner):
+                return None
+            self._jobs[job.id] = job
+            self._purge()
+            if self._store is not None:
+                self._store.create_job(job.id, owner, job.status)
+                self._store.purge_jobs(self._max_finished)
+        job.future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[SolveJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            fila = self._store.load_job(job_id)
+            if fila is not None:
+                job = SolveJob._desde_fila(fila, self._store)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[SolveJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            if self._store is None:
+                return None
+            # lo corre otro proceso: lo verá en su próxima sincronización
+            self._store.request_cancel(job_id)
+            return self.get(job_id)
+        if job.finished:
+            return job
+        job.cancel_event.set()
+        if self._store is not None:
+            self._store.request_cancel(job_id)
+        if job.future is not None and job.future.cancel():
+            # aún no había empezado: no llegará a ejecutarse
+            job.status = "cancelado"
+            job._guardar(status=job.status)
+            job.done_event.set()
+        return job
+
+    def _run(self, job: SolveJob, fn: Callable[[SolveJob], Dict[str, Any]]) -> None:
+        if job.cancel_event.is_set() or (self._store is not None and self._store.cancel_requested(job.id)):
+            job.status = "cancelado"
+            job._guardar(status=job.status)
+            job.done_event.set()
+            return
+        job.status = "ejecutando"
+        job._guardar(status=job.status)
+        try:
+            job.result = fn(job)
+            job.status = "cancelado" if job.cancel_event.is_set() else "terminado"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "error"
+        finally:
+            try:
+                job._guardar(status=job.status, history=job._historial_guardado(), result=job.result, error=job.error)
+            except Exception as e:
+                # sin poder guardar el resultado, los demás procesos lo verían colgado
+                job.error = f"No se pudo guardar el resultado: {e}"
+                job.status = "error"
+                job._guardar(status=job.status, error=job.error)
+            finally:
+                job.done_event.set()
+
+    def _purge(self) -> None:
+        """Descarta los trabajos terminados más antiguos por encima del límite."""
+        terminados = [jid for jid, j in self._jobs.items() if j.finished]
+        for jid in terminados[:max(0, len(terminados) - self._max_finished)]:
+            del self._jobs[jid]
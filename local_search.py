@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import Dict, List, Tuple
+
+
+# ==========================================================
+# Búsqueda local sobre tableros casi resueltos (etapa memética del AG)
+#   - Movimiento: intercambiar dos casillas libres de una misma fila;
+#     las filas conservan sus valores (siguen siendo permutaciones).
+#   - Conteos por columna y bloque: el costo de cada intercambio sale
+#     en O(1), sin reevaluar el tablero.
+#   - "annealing": recocido simulado con enfriamiento geométrico.
+#   - "tabu": mejor intercambio de una casilla en conflicto, sin poder
+#     deshacerlo durante TABU_TENURE pasos.
+# ==========================================================
+
+LOCAL_SEARCH_METHODS = ("off", "annealing", "tabu")
+
+# temperatura inicial y final del recocido (un intercambio suele costar 1 o 2;
+# empezar caliente deja salir de los óptimos locales de la élite)
+ANNEALING_START = 2.0
+ANNEALING_END = 0.1
+# pasos durante los que un intercambio recién hecho no se puede deshacer
+TABU_TENURE = 10
+
+
+class _Conflictos:
+    """Tablero + conteos por columna y bloque (las filas no cambian con los intercambios)."""
+
+    __slots__ = ("tablero", "bloque_de", "columnas", "bloques", "penal")
+
+    def __init__(self, tablero: List[List[int]], bloque_de):
+        size = len(tablero)
+        self.tablero = [fila[:] for fila in tablero]
+        self.bloque_de = bloque_de
+        self.columnas = [[0] * (size + 1) for _ in range(size)]
+        self.bloques = [[0] * (size + 1) for _ in range(size)]
+        repetidos_filas = 0
+        for f, fila in enumerate(self.tablero):
+            vistos = set()
+            for c, v in enumerate(fila):
+                self.columnas[c][v] += 1
+                self.bloques[bloque_de[f][c]][v] += 1
+                if v in vistos:
+                    repetidos_filas += 1
+                vistos.add(v)
+        # los repetidos por fila son constantes: se suman una vez
+        self.penal = repetidos_filas + sum(
+            n - 1
+            for tabla in (self.columnas, self.bloques)
+            for conteo in tabla
+            for n in conteo[1:]
+            if n > 1
+        )
+
+    def costo(self, f: int, c1: int, c2: int) -> int:
+        """Cambio de penalización si se intercambian (f, c1) y (f, c2)."""
+        a = self.tablero[f][c1]
+        b = self.tablero[f][c2]
+        if a == b:
+            return 0
+        d = _costo_unidad(self.columnas[c1], a, b) + _costo_unidad(self.columnas[c2], b, a)
+        b1 = self.bloque_de[f][c1]
+        b2 = self.bloque_de[f][c2]
+        if b1 != b2:
+            d += _costo_unidad(self.bloques[b1], a, b) + _costo_unidad(self.bloques[b2], b, a)
+        return d
+
+    def intercambiar(self, f: int, c1: int, c2: int, costo: int) -> None:
+        fila = self.tablero[f]
+        a, b = fila[c1], fila[c2]
+        for conteo, sale, entra in (
+            (self.columnas[c1], a, b),
+            (self.columnas[c2], b, a),
+            (self.bloques[self.bloque_de[f][c1]], a, b),
+            (self.bloques[self.bloque_de[f][c2]], b, a),
+        ):
+            conteo[sale] -= 1
+            conteo[entra] += 1
+        fila[c1], fila[c2] = b, a
+        self.penal += costo
+
+    def en_conflicto(self, f: int, c: int) -> bool:
+        v = self.tablero[f][c]
+        return self.columnas[c][v] > 1 or self.bloques[self.bloque_de[f][c]][v] > 1
+
+
+def _costo_unidad(conteo: List[int], sale: int, entra: int) -> int:
+    return (-1 if conteo[sale] > 1 else 0) + (1 if conteo[entra] >= 1 else 0)
+
+
+def _casillas_en_conflicto(estado: _Conflictos, libres: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    return [(f, c) for f, c in libres if estado.en_conflicto(f, c)]
+
+
+def _recocido(
+    estado: _Conflictos,
+    libres: List[Tuple[int, int]],
+    cols_libres: List[List[int]],
+    pasos: int,
+    rng: random.Random,
+) -> Tuple[List[List[int]], int]:
+    mejor = [fila[:] for fila in estado.tablero]
+    mejor_penal = estado.penal
+    temperatura = ANNEALING_START
+    enfriamiento = (ANNEALING_END / ANNEALING_START) ** (1 / max(1, pasos))
+
+    for _ in range(pasos):
+        conflictos = _casillas_en_conflicto(estado, libres)
+        if not conflictos:
+            break
+        f, c1 = rng.choice(conflictos)
+        c2 = rng.choice(cols_libres[f])
+        if c2 != c1:
+            costo = estado.costo(f, c1, c2)
+            if costo <= 0 or rng.random() < math.exp(-costo / temperatura):
+                estado.intercambiar(f, c1, c2, costo)
+                if estado.penal < mejor_penal:
+                    mejor_penal = estado.penal
+                    mejor = [fila[:] for fila in estado.tablero]
+        temperatura *= enfriamiento
+
+    return mejor, mejor_penal
+
+
+def _tabu(
+    estado: _Conflictos,
+    libres: List[Tuple[int, int]],
+    cols_libres: List[List[int]],
+    pasos: int,
+    rng: random.Random,
+) -> Tuple[List[List[int]], int]:
+    mejor = [fila[:] for fila in estado.tablero]
+    mejor_penal = estado.penal
+    prohibido_hasta: Dict[Tuple[int, int, int], int] = {}
+
+    for paso in range(pasos):
+        conflictos = _casillas_en_conflicto(estado, libres)
+        if not conflictos:
+            break
+
+        # mejor intercambio permitido (o prohibido, si supera al mejor hallado)
+        elegido = None
+        mejor_costo = 0
+        empates = 0
+        for f, c1 in conflictos:
+            for c2 in cols_libres[f]:
+                if c2 == c1:
+                    continue
+                costo = estado.costo(f, c1, c2)
+                movimiento = (f, min(c1, c2), max(c1, c2))
+                if prohibido_hasta.get(movimiento, -1) >= paso and estado.penal + costo >= mejor_penal:
+                    continue
+                if elegido is None or costo < mejor_costo:
+                    elegido, mejor_costo, empates = movimiento, costo, 1
+                elif costo == mejor_costo:
+                    # desempate al azar entre los de igual costo (reservoir sampling)
+                    empates += 1
+                    if rng.randrange(empates) == 0:
+                        elegido = movimiento
+        if elegido is None:
+            break
+
+        f, c1, c2 = elegido
+        estado.intercambiar(f, c1, c2, mejor_costo)
+        prohibido_hasta[elegido] = paso + TABU_TENURE
+        if estado.penal < mejor_penal:
+            mejor_penal = estado.penal
+            mejor = [fila[:] for fila in estado.tablero]
+
+    return mejor, mejor_penal
+
+
+def refine(
+    tablero: List[List[int]],
+    pista_fija: List[List[bool]],
+    bloque_de,
+    method: str,
+    steps: int,
+    rng: random.Random,
+) -> Tuple[List[List[int]], int]:
+    """Mejor tablero hallado a partir de `tablero` y su penalización.
+
+    Nunca devuelve algo peor que el tablero de partida; `tablero` no se
+    modifica. `bloque_de` es la tabla (fila, col) -> bloque de geometry.
+    """
+    if method not in LOCAL_SEARCH_METHODS or method == "off":
+        raise ValueError(f"Búsqueda local desconocida: {method}. Use: {', '.join(LOCAL_SEARCH_METHODS[1:])}.")
+    size = len(tablero)
+    estado = _Conflictos(tablero, bloque_de)
+    cols_libres = [[c for c in range(size) if not pista_fija[f][c]] for f in range(size)]
+    # sólo las filas con al menos dos casillas libres admiten intercambios
+    libres = [(f, c) for f in range(size) if len(cols_libres[f]) >= 2 for c in cols_libres[f]]
+    if method == "annealing":
+        return _recocido(estado, libres, cols_libres, steps, rng)
+    return _tabu(estado, libres, cols_libres, steps, rng)
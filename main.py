@@ -4,6 +4,7 @@ from sudoku_board import SudokuBoard
 from validator import Validator
 from controller import SudokuController
 from io_board import BoardIO
+from metrics import APP_DB_PATH, MetricsHistory
 
 
 def print_board(board: SudokuBoard) -> None:
@@ -12,7 +13,7 @@ def print_board(board: SudokuBoard) -> None:
     for r in range(size):
         row_str = ""
         for c in range(size):
-            v = board.grid[r][c]
+            v = board.get(r, c)
             row_str += ("." if v == 0 else str(v)) + " "
             if (c + 1) % sg_c == 0 and c < size - 1:
                 row_str += "| "
@@ -22,7 +23,8 @@ def print_board(board: SudokuBoard) -> None:
 
 
 def main_menu():
-    controller = SudokuController()
+    # el historial persiste junto a la aplicación (como en la app web)
+    controller = SudokuController(metrics_history=MetricsHistory(APP_DB_PATH))
     while True:
         print("\n=== Solucionador de Sudoku con AG ===")
         print("1) Generar nuevo tablero")
@@ -38,7 +40,7 @@ def main_menu():
 
         try:
             if option == "1":
-                size = int(input("Tamaño (4, 6, 9): "))
+                size = int(input("Tamaño (4, 6, 9, 12, 16, 25): "))
                 difficulty = input("Dificultad (facil/medio/dificil): ").strip().lower()
                 board = controller.generate_puzzle(size, difficulty)
                 print("Tablero generado:")
@@ -103,6 +105,14 @@ def main_menu():
                         input(f"Elite ratio [{controller.params.elite_ratio}]: ")
                         or controller.params.elite_ratio
                     )
+                    engine = (
+                        input(f"Motor (python/numpy/exact) [{controller.params.engine}]: ").strip().lower()
+                        or controller.params.engine
+                    )
+                    islands = int(
+                        input(f"Islas (procesos en paralelo) [{controller.params.islands}]: ")
+                        or controller.params.islands
+                    )
                 except ValueError:
                     print("Entrada inválida, se mantienen parámetros anteriores.")
                 else:
@@ -110,6 +120,8 @@ def main_menu():
                     controller.params.max_generations = gens
                     controller.params.mutation_rate = mut
                     controller.params.elite_ratio = elite
+                    controller.params.engine = engine
+                    controller.params.islands = islands
                     print("Parámetros actualizados.")
 
             # ==========================================
@@ -138,6 +150,18 @@ def main_menu():
                 print(f"\nFitness final: {metrics.final_fitness} (mejor: {metrics.best_fitness})")
                 print(f"Generaciones usadas: {metrics.generations_used}")
                 print(f"Causa de término: {metrics.termination_cause}")
+                print(f"Semilla: {metrics.seed}")
+                print(f"Reinicios: {metrics.restarts}")
+                if metrics.local_search_calls:
+                    print(
+                        f"Búsqueda local: {metrics.local_search_time:.3f} seg, "
+                        f"{metrics.local_search_improvements}/{metrics.local_search_calls} refinamientos con mejora"
+                    )
+                for isla in metrics.islands:
+                    print(
+                        f"  Isla {isla.island}: mejor={isla.best_fitness}, "
+                        f"gens={isla.generations_used}, causa={isla.termination_cause}"
+                    )
                 print(f"Bonificación visual (estrellas): {'★' * stars}{'☆' * (3 - stars)}")
 
             elif option == "7":
@@ -153,11 +177,10 @@ def main_menu():
                         )
 
             elif option == "8":
-                runs = controller.get_history()
-                if not runs:
+                last = controller.last_run()
+                if not last:
                     print("No hay ejecuciones para exportar.")
                     continue
-                last = runs[-1]
                 path = input("Ruta del archivo de salida (.txt recomendado): ").strip()
                 if not controller.current_board:
                     print("No hay tablero actual para exportar.")
@@ -1,8 +1,129 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import json
+import os
+import sqlite3
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
 from datetime import datetime, timedelta
-from typing import List, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class FitnessHistory:
+    """Penalización por generación guardada solo como puntos de cambio.
+
+    Se comporta como una lista de solo lectura (len, iteración, índices,
+    slices) pero ocupa un par (generación, valor) por cada cambio: un AG
+    de 2000 generaciones suele tener unas pocas decenas.
+    """
+
+    __slots__ = ("_gens", "_vals", "_len")
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._gens = array("i")
+        self._vals = array("i")
+        self._len = 0
+        for v in values:
+            self.append(v)
+
+    @classmethod
+    def from_change_points(cls, points: Iterable[Tuple[int, int]], length: int) -> "FitnessHistory":
+        hist = cls()
+        for gen, valor in points:
+            hist._gens.append(gen)
+            hist._vals.append(valor)
+        hist._len = length
+        return hist
+
+    def append(self, value: int) -> None:
+        if not self._vals or self._vals[-1] != value:
+            self._gens.append(self._len)
+            self._vals.append(value)
+        self._len += 1
+
+    def change_points(self) -> List[Tuple[int, int]]:
+        return list(zip(self._gens, self._vals))
+
+    def downsample(self, max_points: Optional[int] = None) -> List[List[int]]:
+        """Puntos [generación, valor] para graficar como escalera.
+
+        Siempre incluye el último punto (la curva llega a la última
+        generación). Si hay más cambios que `max_points`, se reparten las
+        generaciones en tramos y de cada uno se conservan el mínimo y el
+        máximo, así los saltos visibles no se pierden.
+        """
+        puntos = [[g, v] for g, v in zip(self._gens, self._vals)]
+        if puntos and puntos[-1][0] != self._len - 1:
+            puntos.append([self._len - 1, puntos[-1][1]])
+        if not max_points or len(puntos) <= max_points:
+            return puntos
+
+        tramos = max(1, (max_points - 2) // 2)
+        ancho = self._len / tramos
+        elegidos = [puntos[0]]
+        tramo_actual, bajo, alto = -1, None, None
+        for p in puntos[1:-1]:
+            tramo = int(p[0] // ancho)
+            if tramo != tramo_actual:
+                if bajo is not None:
+                    elegidos.extend(sorted({id(bajo): bajo, id(alto): alto}.values()))
+                tramo_actual, bajo, alto = tramo, p, p
+            else:
+                if p[1] < bajo[1]:
+                    bajo = p
+                if p[1] > alto[1]:
+                    alto = p
+        if bajo is not None:
+            elegidos.extend(sorted({id(bajo): bajo, id(alto): alto}.values()))
+        elegidos.append(puntos[-1])
+        return elegidos
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[int]:
+        n = len(self._gens)
+        for i in range(n):
+            fin = self._gens[i + 1] if i + 1 < n else self._len
+            valor = self._vals[i]
+            for _ in range(fin - self._gens[i]):
+                yield valor
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self)[idx]
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError("índice fuera del historial")
+        return self._vals[bisect_right(self._gens, idx) - 1]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FitnessHistory):
+            return self._len == other._len and self._gens == other._gens and self._vals == other._vals
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"FitnessHistory(len={self._len}, change_points={self.change_points()})"
+
+
+@dataclass
+class IslandMetrics:
+    island: int
+    seed: int
+    duration: timedelta
+    best_fitness: int
+    best_generation: int
+    generations_used: int
+    termination_cause: str
+    migrants_sent: int = 0
+    migrants_received: int = 0
 
 
 @dataclass
@@ -19,23 +140,371 @@ class RunMetrics:
     best_generation: int
     generations_used: int
     termination_cause: str
-    fitness_history: List[int] = field(default_factory=list)
+    fitness_history: FitnessHistory = field(default_factory=FitnessHistory)
+    islands: List[IslandMetrics] = field(default_factory=list)  # sólo en modo islas
+    propagated_cells: int = 0    # casillas asignadas por propagación antes del AG
+    seed: Optional[int] = None   # semilla del motor (permite repetir la ejecución)
+    restarts: int = 0            # reinicios por estancamiento (ver GeneticParams.max_restarts)
+    # perfilado (GeneticParams.profile): segundos por fase, contadores y salida de cProfile
+    phase_times: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    profile_stats: Optional[str] = None
+    # etapa memética (GeneticParams.local_search): segundos, individuos refinados y cuántos mejoraron
+    local_search_time: float = 0.0
+    local_search_calls: int = 0
+    local_search_improvements: int = 0
+
+    def __post_init__(self):
+        if not isinstance(self.fitness_history, FitnessHistory):
+            self.fitness_history = FitnessHistory(self.fitness_history)
+
+
+# ==========================================================
+# Historial persistente de ejecuciones (SQLite)
+#   - Un registro por ejecución; el historial de fitness va
+#     como blob de pares int16 little-endian (repeticiones, valor).
+#   - Con un archivo nada se guarda en memoria: el consumo no crece con las
+#     ejecuciones registradas.
+# ==========================================================
+
+# por defecto el historial vive en memoria (una base por proceso, compartida
+# por sus hilos): las bibliotecas y los benchmarks no dejan archivos; la app
+# web y la CLI pasan APP_DB_PATH explícitamente
+DEFAULT_DB_PATH = "file:sudoku_metrics?mode=memory&cache=shared"
+APP_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sudoku_metrics.db")
+# 1: historial completo en int16; 2: codificado por tramos; 3: columna restarts;
+# 4: columna profile (JSON con tiempos por fase, contadores y cProfile);
+# 5: columnas de la búsqueda local (local_search_*)
+_VERSION_ESQUEMA = 5
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope             TEXT NOT NULL DEFAULT '',
+    start_time        REAL NOT NULL,
+    duration          REAL NOT NULL,
+    board_size        INTEGER NOT NULL,
+    difficulty        TEXT,
+    params            TEXT NOT NULL,
+    initial_fitness   INTEGER NOT NULL,
+    final_fitness     INTEGER NOT NULL,
+    best_fitness      INTEGER NOT NULL,
+    best_generation   INTEGER NOT NULL,
+    generations_used  INTEGER NOT NULL,
+    termination_cause TEXT NOT NULL,
+    fitness_history   BLOB NOT NULL,
+    islands           TEXT NOT NULL,
+    propagated_cells  INTEGER NOT NULL DEFAULT 0,
+    seed              INTEGER,
+    restarts          INTEGER NOT NULL DEFAULT 0,
+    profile           TEXT,
+    local_search_time REAL NOT NULL DEFAULT 0,
+    local_search_calls INTEGER NOT NULL DEFAULT 0,
+    local_search_improvements INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_scope ON runs (scope, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_scope_time ON runs (scope, start_time);
+CREATE INDEX IF NOT EXISTS idx_runs_scope_size ON runs (scope, board_size, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_scope_difficulty ON runs (scope, difficulty, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_scope_cause ON runs (scope, termination_cause, run_id);
+"""
+
+_COLUMNAS = (
+    "run_id, start_time, duration, board_size, difficulty, params, initial_fitness, "
+    "final_fitness, best_fitness, best_generation, generations_used, termination_cause, "
+    "fitness_history, islands, propagated_cells, seed, restarts, profile, "
+    "local_search_time, local_search_calls, local_search_improvements"
+)
+
+# una conexión por hilo y por archivo (sqlite3 no comparte conexiones entre hilos)
+_conexiones = threading.local()
+# las bases en memoria compartida desaparecen al cerrarse su última conexión:
+# se mantiene una abierta por base mientras viva el proceso
+_anclas: Dict[str, sqlite3.Connection] = {}
+_anclas_lock = threading.Lock()
+
+
+def _es_memoria(path: str) -> bool:
+    return path.startswith("file:") and "mode=memory" in path
+
+
+def _conexion(path: str) -> sqlite3.Connection:
+    abiertas: Dict[str, sqlite3.Connection] = getattr(_conexiones, "abiertas", None)
+    if abiertas is None:
+        abiertas = _conexiones.abiertas = {}
+    con = abiertas.get(path)
+    if con is None:
+        if _es_memoria(path):
+            with _anclas_lock:
+                if path not in _anclas:
+                    _anclas[path] = sqlite3.connect(path, uri=True, check_same_thread=False)
+        con = sqlite3.connect(path, timeout=30, uri=path.startswith("file:"))
+        con.execute("PRAGMA journal_mode=WAL")   # lectores y escritor de otros procesos conviven
+        con.executescript(_ESQUEMA)
+        _migrar(con)
+        abiertas[path] = con
+    return con
+
+
+def _migrar(con: sqlite3.Connection) -> None:
+    version = con.execute("PRAGMA user_version").fetchone()[0]
+    if version >= _VERSION_ESQUEMA:
+        return
+    with con:
+        # las bases sin versión (0) o en versión 1 guardan el historial completo
+        if version < 2:
+            filas = con.execute("SELECT run_id, fitness_history FROM runs").fetchall()
+            for run_id, blob in filas:
+                completo = _int16_desde_bytes(blob)
+                con.execute(
+                    "UPDATE runs SET fitness_history = ? WHERE run_id = ?",
+                    (_empaquetar(FitnessHistory(completo)), run_id),
+                )
+        if version < 3:
+            _asegurar_columna(con, "restarts", "INTEGER NOT NULL DEFAULT 0")
+        if version < 4:
+            _asegurar_columna(con, "profile", "TEXT")
+        if version < 5:
+            _asegurar_columna(con, "local_search_time", "REAL NOT NULL DEFAULT 0")
+            _asegurar_columna(con, "local_search_calls", "INTEGER NOT NULL DEFAULT 0")
+            _asegurar_columna(con, "local_search_improvements", "INTEGER NOT NULL DEFAULT 0")
+        con.execute(f"PRAGMA user_version = {_VERSION_ESQUEMA}")
+
+
+def _asegurar_columna(con: sqlite3.Connection, nombre: str, definicion: str) -> None:
+    """Agrega la columna si la tabla viene de una versión anterior del esquema."""
+    columnas = {fila[1] for fila in con.execute("PRAGMA table_info(runs)")}
+    if nombre not in columnas:
+        con.execute(f"ALTER TABLE runs ADD COLUMN {nombre} {definicion}")
+
+
+def _int16_a_bytes(valores: List[int]) -> bytes:
+    datos = array("h", valores)
+    if sys.byteorder == "big":
+        datos.byteswap()
+    return datos.tobytes()
+
+
+def _int16_desde_bytes(blob: bytes) -> List[int]:
+    datos = array("h")
+    datos.frombytes(blob)
+    if sys.byteorder == "big":
+        datos.byteswap()
+    return datos.tolist()
+
+
+def _empaquetar(historial: FitnessHistory) -> bytes:
+    """Pares (repeticiones, valor); los tramos de más de 32767 se parten."""
+    pares: List[int] = []
+    puntos = historial.change_points()
+    for i, (gen, valor) in enumerate(puntos):
+        fin = puntos[i + 1][0] if i + 1 < len(puntos) else len(historial)
+        largo = fin - gen
+        while largo > 0:
+            tramo = min(largo, 32767)
+            pares.extend((tramo, valor))
+            largo -= tramo
+    return _int16_a_bytes(pares)
+
+
+def _desempaquetar(blob: bytes) -> FitnessHistory:
+    pares = _int16_desde_bytes(blob)
+    puntos: List[Tuple[int, int]] = []
+    gen = 0
+    for i in range(0, len(pares), 2):
+        largo, valor = pares[i], pares[i + 1]
+        if not puntos or puntos[-1][1] != valor:
+            puntos.append((gen, valor))
+        gen += largo
+    return FitnessHistory.from_change_points(puntos, gen)
+
+
+def _params_a_json(params: Any) -> str:
+    return json.dumps(asdict(params) if is_dataclass(params) else params)
+
+
+def _params_desde_json(texto: str) -> Any:
+    from genetic import GeneticParams   # import diferido: genetic no depende de metrics
+
+    datos = json.loads(texto)
+    conocidos = {f.name for f in fields(GeneticParams)}
+    return GeneticParams(**{k: v for k, v in datos.items() if k in conocidos})
+
+
+def _islas_a_json(islas: List[IslandMetrics]) -> str:
+    return json.dumps([
+        dict(asdict(isla), duration=isla.duration.total_seconds()) for isla in islas
+    ])
+
+
+def _islas_desde_json(texto: str) -> List[IslandMetrics]:
+    return [
+        IslandMetrics(**dict(isla, duration=timedelta(seconds=isla["duration"])))
+        for isla in json.loads(texto)
+    ]
+
+
+def _perfil_a_json(run: RunMetrics) -> Optional[str]:
+    if not (run.phase_times or run.counters or run.profile_stats):
+        return None   # sin perfilado: no ocupa espacio
+    return json.dumps({"phase_times": run.phase_times, "counters": run.counters, "stats": run.profile_stats})
+
+
+def _fila_a_run(fila: tuple) -> RunMetrics:
+    (run_id, start, duration, size, difficulty, params, initial, final, best, best_gen,
+     gens, cause, historial, islas, propagadas, seed, reinicios, perfil,
+     ls_tiempo, ls_llamadas, ls_mejoras) = fila
+    perfil = json.loads(perfil) if perfil else {}
+    return RunMetrics(
+        run_id=run_id,
+        start_time=datetime.fromtimestamp(start),
+        duration=timedelta(seconds=duration),
+        board_size=size,
+        difficulty=difficulty,
+        params=_params_desde_json(params),
+        initial_fitness=initial,
+        final_fitness=final,
+        best_fitness=best,
+        best_generation=best_gen,
+        generations_used=gens,
+        termination_cause=cause,
+        fitness_history=_desempaquetar(historial),
+        islands=_islas_desde_json(islas),
+        propagated_cells=propagadas,
+        seed=seed,
+        restarts=reinicios,
+        phase_times=perfil.get("phase_times", {}),
+        counters=perfil.get("counters", {}),
+        profile_stats=perfil.get("stats"),
+        local_search_time=ls_tiempo,
+        local_search_calls=ls_llamadas,
+        local_search_improvements=ls_mejoras,
+    )
 
 
 class MetricsHistory:
-    def __init__(self):
-        self._runs: List[RunMetrics] = []
-        self._next_id: int = 1
+    """Historial de ejecuciones guardado en SQLite.
+
+    `scope` separa historiales que comparten archivo (por ejemplo, una
+    sesión web cada uno); el valor por defecto es el historial global.
+
+    Sin `db_path` el historial queda en memoria (DEFAULT_DB_PATH) y se
+    pierde al terminar el proceso; para persistirlo, pasar un archivo.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, scope: str = ""):
+        self.db_path = db_path
+        self.scope = scope
+        _conexion(db_path)   # crea el esquema de entrada
 
     def add_run(self, **kwargs) -> RunMetrics:
-        run = RunMetrics(run_id=self._next_id, **kwargs)
-        self._runs.append(run)
-        self._next_id += 1
+        run = RunMetrics(run_id=0, **kwargs)
+        con = _conexion(self.db_path)
+        with con:
+            cur = con.execute(
+                "INSERT INTO runs (scope, start_time, duration, board_size, difficulty, params, "
+                "initial_fitness, final_fitness, best_fitness, best_generation, generations_used, "
+                "termination_cause, fitness_history, islands, propagated_cells, seed, restarts, profile, "
+                "local_search_time, local_search_calls, local_search_improvements) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.scope,
+                    run.start_time.timestamp(),
+                    run.duration.total_seconds(),
+                    run.board_size,
+                    run.difficulty,
+                    _params_a_json(run.params),
+                    run.initial_fitness,
+                    run.final_fitness,
+                    run.best_fitness,
+                    run.best_generation,
+                    run.generations_used,
+                    run.termination_cause,
+                    _empaquetar(run.fitness_history),
+                    _islas_a_json(run.islands),
+                    run.propagated_cells,
+                    run.seed,
+                    run.restarts,
+                    _perfil_a_json(run),
+                    run.local_search_time,
+                    run.local_search_calls,
+                    run.local_search_improvements,
+                ),
+            )
+        run.run_id = cur.lastrowid
         return run
 
+    @staticmethod
+    def _filtros(
+        size: Optional[int],
+        difficulty: Optional[str],
+        cause: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> Tuple[str, list]:
+        condiciones, valores = [], []
+        if size is not None:
+            condiciones.append("board_size = ?")
+            valores.append(size)
+        if difficulty is not None:
+            condiciones.append("difficulty = ?")
+            valores.append(difficulty)
+        if cause is not None:
+            condiciones.append("termination_cause = ?")
+            valores.append(cause)
+        if since is not None:
+            condiciones.append("start_time >= ?")
+            valores.append(since.timestamp())
+        if until is not None:
+            condiciones.append("start_time < ?")
+            valores.append(until.timestamp())
+        return "".join(" AND " + c for c in condiciones), valores
+
+    def query(
+        self,
+        size: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        cause: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        newest_first: bool = False,
+    ) -> List[RunMetrics]:
+        """Ejecuciones filtradas (todas opcionales) y paginadas con limit/offset."""
+        where, valores = self._filtros(size, difficulty, cause, since, until)
+        orden = "DESC" if newest_first else "ASC"
+        sql = (
+            f"SELECT {_COLUMNAS} FROM runs WHERE scope = ?{where} "
+            f"ORDER BY run_id {orden} LIMIT ? OFFSET ?"
+        )
+        filas = _conexion(self.db_path).execute(
+            sql, [self.scope, *valores, -1 if limit is None else limit, offset]
+        )
+        return [_fila_a_run(f) for f in filas]
+
+    def count(
+        self,
+        size: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        cause: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> int:
+        where, valores = self._filtros(size, difficulty, cause, since, until)
+        fila = _conexion(self.db_path).execute(
+            f"SELECT COUNT(*) FROM runs WHERE scope = ?{where}", [self.scope, *valores]
+        ).fetchone()
+        return fila[0]
+
+    def last_run(self) -> Optional[RunMetrics]:
+        runs = self.query(limit=1, newest_first=True)
+        return runs[0] if runs else None
+
     def list_runs(self) -> List[RunMetrics]:
-        return list(self._runs)
+        return self.query()
 
     def clear(self) -> None:
-        self._runs.clear()
-        self._next_id = 1
+        con = _conexion(self.db_path)
+        with con:
+            con.execute("DELETE FROM runs WHERE scope = ?", (self.scope,))
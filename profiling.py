@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# ==========================================================
+# Instrumentación opcional de las corridas
+#   - "phases": tiempos acumulados por fase + contadores.
+#   - "cprofile": además envuelve la corrida en cProfile.
+# Con el modo "off" los motores no crean ningún perfilador.
+# ==========================================================
+
+PROFILE_MODES = ("off", "phases", "cprofile")
+
+
+class PhaseProfiler:
+    """Tiempos acumulados por fase y contadores de operaciones."""
+
+    __slots__ = ("times", "counters")
+
+    def __init__(self):
+        self.times: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    def lap(self, fase: str, desde: float) -> float:
+        """Suma a `fase` el tiempo transcurrido desde `desde`; devuelve el instante actual."""
+        ahora = perf_counter()
+        self.times[fase] = self.times.get(fase, 0.0) + (ahora - desde)
+        return ahora
+
+    def count(self, nombre: str, n: int = 1) -> None:
+        self.counters[nombre] = self.counters.get(nombre, 0) + n
+
+
+def run_with_cprofile(fn: Callable[[], Any], top: int = 30) -> Tuple[Any, str]:
+    """Ejecuta `fn` bajo cProfile; devuelve su resultado y las `top` funciones por tiempo acumulado."""
+    perfil = cProfile.Profile()
+    resultado = perfil.runcall(fn)
+    salida = io.StringIO()
+    pstats.Stats(perfil, stream=salida).strip_dirs().sort_stats("cumulative").print_stats(top)
+    return resultado, salida.getvalue()
+
+
+def format_profile(phase_times: Dict[str, float], counters: Dict[str, int]) -> List[str]:
+    """Líneas de texto con las fases (de mayor a menor) y los contadores, para exportar."""
+    total = sum(phase_times.values()) or 1.0
+    lineas = [
+        f"fase {fase}: {seg:.4f} seg ({100 * seg / total:.1f}%)"
+        for fase, seg in sorted(phase_times.items(), key=lambda kv: -kv[1])
+    ]
+    lineas.extend(f"{nombre}: {n}" for nombre, n in sorted(counters.items()))
+    return lineas
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Set
+
+from sudoku_board import SudokuBoard
+from validator import Validator
+from geometry import unit_coords
+
+
+# ==========================================================
+# Propagación de restricciones (previa al AG)
+#   - "naked single": casilla con un único candidato.
+#   - "hidden single": valor que sólo cabe en una casilla de su unidad.
+# ==========================================================
+
+@dataclass
+class PropagationResult:
+    grid: List[List[int]]                 # tablero con las casillas forzadas ya asignadas
+    candidates: List[List[Set[int]]]      # candidatos legales (vacío = casilla asignada)
+    assigned: int = 0                     # casillas fijadas por la propagación
+    rounds: int = 0                       # pasadas completas hasta el punto fijo (profundidad)
+    solved: bool = False
+    contradiction: bool = False           # alguna casilla/unidad se quedó sin opciones
+
+
+def propagate(board: SudokuBoard) -> PropagationResult:
+    """Asigna todas las casillas forzadas por singles desnudos y ocultos.
+
+    Los candidatos iniciales de cada casilla vacía son los valores que
+    Validator.is_move_valid acepta; luego se mantienen por eliminación.
+    """
+    size = board.size
+    grid = board.grid
+
+    candidatos: List[List[Set[int]]] = [[set() for _ in range(size)] for _ in range(size)]
+    for r in range(size):
+        for c in range(size):
+            if grid[r][c] == 0:
+                candidatos[r][c] = {
+                    v for v in range(1, size + 1) if Validator.is_move_valid(board, r, c, v)
+                }
+
+    unidades = unit_coords(size)
+    unidades_de = [[[] for _ in range(size)] for _ in range(size)]
+    for unidad in unidades:
+        for r, c in unidad:
+            unidades_de[r][c].append(unidad)
+
+    resultado = PropagationResult(grid=grid, candidates=candidatos)
+
+    def asignar(r: int, c: int, v: int) -> None:
+        grid[r][c] = v
+        candidatos[r][c] = set()
+        resultado.assigned += 1
+        for unidad in unidades_de[r][c]:
+            for pr, pc in unidad:
+                candidatos[pr][pc].discard(v)
+
+    cambios = True
+    while cambios:
+        cambios = False
+        resultado.rounds += 1
+
+        # singles desnudos
+        for r in range(size):
+            for c in range(size):
+                if grid[r][c] != 0:
+                    continue
+                if not candidatos[r][c]:
+                    resultado.contradiction = True
+                    return resultado
+                if len(candidatos[r][c]) == 1:
+                    asignar(r, c, next(iter(candidatos[r][c])))
+                    cambios = True
+
+        # singles ocultos
+        for unidad in unidades:
+            presentes = {grid[r][c] for r, c in unidad}
+            for v in range(1, size + 1):
+                if v in presentes:
+                    continue
+                lugares = [(r, c) for r, c in unidad if grid[r][c] == 0 and v in candidatos[r][c]]
+                if not lugares:
+                    resultado.contradiction = True
+                    return resultado
+                if len(lugares) == 1:
+                    asignar(lugares[0][0], lugares[0][1], v)
+                    presentes.add(v)
+                    cambios = True
+
+    resultado.solved = (
+        all(v != 0 for row in grid for v in row)
+        and Validator.is_valid_solution(SudokuBoard.from_list(grid))
+    )
+    return resultado
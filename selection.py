@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Sequence
+
+
+# ==========================================================
+# Selección de padres y de la élite (O(población) por generación)
+#   - "pool": élite + individuos al azar uniforme (el esquema original,
+#     lo arma el motor con los índices de `best_indices`).
+#   - "tournament": por cada padre, el mejor de `tournament_size` al azar.
+#   - "sus": muestreo universal estocástico, proporcional a 1 / (1 + penalización).
+#   - "rank": ranking lineal (presión entre 1 y 2) muestreado con SUS.
+# Las penalizaciones son enteros chicos: repartirlas en cubetas por
+# valor ordena la élite sin ordenar la población completa.
+# ==========================================================
+
+SELECTIONS = ("pool", "tournament", "sus", "rank")
+
+
+def _cubetas(penalties: Sequence[int]) -> Dict[int, List[int]]:
+    """Índices agrupados por penalización (cada grupo en orden de índice)."""
+    cubetas: Dict[int, List[int]] = {}
+    for i, p in enumerate(penalties):
+        grupo = cubetas.get(p)
+        if grupo is None:
+            cubetas[p] = [i]
+        else:
+            grupo.append(i)
+    return cubetas
+
+
+def best_indices(penalties: Sequence[int], k: int) -> List[int]:
+    """Índices de las k menores penalizaciones, de mejor a peor.
+
+    Mismo resultado que `sorted(range(n), key=penalties.__getitem__)[:k]`
+    (los empates quedan por índice), en O(n + valores distintos).
+    """
+    mejores: List[int] = []
+    if k <= 0:
+        return mejores
+    cubetas = _cubetas(penalties)
+    for p in sorted(cubetas):
+        mejores.extend(cubetas[p])
+        if len(mejores) >= k:
+            break
+    del mejores[k:]
+    return mejores
+
+
+def tournament(penalties: Sequence[int], n: int, size: int, rng: random.Random) -> List[int]:
+    """n ganadores de torneos de `size` competidores elegidos al azar (con reposición)."""
+    total = len(penalties)
+    ganadores = []
+    for _ in range(n):
+        mejor = rng.randrange(total)
+        for _ in range(size - 1):
+            i = rng.randrange(total)
+            if penalties[i] < penalties[mejor]:
+                mejor = i
+        ganadores.append(mejor)
+    return ganadores
+
+
+def stochastic_universal(weights: Sequence[float], n: int, rng: random.Random) -> List[int]:
+    """n índices proporcionales a `weights` con un único giro de n punteros equiespaciados.
+
+    El resultado se mezcla: los pares de padres no deben salir ordenados por índice.
+    """
+    paso = sum(weights) / n
+    puntero = rng.random() * paso
+    elegidos: List[int] = []
+    acumulado = 0.0
+    for i, w in enumerate(weights):
+        acumulado += w
+        while puntero < acumulado and len(elegidos) < n:
+            elegidos.append(i)
+            puntero += paso
+    # por redondeo puede quedar afuera el último puntero
+    while len(elegidos) < n:
+        elegidos.append(len(weights) - 1)
+    rng.shuffle(elegidos)
+    return elegidos
+
+
+def rank_weights(penalties: Sequence[int], pressure: float) -> List[float]:
+    """Pesos del ranking lineal: el mejor vale `pressure` y el peor 2 - pressure.
+
+    Los empates comparten el rango medio de su grupo.
+    """
+    n = len(penalties)
+    if n < 2:
+        return [1.0] * n
+    pressure = min(2.0, max(1.0, pressure))
+    rango_de: Dict[int, float] = {}
+    inicio = 0
+    cubetas = _cubetas(penalties)
+    for p in sorted(cubetas):
+        m = len(cubetas[p])
+        rango_de[p] = inicio + (m - 1) / 2
+        inicio += m
+    pendiente = 2 * (pressure - 1) / (n - 1)
+    return [pressure - pendiente * rango_de[p] for p in penalties]
+
+
+def select_parents(
+    method: str,
+    penalties: Sequence[int],
+    n: int,
+    rng: random.Random,
+    tournament_size: int = 3,
+    rank_pressure: float = 1.5,
+) -> List[int]:
+    """n índices de padres según `method` ("tournament", "sus" o "rank")."""
+    if method == "tournament":
+        return tournament(penalties, n, max(1, tournament_size), rng)
+    if method == "sus":
+        return stochastic_universal([1.0 / (1 + p) for p in penalties], n, rng)
+    if method == "rank":
+        return stochastic_universal(rank_weights(penalties, rank_pressure), n, rng)
+    raise ValueError(f"Selección desconocida: {method}. Use: {', '.join(SELECTIONS)}.")
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import secrets
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import asdict, fields
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from controller import SudokuController
+from genetic import GeneticParams
+from metrics import MetricsHistory
+from sudoku_board import SudokuBoard
+
+if TYPE_CHECKING:
+    from shared_state import SharedStore
+
+
+# ==========================================================
+# Registro de controllers por sesión (uno por navegador)
+#   - LRU + TTL + tope de memoria aproximado.
+#   - Cada sesión tiene su propio lock para tocar su controller.
+#   - Con un SharedStore los tableros, la dificultad y los parámetros
+#     de cada sesión se guardan en la base: cualquier worker la retoma.
+# ==========================================================
+
+# cada cuánto se renueva en la base el último acceso de una sesión sin cambios
+SESSION_TOUCH_SECONDS = 30.0
+
+_CAMPOS_PARAMS = {f.name for f in fields(GeneticParams)}
+
+
+def _estimar_bytes(controller: SudokuController) -> int:
+    """Estimación gruesa de la memoria que retiene un controller."""
+    total = 512   # el historial vive en SQLite, no en memoria
+    for board in (controller.initial_board, controller.current_board, controller.solution_board):
+        if board is not None:
+            total += 96 + board.size * board.size
+    return total
+
+
+def _tablero_a_dict(board: Optional[SudokuBoard]) -> Optional[Dict[str, Any]]:
+    if board is None:
+        return None
+    return {"size": board.size, "cells": board.cells.tolist(), "fixed": board.fixed_mask}
+
+
+def _tablero_desde_dict(datos: Optional[Dict[str, Any]]) -> Optional[SudokuBoard]:
+    if datos is None:
+        return None
+    # no se usa from_list: marcaría como fijas las casillas completadas
+    return SudokuBoard(datos["size"], array("b", datos["cells"]), datos["fixed"])
+
+
+def _estado_de(controller: SudokuController) -> str:
+    """Lo que define a una sesión, como JSON (el historial ya está en SQLite)."""
+    return json.dumps({
+        "initial": _tablero_a_dict(controller.initial_board),
+        "current": _tablero_a_dict(controller.current_board),
+        "solution": _tablero_a_dict(controller.solution_board),
+        "difficulty": controller.difficulty,
+        "params": asdict(controller.params),
+    }, sort_keys=True)
+
+
+def _cargar_estado(controller: SudokuController, texto: str) -> None:
+    datos = json.loads(texto)
+    controller.initial_board = _tablero_desde_dict(datos["initial"])
+    controller.current_board = _tablero_desde_dict(datos["current"])
+    controller.solution_board = _tablero_desde_dict(datos["solution"])
+    controller.difficulty = datos["difficulty"]
+    # se ignoran campos que ya no existan en GeneticParams
+    controller.params = GeneticParams(**{k: v for k, v in datos["params"].items() if k in _CAMPOS_PARAMS})
+
+
+class Session:
+    __slots__ = ("id", "controller", "lock", "last_access", "size_bytes", "estado", "guardada")
+
+    def __init__(self, session_id: str, controller: SudokuController):
+        self.id = session_id
+        self.controller = controller
+        self.lock = threading.RLock()
+        self.last_access = time.monotonic()
+        self.size_bytes = _estimar_bytes(controller)
+        self.estado: Optional[str] = None   # último estado guardado en / leído de la base
+        self.guardada = 0.0                 # monotonic de la última escritura en la base
+
+
+class SessionRegistry:
+    """Mapa id → Session con expulsión LRU por cantidad, TTL y memoria.
+
+    Sin `store` el registro vive sólo en el proceso. Con `store` la base es
+    la fuente de verdad y el registro es una caché: cada worker lee el
+    estado guardado al recibir la sesión y lo vuelve a guardar en `touch`.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        ttl_seconds: float = 3600.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        factory: Optional[Callable[[str], SudokuController]] = None,
+        store: Optional["SharedStore"] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # factory(session_id) -> controller; por defecto, historial propio en la base por defecto
+        self._factory = factory or (lambda sid: SudokuController(metrics_history=MetricsHistory(scope=sid)))
+        self._store = store
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get_or_create(self, session_id: Optional[str]) -> Session:
+        """Devuelve la sesión (marcándola como recién usada) o crea una nueva."""
+        ahora = time.monotonic()
+        guardado = None
+        if self._store is not None and session_id:
+            guardado = self._store.load_session(session_id, self.ttl_seconds)
+        with self._lock:
+            self._expirar(ahora)
+            sesion = self._sessions.get(session_id) if session_id else None
+            if sesion is not None and self._store is not None and guardado is None:
+                self._quitar(sesion.id)   # expiró en la base (la expulsó otro proceso)
+                sesion = None
+            if sesion is None:
+                sid = session_id if guardado is not None else secrets.token_urlsafe(16)
+                sesion = Session(sid, self._factory(sid))
+                self._sessions[sesion.id] = sesion
+                self._total_bytes += sesion.size_bytes
+            else:
+                self._sessions.move_to_end(sesion.id)
+            sesion.last_access = ahora
+            self._ajustar_capacidad(conservar=sesion.id)
+        if self._store is not None:
+            with sesion.lock:
+                if guardado is None:
+                    self._guardar(sesion, _estado_de(sesion.controller))
+                    self._store.expire_sessions(self.ttl_seconds, self.max_sessions)
+                elif guardado != sesion.estado:
+                    # otro worker la modificó desde la última vez que pasó por aquí
+                    _cargar_estado(sesion.controller, guardado)
+                    sesion.estado = guardado
+        return sesion
+
+    def touch(self, sesion: Session) -> None:
+        """Recalcula el tamaño de la sesión tras usarla, la guarda y aplica el tope."""
+        with sesion.lock:
+            nuevo = _estimar_bytes(sesion.controller)
+            if self._store is not None:
+                # dentro del lock: los guardados quedan en el mismo orden que los cambios
+                estado = _estado_de(sesion.controller)
+                if estado != sesion.estado:
+                    self._guardar(sesion, estado)
+                elif time.monotonic() - sesion.guardada >= SESSION_TOUCH_SECONDS:
+                    self._store.touch_session(sesion.id)
+                    sesion.guardada = time.monotonic()
+        with self._lock:
+            if self._sessions.get(sesion.id) is not sesion:
+                return   # ya fue expulsada
+            self._total_bytes += nuevo - sesion.size_bytes
+            sesion.size_bytes = nuevo
+            self._ajustar_capacidad(conservar=sesion.id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._total_bytes,
+                "evictions": self.evictions,
+            }
+
+    def _guardar(self, sesion: Session, estado: str) -> None:
+        self._store.save_session(sesion.id, estado)
+        sesion.estado = estado
+        sesion.guardada = time.monotonic()
+
+    # ---------- internos (con self._lock tomado) ----------
+    def _quitar(self, session_id: str) -> None:
+        sesion = self._sessions.pop(session_id)
+        self._total_bytes -= sesion.size_bytes
+        self.evictions += 1
+
+    def _expirar(self, ahora: float) -> None:
+        while self._sessions:
+            sid, sesion = next(iter(self._sessions.items()))
+            if ahora - sesion.last_access < self.ttl_seconds:
+                break
+            self._quitar(sid)
+
+    def _ajustar_capacidad(self, conservar: str) -> None:
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._total_bytes > self.max_bytes
+        ):
+            sid = next(iter(self._sessions))
+            if sid == conservar:
+                break
+            self._quitar(sid)
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# ==========================================================
+# Estado compartido entre procesos (SQLite)
+#   - Sesiones: tableros, dificultad y parámetros de cada navegador.
+#   - Trabajos: estado, progreso, resultado y pedido de cancelación.
+#   - Con un servidor WSGI de varios workers cualquier proceso atiende
+#     cualquier request: lo que cada uno guarda en memoria es una caché.
+# ==========================================================
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id  TEXT PRIMARY KEY,
+    last_access REAL NOT NULL,
+    state       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_access ON sessions (last_access);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id   TEXT PRIMARY KEY,
+    owner    TEXT,
+    process  TEXT NOT NULL,
+    status   TEXT NOT NULL,
+    history  TEXT NOT NULL DEFAULT '[[], 0]',
+    result   TEXT,
+    error    TEXT,
+    cancel   INTEGER NOT NULL DEFAULT 0,
+    created  REAL NOT NULL,
+    updated  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, updated);
+"""
+
+FINAL_STATES = ("terminado", "cancelado", "error")
+_FINALES_SQL = ", ".join(f"'{s}'" for s in FINAL_STATES)
+
+# una conexión por hilo, proceso y archivo (sqlite3 no comparte conexiones
+# entre hilos, y las heredadas por fork no se pueden usar en el hijo)
+_conexiones = threading.local()
+# las bases en memoria compartida desaparecen al cerrarse su última conexión
+_anclas: Dict[str, sqlite3.Connection] = {}
+_anclas_lock = threading.Lock()
+
+
+def _conexion(path: str) -> sqlite3.Connection:
+    abiertas: Dict[Tuple[int, str], sqlite3.Connection] = getattr(_conexiones, "abiertas", None)
+    if abiertas is None:
+        abiertas = _conexiones.abiertas = {}
+    clave = (os.getpid(), path)
+    con = abiertas.get(clave)
+    if con is None:
+        if path.startswith("file:") and "mode=memory" in path:
+            with _anclas_lock:
+                if path not in _anclas:
+                    _anclas[path] = sqlite3.connect(path, uri=True, check_same_thread=False)
+        con = sqlite3.connect(path, timeout=30, uri=path.startswith("file:"))
+        con.execute("PRAGMA journal_mode=WAL")   # lectores y escritor de otros procesos conviven
+        con.executescript(_ESQUEMA)
+        abiertas[clave] = con
+    return con
+
+
+def process_tag() -> str:
+    """Identifica al proceso actual ("host:pid") en la tabla de trabajos."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _proceso_vivo(tag: str) -> bool:
+    """False sólo si `tag` es de esta máquina y ese proceso ya no existe."""
+    host, _, pid = tag.rpartition(":")
+    if host != socket.gethostname() or os.name != "posix":
+        return True   # no se puede comprobar: se asume vivo
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+class SharedStore:
+    """Sesiones y trabajos de la aplicación web en una base SQLite.
+
+    Todos los workers que apuntan al mismo archivo ven las mismas sesiones
+    y los mismos trabajos. La base se crea con el primer uso, no al
+    construir el objeto (un proceso maestro con --preload no abre nada).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def _con(self) -> sqlite3.Connection:
+        return _conexion(self.db_path)
+
+    # ---------- sesiones ----------
+    def load_session(self, session_id: str, ttl_seconds: float) -> Optional[str]:
+        """Estado guardado de la sesión, o None si no existe o expiró."""
+        fila = self._con().execute(
+            "SELECT state FROM sessions WHERE session_id = ? AND last_access >= ?",
+            (session_id, time.time() - ttl_seconds),
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def save_session(self, session_id: str, state: str) -> None:
+        con = self._con()
+        with con:
+            con.execute(
+                "INSERT INTO sessions (session_id, last_access, state) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET last_access = excluded.last_access, state = excluded.state",
+                (session_id, time.time(), state),
+            )
+
+    def touch_session(self, session_id: str) -> None:
+        con = self._con()
+        with con:
+            con.execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (time.time(), session_id))
+
+    def expire_sessions(self, ttl_seconds: float, max_sessions: int) -> int:
+        """Borra las sesiones vencidas y las más viejas por encima de `max_sessions`."""
+        con = self._con()
+        with con:
+            borradas = con.execute(
+                "DELETE FROM sessions WHERE last_access < ?", (time.time() - ttl_seconds,)
+            ).rowcount
+            borradas += con.execute(
+                "DELETE FROM sessions WHERE session_id NOT IN "
+                "(SELECT session_id FROM sessions ORDER BY last_access DESC LIMIT ?)",
+                (max_sessions,),
+            ).rowcount
+        return borradas
+
+    # ---------- trabajos ----------
+    def create_job(self, job_id: str, owner: Optional[str], status: str) -> None:
+        ahora = time.time()
+        con = self._con()
+        with con:
+            con.execute(
+                "INSERT INTO jobs (job_id, owner, process, status, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, owner, process_tag(), status, ahora, ahora),
+            )
+
+    def update_job(
+        self,
+        job_id: str,
+        status: Optional[str] = None,
+        history: Optional[Tuple[List[Tuple[int, int]], int]] = None,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Actualiza sólo los campos dados; `history` va como (puntos de cambio, largo)."""
+        campos = ["updated = ?"]
+        valores: List[Any] = [time.time()]
+        if status is not None:
+            campos.append("status = ?")
+            valores.append(status)
+        if history is not None:
+            campos.append("history = ?")
+            valores.append(json.dumps(history))
+        if result is not None:
+            campos.append("result = ?")
+            valores.append(json.dumps(result))
+        if error is not None:
+            campos.append("error = ?")
+            valores.append(error)
+        con = self._con()
+        with con:
+            con.execute(f"UPDATE jobs SET {', '.join(campos)} WHERE job_id = ?", (*valores, job_id))
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Fila del trabajo como dict (history = (puntos de cambio, largo)), o None."""
+        self._marcar_huerfanos()
+        fila = self._con().execute(
+            "SELECT job_id, owner, status, history, result, error, cancel FROM jobs WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        if fila is None:
+            return None
+        job_id, owner, status, history, result, error, cancel = fila
+        puntos, largo = json.loads(history)
+        return {
+            "job_id": job_id,
+            "owner": owner,
+            "status": status,
+            "history": ([tuple(p) for p in puntos], largo),
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "cancel": bool(cancel),
+        }
+
+    def request_cancel(self, job_id: str) -> None:
+        con = self._con()
+        with con:
+            con.execute(
+                f"UPDATE jobs SET cancel = 1 WHERE job_id = ? AND status NOT IN ({_FINALES_SQL})", (job_id,)
+            )
+
+    def cancel_requested(self, job_id: str) -> bool:
+        fila = self._con().execute("SELECT cancel FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(fila and fila[0])
+
+    def count_pending(self, owner: Optional[str] = None) -> int:
+        """Trabajos sin terminar de todos los procesos (de `owner`, si se da)."""
+        self._marcar_huerfanos()
+        sql = f"SELECT COUNT(*) FROM jobs WHERE status NOT IN ({_FINALES_SQL})"
+        if owner is None:
+            return self._con().execute(sql).fetchone()[0]
+        return self._con().execute(sql + " AND owner = ?", (owner,)).fetchone()[0]
+
+    def purge_jobs(self, max_finished: int) -> None:
+        """Conserva sólo los `max_finished` trabajos terminados más recientes."""
+        con = self._con()
+        with con:
+            con.execute(
+                f"DELETE FROM jobs WHERE status IN ({_FINALES_SQL}) AND job_id NOT IN "
+                f"(SELECT job_id FROM jobs WHERE status IN ({_FINALES_SQL}) ORDER BY updated DESC LIMIT ?)",
+                (max_finished,),
+            )
+
+    def _marcar_huerfanos(self) -> None:
+        """Trabajos sin terminar cuyo proceso murió (p. ej. un worker reiniciado) pasan a "error"."""
+        con = self._con()
+        procesos = [
+            fila[0]
+            for fila in con.execute(f"SELECT DISTINCT process FROM jobs WHERE status NOT IN ({_FINALES_SQL})")
+        ]
+        muertos = [p for p in procesos if not _proceso_vivo(p)]
+        if not muertos:
+            return
+        with con:
+            con.executemany(
+                f"UPDATE jobs SET status = 'error', error = ?, updated = ? "
+                f"WHERE process = ? AND status NOT IN ({_FINALES_SQL})",
+                [("El proceso que ejecutaba el trabajo terminó.", time.time(), p) for p in muertos],
+            )
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sudoku_board import SudokuBoard
+from validator import Validator
+
+
+# ==========================================================
+# Caché de soluciones por forma canónica del tablero
+#   Grupo de simetrías (el mismo de _shuffle_board): permutar
+#   bandas/pilas, filas/columnas dentro de su banda/pila,
+#   reetiquetar dígitos y, con bloques cuadrados, trasponer.
+# ==========================================================
+
+class _Transformacion:
+    """canon[i][j] = etiqueta[grid'[filas[i]][cols[j]]], con grid' = grid o su traspuesta."""
+
+    __slots__ = ("filas", "cols", "etiqueta", "traspuesta")
+
+    def __init__(self, filas: List[int], cols: List[int], etiqueta: List[int], traspuesta: bool):
+        self.filas = filas
+        self.cols = cols
+        self.etiqueta = etiqueta
+        self.traspuesta = traspuesta
+
+    def deshacer(self, canon: List[List[int]]) -> List[List[int]]:
+        """Lleva una grilla del espacio canónico al del tablero original."""
+        size = len(canon)
+        inversa = [0] * (size + 1)
+        for viejo in range(1, size + 1):
+            inversa[self.etiqueta[viejo]] = viejo
+        grid = [[0] * size for _ in range(size)]
+        for i, r in enumerate(self.filas):
+            fila_canon = canon[i]
+            destino = grid[r]
+            for j, c in enumerate(self.cols):
+                destino[c] = inversa[fila_canon[j]]
+        if self.traspuesta:
+            grid = [list(col) for col in zip(*grid)]
+        return grid
+
+
+def _ordenar_ejes(grid: List[List[int]], sg_r: int, sg_c: int) -> Tuple[List[int], List[int]]:
+    """Orden de filas y columnas según firmas invariantes por el grupo.
+
+    Las firmas no cambian al permutar columnas/filas ni al reetiquetar,
+    así que variantes simétricas suelen caer en el mismo orden. Los empates
+    se resuelven por posición: dos variantes pueden quedar con claves
+    distintas (un fallo de caché), nunca con una solución equivocada.
+    """
+    size = len(grid)
+    frec = [0] * (size + 1)
+    por_fila = [0] * size
+    por_col = [0] * size
+    for r in range(size):
+        for c, v in enumerate(grid[r]):
+            if v:
+                frec[v] += 1
+                por_fila[r] += 1
+                por_col[c] += 1
+
+    firma_fila = [
+        (por_fila[r], sorted((por_col[c], frec[v]) for c, v in enumerate(grid[r]) if v))
+        for r in range(size)
+    ]
+    firma_col = [
+        (por_col[c], sorted((por_fila[r], frec[grid[r][c]]) for r in range(size) if grid[r][c]))
+        for c in range(size)
+    ]
+
+    def _orden(firmas, ancho: int) -> List[int]:
+        grupos = [list(range(g, g + ancho)) for g in range(0, size, ancho)]
+        for grupo in grupos:
+            grupo.sort(key=lambda i: firmas[i])
+        grupos.sort(key=lambda grupo: [firmas[i] for i in grupo])
+        return [i for grupo in grupos for i in grupo]
+
+    return _orden(firma_fila, sg_r), _orden(firma_col, sg_c)
+
+
+def _canonizar(grid: List[List[int]], sg_r: int, sg_c: int, traspuesta: bool) -> Tuple[bytes, _Transformacion]:
+    size = len(grid)
+    filas, cols = _ordenar_ejes(grid, sg_r, sg_c)
+
+    # reetiquetado por orden de primera aparición; los dígitos ausentes
+    # se quedan con las etiquetas sobrantes en orden creciente
+    etiqueta = [0] * (size + 1)
+    siguiente = 1
+    plano = bytearray()
+    for r in filas:
+        fila = grid[r]
+        for c in cols:
+            v = fila[c]
+            if v and not etiqueta[v]:
+                etiqueta[v] = siguiente
+                siguiente += 1
+            plano.append(etiqueta[v])
+    for v in range(1, size + 1):
+        if not etiqueta[v]:
+            etiqueta[v] = siguiente
+            siguiente += 1
+    return bytes(plano), _Transformacion(filas, cols, etiqueta, traspuesta)
+
+
+def canonical_form(board: SudokuBoard) -> Tuple[bytes, "_Transformacion"]:
+    """Clave canónica del tablero y la transformación que lo lleva a ella."""
+    sg_r, sg_c = board.subgrid_size()
+    grid = board.grid
+    clave, trans = _canonizar(grid, sg_r, sg_c, False)
+    if sg_r == sg_c:
+        traspuesta = [list(col) for col in zip(*grid)]
+        clave_t, trans_t = _canonizar(traspuesta, sg_r, sg_c, True)
+        if clave_t < clave:
+            return clave_t, trans_t
+    return clave, trans
+
+
+def _aplicar(trans: _Transformacion, grid: List[List[int]]) -> List[List[int]]:
+    if trans.traspuesta:
+        grid = [list(col) for col in zip(*grid)]
+    return [[trans.etiqueta[grid[r][c]] for c in trans.cols] for r in trans.filas]
+
+
+class SolutionCache:
+    """Caché LRU acotada: forma canónica del puzzle → solución canónica."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entradas: "OrderedDict[bytes, List[List[int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, puzzle: SudokuBoard) -> Optional[SudokuBoard]:
+        """Solución del puzzle si algún equivalente ya se resolvió, o None."""
+        clave, trans = canonical_form(puzzle)
+        with self._lock:
+            canon = self._entradas.get(clave)
+            if canon is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.hits += 1
+        return SudokuBoard.from_list(trans.deshacer(canon))
+
+    def put(self, puzzle: SudokuBoard, solution: SudokuBoard) -> bool:
+        """Guarda la solución solo si es completa, válida y respeta las pistas del puzzle."""
+        if 0 in solution.cells or not Validator.is_valid_solution(solution):
+            return False
+        if any(p and p != s for p, s in zip(puzzle.cells, solution.cells)):
+            return False
+        clave, trans = canonical_form(puzzle)
+        canon = _aplicar(trans, solution.grid)
+        with self._lock:
+            self._entradas[clave] = canon
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entries:
+                self._entradas.popitem(last=False)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entradas),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# caché compartida por todos los controllers del proceso
+default_cache = SolutionCache()
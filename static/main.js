@@ -2,6 +2,11 @@ let currentGrid = null;
 let initialGrid = null; // para saber qué casillas son fijas
 let currentDifficulty = "medio";
 let fitnessChart = null;
+let currentJobId = null;   // trabajo de resolución en curso
+let jobEvents = null;      // EventSource con el progreso del trabajo
+const CHART_MAX_POINTS = 300; // tope de puntos del historial que se piden para el gráfico
+// filas x columnas de cada bloque por tamaño (igual que geometry.SUBGRIDS)
+const SUBGRIDS = { 4: [2, 2], 6: [2, 3], 9: [3, 3], 12: [3, 4], 16: [4, 4], 25: [5, 5] };
 
 
 function createBoardTable(grid) {
@@ -10,9 +15,14 @@ function createBoardTable(grid) {
   }
 
   const size = grid.length;
+  const [sgRows, sgCols] = SUBGRIDS[size] || [size, size];
+  const digits = size > 9 ? 2 : 1;
   const table = document.createElement("table");
   table.classList.add("sudoku-table");
-  table.classList.add(`size-${size}`); // para las líneas gruesas por bloque
+  table.classList.add(`size-${size}`);
+  if (size > 9) {
+    table.classList.add("size-large");
+  }
 
   for (let r = 0; r < size; r++) {
     const tr = document.createElement("tr");
@@ -23,7 +33,15 @@ function createBoardTable(grid) {
 
       input.type = "text";
       input.inputMode = "numeric";
-      input.maxLength = 1;
+      input.maxLength = digits;
+
+      // líneas gruesas entre bloques
+      if ((r + 1) % sgRows === 0 && r < size - 1) {
+        td.classList.add("block-bottom");
+      }
+      if ((c + 1) % sgCols === 0 && c < size - 1) {
+        td.classList.add("block-right");
+      }
 
       const value = grid[r][c] ?? 0;
       const isFixed =
@@ -57,16 +75,18 @@ function createBoardTable(grid) {
           return;
         }
 
-        // Solo dejamos un dígito 1-9
-        const raw = target.value.replace(/[^1-9]/g, "");
-        const val = raw === "" ? "" : raw.charAt(raw.length - 1);
-        target.value = val;
-
-        if (val === "") {
-          currentGrid[row][col] = 0;
-        } else {
-          currentGrid[row][col] = parseInt(val, 10);
+        // Solo dejamos un valor 1..size (dos cifras desde 12x12); si las
+        // últimas cifras no forman un valor válido se prueba con la última
+        const raw = target.value.replace(/[^0-9]/g, "").slice(-digits);
+        let val = parseInt(raw, 10);
+        if (!(val >= 1 && val <= size)) {
+          val = parseInt(raw.slice(-1), 10);
+        }
+        if (!(val >= 1 && val <= size)) {
+          val = 0;
         }
+        target.value = val === 0 ? "" : String(val);
+        currentGrid[row][col] = val;
       });
 
       td.appendChild(input);
@@ -94,17 +114,48 @@ async function generateSudoku() {
   currentDifficulty = difficulty;
 
   const res = await fetch(`/api/generate?size=${size}&difficulty=${difficulty}`);
-  const data = await res.json();
+  let data = await res.json();
+  if (res.status === 202) {
+    // tablero grande sin uno listo en el pool: se genera como trabajo
+    document.getElementById("metrics").textContent = "Generando tablero...";
+    data = await waitForJob(data.status_url);
+  }
+  if (data.error) {
+    document.getElementById("metrics").textContent = "";
+    alert(data.error);
+    return;
+  }
 
   // Tablero base que define qué casillas son fijas
   initialGrid = JSON.parse(JSON.stringify(data.grid));
   currentGrid = data.grid;
 
   renderBoard();
-  document.getElementById("metrics").textContent = "";
+  document.getElementById("metrics").textContent = data.difficulty_met
+    ? ""
+    : `Dificultad "${data.difficulty}" no alcanzada en ${data.size}x${data.size}: ` +
+      `${data.clues} pistas (objetivo ${data.clue_target[0]}-${data.clue_target[1]}).`;
   updateFitnessChart([]);
 }
 
+// Espera a que termine un trabajo (consultando su estado) y devuelve su resultado
+async function waitForJob(statusUrl) {
+  for (;;) {
+    await new Promise((resolve) => setTimeout(resolve, 500));
+    const res = await fetch(statusUrl);
+    const status = await res.json();
+    if (!res.ok) {
+      return { error: status.error };
+    }
+    if (status.status === "terminado") {
+      return status.result;
+    }
+    if (status.status === "error" || status.status === "cancelado") {
+      return { error: status.error || "Generación cancelada." };
+    }
+  }
+}
+
 
 async function uploadBoard() {
   const fileInput = document.getElementById("file-input");
@@ -148,6 +199,16 @@ async function solveWithGA() {
   const gens = parseInt(document.getElementById("param-generations").value, 10);
   const mut = parseFloat(document.getElementById("param-mutation").value);
   const elite = parseFloat(document.getElementById("param-elite").value);
+  const engine = document.getElementById("param-engine").value;
+  const encoding = document.getElementById("param-encoding").value;
+  const selection = document.getElementById("param-selection").value;
+  const localSearch = document.getElementById("param-local-search").value;
+  const islands = parseInt(document.getElementById("param-islands").value, 10);
+  const seedRaw = document.getElementById("param-seed").value.trim();
+  const seed = seedRaw === "" ? null : parseInt(seedRaw, 10);
+  const restarts = parseInt(document.getElementById("param-restarts").value, 10) || 0;
+  const budgetRaw = document.getElementById("param-time-budget").value.trim();
+  const timeBudget = budgetRaw === "" ? null : parseFloat(budgetRaw);
 
   const res = await fetch("/api/solve", {
     method: "POST",
@@ -161,15 +222,68 @@ async function solveWithGA() {
       max_generations: gens,
       mutation_rate: mut,
       elite_ratio: elite,
+      engine: engine,
+      encoding: encoding,
+      selection: selection,
+      local_search: localSearch,
+      islands: islands,
+      max_restarts: restarts,
+      time_budget: timeBudget,
+      seed: seed,
+      max_points: CHART_MAX_POINTS,
     }),
   });
 
-  const data = await res.json();
-  if (data.error) {
-    alert(data.error);
+  const job = await res.json();
+  if (job.error) {
+    alert(job.error);
     return;
   }
 
+  followSolveJob(job);
+}
+
+// Sigue el progreso del trabajo por SSE y grafica a medida que llegan generaciones
+function followSolveJob(job) {
+  if (jobEvents) {
+    jobEvents.close();
+  }
+  currentJobId = job.job_id;
+  updateFitnessChart([]);
+  document.getElementById("metrics").textContent = "Resolviendo...";
+  document.getElementById("btn-cancel").disabled = false;
+
+  const source = new EventSource(job.events_url);
+  jobEvents = source;
+
+  source.addEventListener("fitness", (e) => {
+    const data = JSON.parse(e.data);
+    appendFitnessPoints(data.start, data.points);
+    document.getElementById("metrics").textContent =
+      `Resolviendo... generación ${data.start + data.points.length}, ` +
+      `mejor fitness ${Math.min(...data.points)}`;
+  });
+
+  const finish = (e) => {
+    source.close();
+    jobEvents = null;
+    currentJobId = null;
+    document.getElementById("btn-cancel").disabled = true;
+
+    const status = JSON.parse(e.data);
+    if (status.error || !status.result) {
+      document.getElementById("metrics").textContent =
+        status.error ? `Error: ${status.error}` : "Resolución cancelada.";
+      return;
+    }
+    showSolveResult(status.result, status.status);
+  };
+  ["terminado", "cancelado", "error"].forEach((name) => {
+    source.addEventListener(name, finish);
+  });
+}
+
+function showSolveResult(data, status) {
   currentGrid = data.grid;
   renderBoard();
 
@@ -183,15 +297,41 @@ async function solveWithGA() {
     `Mejor fitness: ${m.best_fitness}`,
     `Generaciones: ${m.generations}`,
     `Causa de término: ${m.termination_cause}`,
+    `Celdas propagadas: ${m.propagated_cells}`,
+    `Reinicios: ${m.restarts}`,
+    `Semilla: ${m.seed}`,
     `Duración (s): ${m.duration_seconds.toFixed(3)}`
-  ].join("\n");
+  ];
+  if (m.local_search && m.local_search.calls > 0) {
+    metricsText.push(
+      `Búsqueda local: ${m.local_search.seconds.toFixed(3)} s, ` +
+      `${m.local_search.improvements}/${m.local_search.calls} refinamientos con mejora`
+    );
+  }
+  if (status === "cancelado") {
+    metricsText.push("(ejecución cancelada por el usuario)");
+  }
+  (m.islands || []).forEach((isla) => {
+    metricsText.push(
+      `Isla ${isla.island}: mejor ${isla.best_fitness}, ` +
+      `${isla.generations_used} gens, ${isla.termination_cause}`
+    );
+  });
 
-  document.getElementById("metrics").textContent = metricsText;
-  // Cortar el historial al número REAL de generaciones usadas
-  const history = (m.fitness_history || []).slice(0, m.generations);
+  document.getElementById("metrics").textContent = metricsText.join("\n");
+  // El servidor manda solo los puntos de cambio [generación, fitness]
+  const points = ((m.fitness_history || {}).points || []).map(([gen, fit]) => ({
+    x: gen + 1,
+    y: fit,
+  }));
+  updateFitnessChart(points);
+}
 
-  // Graficar solo las generaciones realmente ejecutadas
-  updateFitnessChart(history);
+async function cancelSolve() {
+  if (!currentJobId) {
+    return;
+  }
+  await fetch(`/api/jobs/${currentJobId}`, { method: "DELETE" });
 }
 
 async function exportResult() {
@@ -261,7 +401,21 @@ async function loadHistory() {
   container.appendChild(table);
 }
 
-function updateFitnessChart(history) {
+function appendFitnessPoints(start, values) {
+  if (!values || values.length === 0) {
+    return;
+  }
+  const points = values.map((fit, i) => ({ x: start + i + 1, y: fit }));
+  if (!fitnessChart) {
+    updateFitnessChart(points);
+    return;
+  }
+  fitnessChart.data.datasets[0].data.push(...points);
+  fitnessChart.update("none");
+}
+
+// points: [{x: generación, y: fitness}, ...]
+function updateFitnessChart(points) {
   const canvas = document.getElementById("fitness-chart");
   if (!canvas) return;
 
@@ -272,22 +426,20 @@ function updateFitnessChart(history) {
     fitnessChart = null;
   }
 
-  if (!history || history.length === 0) {
+  if (!points || points.length === 0) {
     return;
   }
 
-  const labels = history.map((_, idx) => idx + 1);
-
   fitnessChart = new Chart(ctx, {
     type: "line",
     data: {
-      labels,
       datasets: [
         {
           label: "Mejor fitness",
-          data: history,
+          data: points.slice(), // appendFitnessPoints agrega sobre esta copia
           borderWidth: 2,
-          tension: 0.25,
+          stepped: true, // puntos de cambio: el valor se mantiene hasta el siguiente
+          pointRadius: 0,
           fill: false,
         },
       ],
@@ -305,6 +457,7 @@ function updateFitnessChart(history) {
       },
       scales: {
         x: {
+          type: "linear",
           ticks: {
             color: "#9ca3af",
             font: { size: 10 },
@@ -344,6 +497,7 @@ function updateFitnessChart(history) {
 document.addEventListener("DOMContentLoaded", () => {
   document.getElementById("btn-generate").addEventListener("click", generateSudoku);
   document.getElementById("btn-solve").addEventListener("click", solveWithGA);
+  document.getElementById("btn-cancel").addEventListener("click", cancelSolve);
   document.getElementById("btn-upload").addEventListener("click", uploadBoard);
   document.getElementById("btn-export").addEventListener("click", exportResult);
   document.getElementById("btn-history").addEventListener("click", loadHistory);
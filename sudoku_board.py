@@ -1,44 +1,93 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from array import array
+from typing import Iterable, List, Tuple
+
+from geometry import SUBGRIDS, geometry, subgrid_shape
 
 
-@dataclass
 class SudokuBoard:
-    size: int  # 4, 6 o 9
-    grid: List[List[int]]          # 0 = casilla vacía
-    fixed: List[List[bool]]        # True si es casilla fija del tablero inicial
+    """
+    Tablero compacto: las casillas viven en un `array('b')` plano (fila a fila)
+    y las casillas fijas en una máscara de bits (bit r * size + c).
+    - `copy()` no revalida nada y conserva la máscara de fijas original.
+    - `grid` / `fixed` devuelven listas de listas nuevas (sólo lectura).
+    """
+
+    __slots__ = ("size", "cells", "fixed_mask")
+
+    def __init__(self, size: int, cells: array, fixed_mask: int):
+        self.size = size              # 4, 6 o 9
+        self.cells = cells            # 0 = casilla vacía
+        self.fixed_mask = fixed_mask  # bit encendido si es casilla fija del tablero inicial
 
     @classmethod
     def from_list(cls, grid: List[List[int]]) -> "SudokuBoard":
         if not grid or any(len(row) != len(grid) for row in grid):
             raise ValueError("La grilla debe ser cuadrada y no vacía")
         size = len(grid)
-        if size not in (4, 6, 9):
+        if size not in SUBGRIDS:
             raise ValueError(f"Tamaño de Sudoku no soportado: {size}")
-        fixed = [[cell != 0 for cell in row] for row in grid]
-        return cls(size=size, grid=[row[:] for row in grid], fixed=fixed)
+        cells = array("b", (v for row in grid for v in row))
+        fixed_mask = 0
+        for i, v in enumerate(cells):
+            if v != 0:
+                fixed_mask |= 1 << i
+        return cls(size, cells, fixed_mask)
 
     def copy(self) -> "SudokuBoard":
-        return SudokuBoard.from_list(self.grid)
+        return SudokuBoard(self.size, array("b", self.cells), self.fixed_mask)
 
     def subgrid_size(self) -> Tuple[int, int]:
-        if self.size == 9:
-            return 3, 3
-        if self.size == 6:
-            return 2, 3
-        if self.size == 4:
-            return 2, 2
-        raise ValueError(f"Tamaño de Sudoku no soportado: {self.size}")
+        return subgrid_shape(self.size)
+
+    # ---------- acceso a casillas ----------
+    def get(self, row: int, col: int) -> int:
+        return self.cells[row * self.size + col]
 
     def is_fixed(self, row: int, col: int) -> bool:
-        return self.fixed[row][col]
+        return bool(self.fixed_mask >> (row * self.size + col) & 1)
 
     def set_value(self, row: int, col: int, value: int) -> None:
-        if self.fixed[row][col]:
+        if self.is_fixed(row, col):
             raise ValueError("No se puede modificar una casilla fija")
-        self.grid[row][col] = value
+        self.cells[row * self.size + col] = value
+
+    # ---------- vistas por unidad (sin copiar el tablero) ----------
+    def row(self, r: int) -> memoryview:
+        return memoryview(self.cells)[r * self.size:(r + 1) * self.size]
+
+    def column(self, c: int) -> memoryview:
+        return memoryview(self.cells)[c::self.size]
+
+    def block(self, b: int) -> Iterable[int]:
+        """Valores de la subcuadrícula b (numeradas por filas, de izquierda a derecha)."""
+        cells = self.cells
+        return [cells[i] for i in geometry(self.size).blocks[b]]
+
+    # ---------- compatibilidad con listas de listas ----------
+    @property
+    def grid(self) -> List[List[int]]:
+        size = self.size
+        cells = self.cells
+        return [cells[r * size:(r + 1) * size].tolist() for r in range(size)]
+
+    @property
+    def fixed(self) -> List[List[bool]]:
+        size = self.size
+        return [[self.is_fixed(r, c) for c in range(size)] for r in range(size)]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SudokuBoard):
+            return NotImplemented
+        return (
+            self.size == other.size
+            and self.cells == other.cells
+            and self.fixed_mask == other.fixed_mask
+        )
+
+    def __repr__(self) -> str:
+        return f"SudokuBoard(size={self.size}, grid={self.grid})"
 
     def __str__(self) -> str:
-        return "\n".join(" ".join(str(v) for v in row) for row in self.grid)
+        return "\n".join(" ".join(str(v) for v in self.row(r)) for r in range(self.size))
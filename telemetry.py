@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+from multiprocessing import util as mp_util
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# ==========================================================
+# Telemetría operativa en formato de texto de Prometheus
+#   - Registro en memoria: cada actualización es un dict + lock.
+#   - Con varios procesos (workers de gunicorn, pool de batch) cada
+#     proceso vuelca sus valores a <directorio>/<pid>.json y /metrics
+#     suma los archivos de todos. Sin directorio, sólo el proceso actual.
+# No depende de ningún servicio externo.
+# ==========================================================
+
+METRICS_DIR_ENV = "SUDOKU_METRICS_DIR"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SOLVE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0)
+RATE_BUCKETS = (10.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0)
+
+_Clave = Tuple[str, Tuple[str, ...]]
+
+
+class _Metrica:
+    """Familia de series con el mismo nombre; los valores viven en el registro."""
+
+    tipo = ""
+
+    def __init__(self, registro: "MetricsRegistry", nombre: str, ayuda: str, etiquetas: Sequence[str]):
+        self._registro = registro
+        self.name = nombre
+        self.help = ayuda
+        self.labelnames = tuple(etiquetas)
+
+    def _clave(self, labels: Dict[str, object]) -> _Clave:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}, se recibió {tuple(labels)}")
+        return self.name, tuple(str(labels[n]) for n in self.labelnames)
+
+
+class Counter(_Metrica):
+    tipo = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Un contador sólo puede aumentar")
+        self._registro._sumar(self._clave(labels), amount)
+
+
+class Gauge(_Metrica):
+    """Valor instantáneo; entre procesos se suma (p. ej. resoluciones en curso)."""
+
+    tipo = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self._registro._sumar(self._clave(labels), amount)
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self._registro._sumar(self._clave(labels), -amount)
+
+    def set(self, value: float, **labels) -> None:
+        self._registro._fijar(self._clave(labels), value)
+
+
+class Histogram(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, registro, nombre, ayuda, etiquetas, buckets: Sequence[float]):
+        super().__init__(registro, nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        # índice del primer bucket que contiene el valor (len = sólo +Inf)
+        i = 0
+        for limite in self.buckets:
+            if value <= limite:
+                break
+            i += 1
+        self._registro._observar(self._clave(labels), len(self.buckets), i, value)
+
+
+class MetricsRegistry:
+    """Registro de métricas de un proceso, opcionalmente compartido por directorio.
+
+    Las actualizaciones sólo tocan memoria; el volcado al directorio se
+    hace como mucho cada `flush_interval` segundos (y al salir del proceso),
+    escribiendo el archivo completo de forma atómica.
+    """
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._metricas: Dict[str, _Metrica] = {}
+        self._reiniciar_estado()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            atexit.register(self.flush)
+            # los hijos de multiprocessing terminan con os._exit: sin atexit
+            mp_util.Finalize(self, self.flush, exitpriority=10)
+            mp_util.register_after_fork(self, MetricsRegistry._tras_fork_mp)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reiniciar_estado)
+
+    def _reiniciar_estado(self) -> None:
+        # tras un fork el hijo parte de cero: lo heredado ya está en el archivo del padre
+        self._lock = threading.Lock()
+        self._valores: Dict[_Clave, object] = {}
+        self._pid = os.getpid()
+        self._ultimo_volcado = 0.0
+        self._pendiente = False
+        self._timer: Optional[threading.Timer] = None
+
+    def _tras_fork_mp(self) -> None:
+        mp_util.Finalize(self, self.flush, exitpriority=10)
+
+    # ---------- declaración ----------
+    def _declarar(self, metrica: _Metrica) -> _Metrica:
+        existente = self._metricas.get(metrica.name)
+        if existente is not None:
+            if type(existente) is not type(metrica) or existente.labelnames != metrica.labelnames:
+                raise ValueError(f"Métrica ya declarada con otra forma: {metrica.name}")
+            return existente
+        self._metricas[metrica.name] = metrica
+        return metrica
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._declarar(Counter(self, name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._declarar(Gauge(self, name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._declarar(Histogram(self, name, help, labelnames, buckets))
+
+    # ---------- actualizaciones ----------
+    def _sumar(self, clave: _Clave, cantidad: float) -> None:
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + cantidad
+            self._marcar()
+
+    def _fijar(self, clave: _Clave, valor: float) -> None:
+        with self._lock:
+            self._valores[clave] = float(valor)
+            self._marcar()
+
+    def _observar(self, clave: _Clave, n_buckets: int, i: int, valor: float) -> None:
+        with self._lock:
+            # [conteo por bucket (no acumulado)..., +Inf, suma, cantidad]
+            serie = self._valores.get(clave)
+            if serie is None:
+                serie = self._valores[clave] = [0] * (n_buckets + 1) + [0.0, 0]
+            serie[i] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+            self._marcar()
+
+    def _marcar(self) -> None:
+        """Programa el volcado al directorio (llamar con el lock tomado)."""
+        if not self.directory:
+            return
+        self._pendiente = True
+        espera = self._ultimo_volcado + self.flush_interval - monotonic()
+        if espera <= 0:
+            self._volcar()
+        elif self._timer is None:
+            self._timer = threading.Timer(espera, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # ---------- volcado / lectura entre procesos ----------
+    def _archivo(self) -> str:
+        return os.path.join(self.directory, f"{self._pid}.json")
+
+    def _volcar(self) -> None:
+        datos = [[nombre, list(etiquetas), valor] for (nombre, etiquetas), valor in self._valores.items()]
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(datos, f)
+        os.replace(tmp, self._archivo())
+        self._ultimo_volcado = monotonic()
+        self._pendiente = False
+
+    def flush(self) -> None:
+        """Escribe ya los valores pendientes de este proceso en el directorio compartido."""
+        if not self.directory:
+            return
+        with self._lock:
+            self._timer = None
+            if self._pendiente:
+                self._volcar()
+
+    def _leer_todos(self) -> Iterable[List[Tuple[_Clave, object]]]:
+        if not self.directory:
+            with self._lock:
+                yield [(k, list(v) if isinstance(v, list) else v) for k, v in self._valores.items()]
+            return
+        self.flush()
+        for ruta in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                with open(ruta, encoding="utf-8") as f:
+                    datos = json.load(f)
+            except (OSError, ValueError):
+                continue   # archivo de otro proceso a medio reemplazar o ilegible
+            yield [((nombre, tuple(etiquetas)), valor) for nombre, etiquetas, valor in datos]
+
+    def collect(self) -> Dict[_Clave, object]:
+        """Valores sumados de todos los procesos (histogramas bucket a bucket)."""
+        total: Dict[_Clave, object] = {}
+        for valores in self._leer_todos():
+            for clave, valor in valores:
+                previo = total.get(clave)
+                if previo is None:
+                    total[clave] = valor
+                elif isinstance(valor, list):
+                    total[clave] = [a + b for a, b in zip(previo, valor)]
+                else:
+                    total[clave] = previo + valor
+        return total
+
+    def render(self) -> str:
+        """Texto en el formato de exposición de Prometheus (versión 0.0.4)."""
+        valores = self.collect()
+        por_nombre: Dict[str, List[Tuple[Tuple[str, ...], object]]] = {}
+        for (nombre, etiquetas), valor in valores.items():
+            por_nombre.setdefault(nombre, []).append((etiquetas, valor))
+
+        lineas: List[str] = []
+        for nombre in sorted(self._metricas):
+            metrica = self._metricas[nombre]
+            lineas.append(f"# HELP {nombre} {_escapar_ayuda(metrica.help)}")
+            lineas.append(f"# TYPE {nombre} {metrica.tipo}")
+            for etiquetas, valor in sorted(por_nombre.get(nombre, ())):
+                pares = list(zip(metrica.labelnames, etiquetas))
+                if isinstance(metrica, Histogram):
+                    acumulado = 0
+                    limites = [_numero(b) for b in metrica.buckets] + ["+Inf"]
+                    for limite, n in zip(limites, valor):
+                        acumulado += n
+                        lineas.append(f"{nombre}_bucket{_etiquetas(pares + [('le', limite)])} {acumulado}")
+                    lineas.append(f"{nombre}_sum{_etiquetas(pares)} {_numero(valor[-2])}")
+                    lineas.append(f"{nombre}_count{_etiquetas(pares)} {valor[-1]}")
+                else:
+                    lineas.append(f"{nombre}{_etiquetas(pares)} {_numero(valor)}")
+        return "\n".join(lineas) + "\n"
+
+    def clear(self) -> None:
+        """Borra los valores de este proceso (y su archivo en el directorio)."""
+        with self._lock:
+            self._valores.clear()
+            self._pendiente = False
+            if self.directory:
+                try:
+                    os.remove(self._archivo())
+                except FileNotFoundError:
+                    pass
+
+
+def _numero(valor: float) -> str:
+    valor = float(valor)
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+
+def _escapar_ayuda(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _etiquetas(pares: List[Tuple[str, str]]) -> str:
+    if not pares:
+        return ""
+    partes = []
+    for nombre, valor in pares:
+        valor = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        partes.append(f'{nombre}="{valor}"')
+    return "{" + ",".join(partes) + "}"
+
+
+# Registro del proceso; con SUDOKU_METRICS_DIR se comparte entre procesos
+registry = MetricsRegistry(os.environ.get(METRICS_DIR_ENV) or None)
+
+http_request_duration = registry.histogram(
+    "sudoku_http_request_duration_seconds",
+    "Latencia de los requests HTTP por ruta.",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+solves_in_flight = registry.gauge(
+    "sudoku_solves_in_flight",
+    "Resoluciones en curso.",
+)
+solves_total = registry.counter(
+    "sudoku_solves_total",
+    "Resoluciones terminadas por tamaño, dificultad y resultado (solved/unsolved).",
+    ("size", "difficulty", "result"),
+)
+solve_duration = registry.histogram(
+    "sudoku_solve_duration_seconds",
+    "Duración de cada resolución.",
+    ("size", "engine"),
+    SOLVE_BUCKETS,
+)
+ga_generations_total = registry.counter(
+    "sudoku_ga_generations_total",
+    "Generaciones del AG ejecutadas.",
+    ("engine",),
+)
+ga_generations_per_second = registry.histogram(
+    "sudoku_ga_generations_per_second",
+    "Generaciones por segundo de cada corrida del AG.",
+    ("engine",),
+    RATE_BUCKETS,
+)
+solution_cache_lookups = registry.counter(
+    "sudoku_solution_cache_lookups_total",
+    "Consultas a la caché de soluciones (hit/miss).",
+    ("result",),
+)
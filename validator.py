@@ -1,44 +1,18 @@
-from typing import List
-
 from sudoku_board import SudokuBoard
+from geometry import geometry
 
 
 class Validator:
-    @staticmethod
-    def _count_duplicates(values: List[int]) -> int:
-        """Cuenta cuántos valores repetidos hay en una lista ignorando ceros."""
-        nums = [v for v in values if v != 0]
-        return len(nums) - len(set(nums))
-
     @classmethod
     def fitness_penalty(cls, board: SudokuBoard) -> int:
         """Penalización: 0 = tablero perfecto.
         Suma repeticiones en filas, columnas y subcuadrículas.
         """
-        size = board.size
-        grid = board.grid
+        cells = board.cells
         penalty = 0
-
-        # Filas
-        for row in grid:
-            penalty += cls._count_duplicates(row)
-
-        # Columnas
-        for c in range(size):
-            col = [grid[r][c] for r in range(size)]
-            penalty += cls._count_duplicates(col)
-
-        # Subcuadrículas
-        sg_r, sg_c = board.subgrid_size()
-        for br in range(0, size, sg_r):
-            for bc in range(0, size, sg_c):
-                block = [
-                    grid[r][c]
-                    for r in range(br, br + sg_r)
-                    for c in range(bc, bc + sg_c)
-                ]
-                penalty += cls._count_duplicates(block)
-
+        for unit in geometry(board.size).units:
+            nums = [cells[i] for i in unit if cells[i] != 0]
+            penalty += len(nums) - len(set(nums))
         return penalty
 
     @classmethod
@@ -61,23 +35,9 @@ class Validator:
         if not (1 <= value <= size):
             return False
 
-        # Verificar fila
-        for c in range(size):
-            if c != col and board.grid[row][c] == value:
-                return False
-
-        # Verificar columna
-        for r in range(size):
-            if r != row and board.grid[r][col] == value:
+        # fila, columna y subcuadrícula: las casillas "pares" de (row, col)
+        cells = board.cells
+        for i in geometry(size).peers[row * size + col]:
+            if cells[i] == value:
                 return False
-
-        # Verificar subcuadrícula
-        sg_r, sg_c = board.subgrid_size()
-        start_r = (row // sg_r) * sg_r
-        start_c = (col // sg_c) * sg_c
-        for r in range(start_r, start_r + sg_r):
-            for c in range(start_c, start_c + sg_c):
-                if (r != row or c != col) and board.grid[r][c] == value:
-                    return False
-
         return True